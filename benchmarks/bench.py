@@ -0,0 +1,391 @@
+"""
+Benchmarks of filler, on synthetic templates and data.
+
+Each case fills a generated docx or xlsx template, of a given size and placeholder
+density, with a generated DataFrame, through one of the fill paths:
+
+    row             RowTemplateFiller.fill, one filler per row
+    batch-<engine>  RowsTemplateFiller.fill with each engine of the template type
+    parallel-zip    RowsTemplateFiller.fill with the zip engine and worker processes
+
+Each case runs in its own interpreter, so that its peak RSS is its own, and reports
+rows/sec, per-row latency percentiles (ms) and peak RSS (MiB). Results are written
+as JSON, together with the commit and the machine they were measured on.
+
+Usage:
+    python benchmarks/bench.py --output head.json
+    python benchmarks/bench.py --quick --filter docx
+    python benchmarks/bench.py --compare base.json head.json --threshold 0.1
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+# Number of paragraphs (docx) or rows of 10 cells (xlsx) of each template size
+SIZES = {
+    "small": 20,
+    "large": 400,
+}
+
+# Share of the paragraphs or cells holding a placeholder
+DENSITIES = {
+    "low": 0.1,
+    "high": 0.8,
+}
+
+# Number of distinct placeholder keys, i.e. columns of the data
+COLUMNS = 20
+
+ENGINES = {
+    "docx": ["docxtpl", "zip"],
+    "xlsx": ["openpyxl", "zip"],
+}
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod".split()
+
+
+def make_docx(path: str, size: int, density: float, seed: int = 0):
+    """
+    Write a docx template of 'size' paragraphs, and a table, with placeholders
+    in a 'density' share of them.
+    """
+    from docx import Document
+
+    rand = random.Random(seed)
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Header {{ c0 }}"
+    for _ in range(size):
+        text = " ".join(rand.choices(WORDS, k=12))
+        if rand.random() < density:
+            text += " {{ c%d }} %s {{ c%d }}." % (
+                rand.randrange(COLUMNS),
+                rand.choice(WORDS),
+                rand.randrange(COLUMNS),
+            )
+        doc.add_paragraph(text)
+
+    table = doc.add_table(rows=max(size // 10, 1), cols=4)
+    for cell in itertools.chain.from_iterable(row.cells for row in table.rows):
+        if rand.random() < density:
+            cell.text = "{{ c%d }}" % rand.randrange(COLUMNS)
+        else:
+            cell.text = rand.choice(WORDS)
+    doc.save(path)
+
+
+def make_xlsx(path: str, size: int, density: float, seed: int = 0):
+    """
+    Write an xlsx template of 'size' rows of 10 cells, with placeholders in a 'density'
+    share of the cells, half of them whole cell placeholders, half inline ones.
+    """
+    from openpyxl import Workbook
+
+    rand = random.Random(seed)
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in range(1, size + 1):
+        for column in range(1, 11):
+            if rand.random() < density:
+                key = "c%d" % rand.randrange(COLUMNS)
+                if rand.random() < 0.5:
+                    value = "{{%s}}" % key
+                else:
+                    value = "%s: {{%s}}" % (rand.choice(WORDS), key)
+            elif rand.random() < 0.5:
+                value = rand.random() * 1000
+            else:
+                value = rand.choice(WORDS)
+            sheet.cell(row, column, value)
+    workbook.save(path)
+
+
+def make_frame(rows: int, seed: int = 0):
+    """
+    Return a DataFrame of 'rows' rows and COLUMNS columns of strings, numbers and missing values.
+    """
+    import pandas as pd
+
+    rand = random.Random(seed)
+    data = {}
+    for index in range(COLUMNS):
+        if index % 3 == 0:
+            data[f"c{index}"] = [rand.choice(WORDS).title() for _ in range(rows)]
+        elif index % 3 == 1:
+            data[f"c{index}"] = [round(rand.random() * 1e4, 2) for _ in range(rows)]
+        else:
+            data[f"c{index}"] = [
+                None if rand.random() < 0.2 else rand.choice(WORDS) for _ in range(rows)
+            ]
+    return pd.DataFrame(data, index=[f"r{i:06d}" for i in range(rows)])
+
+
+def cases(rows: int, workers: int) -> List[Dict[str, Any]]:
+    """
+    Return every benchmark case, as the parameters of run_case.
+    """
+    result = []
+    for kind, size, density in itertools.product(ENGINES, SIZES, DENSITIES):
+        template = {"kind": kind, "size": size, "density": density}
+        modes = [("row", None, 1)]
+        modes += [(f"batch-{engine}", engine, 1) for engine in ENGINES[kind]]
+        modes += [("parallel-zip", "zip", workers)]
+        for mode, engine, case_workers in modes:
+            result.append(
+                {
+                    "id": f"{kind}-{size}-{density}-{mode}",
+                    **template,
+                    "mode": mode,
+                    "engine": engine,
+                    "workers": case_workers,
+                    "rows": rows,
+                }
+            )
+    return result
+
+
+def peak_rss() -> Optional[float]:
+    """
+    Return the peak RSS in MiB of this process and of its waited for children, None if unknown.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    usage += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in KiB elsewhere
+    return usage / 2**20 if sys.platform == "darwin" else usage / 2**10
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Return the q-th percentile of 'values', interpolated linearly.
+    """
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def run_case(case: Dict[str, Any], template: str) -> Dict[str, Any]:
+    """
+    Run a case in this process, and return its measures.
+
+    Latencies are the time of each row, or between two results of a batch. The first one,
+    which includes importing the backend and loading the template, is reported apart.
+    """
+    from filler import RowTemplateFiller, RowsTemplateFiller
+
+    frame = make_frame(case["rows"])
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        latencies = []
+        start = time.perf_counter()
+        if case["mode"] == "row":
+            for key, row in frame.iterrows():
+                before = time.perf_counter()
+                filler = RowTemplateFiller(row, template, output_dir)
+                filler.output_name = key
+                filler.fill()
+                latencies.append(time.perf_counter() - before)
+        else:
+            filler = RowsTemplateFiller(
+                frame,
+                template,
+                output_dir,
+                workers=case["workers"],
+                engine=case["engine"],
+            )
+            before = time.perf_counter()
+            for result in filler.ifill():
+                if result.error is not None:
+                    raise result.error
+                now = time.perf_counter()
+                latencies.append(now - before)
+                before = now
+        elapsed = time.perf_counter() - start
+
+    return {
+        **case,
+        "seconds": elapsed,
+        "rows_per_sec": case["rows"] / elapsed,
+        "first_row_ms": latencies[0] * 1000,
+        "latency_ms": {
+            f"p{q}": percentile(latencies[1:] or latencies, q) * 1000
+            for q in (50, 90, 99)
+        },
+        "peak_rss_mib": peak_rss(),
+    }
+
+
+def machine() -> Dict[str, Any]:
+    """
+    Return where and on which commit the benchmarks run.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    """
+    Generate the templates, run each selected case in its own interpreter, and return the results.
+    """
+    selected = [
+        case
+        for case in cases(args.rows, args.workers)
+        if all(word in case["id"] for word in args.filter)
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as template_dir:
+        makers = {"docx": make_docx, "xlsx": make_xlsx}
+        for case in selected:
+            template = os.path.join(
+                template_dir,
+                f"{case['kind']}-{case['size']}-{case['density']}.{case['kind']}",
+            )
+            if not os.path.exists(template):
+                makers[case["kind"]](
+                    template, SIZES[case["size"]], DENSITIES[case["density"]]
+                )
+
+            output = subprocess.run(
+                [sys.executable, __file__, "--run-case", json.dumps(case), template],
+                stdout=subprocess.PIPE,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output)
+            results.append(result)
+            print(
+                f"{result['id']:<36} {result['rows_per_sec']:>9.1f} rows/s"
+                f" p50 {result['latency_ms']['p50']:>8.2f} ms"
+                f" p99 {result['latency_ms']['p99']:>8.2f} ms"
+                f" rss {result['peak_rss_mib'] or 0:>7.1f} MiB",
+                file=sys.stderr,
+            )
+
+    return {"machine": machine(), "results": results}
+
+
+def compare(base: str, head: str, threshold: float) -> int:
+    """
+    Print the change of each case between two result files, and return the number of regressions,
+    i.e. cases whose rows/sec dropped, or whose p50 latency or peak RSS grew, by more than 'threshold'.
+    """
+    with open(base) as f:
+        before = {result["id"]: result for result in json.load(f)["results"]}
+    with open(head) as f:
+        after = {result["id"]: result for result in json.load(f)["results"]}
+
+    regressions = 0
+    for case in sorted(before.keys() & after.keys()):
+        old, new = before[case], after[case]
+        changes = {"rows/s": new["rows_per_sec"] / old["rows_per_sec"] - 1}
+        # Results of parallel cases arrive by chunks, most of them 0 ms apart
+        if old["latency_ms"]["p50"] and new["latency_ms"]["p50"]:
+            changes["p50"] = old["latency_ms"]["p50"] / new["latency_ms"]["p50"] - 1
+        if old["peak_rss_mib"] and new["peak_rss_mib"]:
+            changes["rss"] = old["peak_rss_mib"] / new["peak_rss_mib"] - 1
+
+        worse = [name for name, change in changes.items() if change < -threshold]
+        regressions += bool(worse)
+        print(
+            f"{case:<36} "
+            + " ".join(f"{name} {change:+7.1%}" for name, change in changes.items())
+            + (f"  REGRESSION ({', '.join(worse)})" if worse else "")
+        )
+
+    for case in sorted(before.keys() ^ after.keys()):
+        print(f"{case:<36} only in {base if case in before else head}")
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--rows", type=int, default=200, help="rows filled by each case"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=2, help="workers of parallel cases"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="20 rows per case, for a smoke run"
+    )
+    parser.add_argument(
+        "--filter",
+        nargs="*",
+        default=[],
+        help="only run the cases whose id holds all these words, e.g. docx large",
+    )
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASE", "HEAD"),
+        help="compare two result files, exit with 1 on regression",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change counted as a regression by --compare",
+    )
+    parser.add_argument("--run-case", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        case, template = args.run_case
+        print(json.dumps(run_case(json.loads(case), template)))
+        return 0
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    if args.quick:
+        args.rows = 20
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,59 @@
-from .resources import RowTemplateFiller
+from .resources import (
+    RowTemplateFiller,
+    RowsTemplateFiller,
+    RowTemplatesFiller,
+    RemoteRowTemplateFiller,
+)
+from ._utils import (
+    csv_rows,
+    parquet_rows,
+    cursor_rows,
+    DirectorySink,
+    ZipSink,
+    TarSink,
+    Durability,
+    Metrics,
+    MetricsSummary,
+    RenderCache,
+    TemplateCache,
+    template_cache,
+    Pipeline,
+    Schema,
+    SchemaIssue,
+    template_placeholders,
+    Shard,
+    verify_shards,
+    Consolidate,
+    FillOptions,
+    RenderDaemon,
+    DaemonClient,
+)
 
 __all__ = [
     "RowTemplateFiller",
+    "RowsTemplateFiller",
+    "RowTemplatesFiller",
+    "RemoteRowTemplateFiller",
+    "csv_rows",
+    "parquet_rows",
+    "cursor_rows",
+    "DirectorySink",
+    "ZipSink",
+    "TarSink",
+    "Durability",
+    "Metrics",
+    "MetricsSummary",
+    "RenderCache",
+    "TemplateCache",
+    "template_cache",
+    "Pipeline",
+    "Schema",
+    "SchemaIssue",
+    "template_placeholders",
+    "Shard",
+    "verify_shards",
+    "Consolidate",
+    "FillOptions",
+    "RenderDaemon",
+    "DaemonClient",
 ]
@@ -0,0 +1,68 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from ._types import FillerError
+from ._utils import RenderDaemon, DaemonClient
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    The command line of filler:
+
+        python -m filler daemon [--socket PATH] [--workers N] [--template PATH ...]
+        python -m filler stats|reload|drain [--socket PATH]
+    """
+    parser = argparse.ArgumentParser(prog="python -m filler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    daemon = commands.add_parser(
+        "daemon", help="serve render jobs over a local Unix socket"
+    )
+    daemon.add_argument(
+        "--socket", help="path of the socket, default is $FILLER_SOCKET"
+    )
+    daemon.add_argument("--workers", type=int, help="number of worker processes")
+    daemon.add_argument(
+        "--template",
+        action="append",
+        default=[],
+        help="template loaded by each worker on start, can be repeated",
+    )
+    daemon.add_argument("--engine", help="engine loading the templates")
+    daemon.add_argument(
+        "--compresslevel", type=int, help="deflate level of the templates"
+    )
+
+    for command, help in [
+        ("stats", "print the state of a daemon"),
+        ("reload", "restart the workers of a daemon"),
+        ("drain", "complete the jobs of a daemon, and stop it"),
+    ]:
+        commands.add_parser(command, help=help).add_argument(
+            "--socket", help="path of the socket, default is $FILLER_SOCKET"
+        )
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "daemon":
+            RenderDaemon(
+                args.socket,
+                args.workers,
+                args.template,
+                args.engine,
+                args.compresslevel,
+            ).serve_forever()
+            return 0
+
+        with DaemonClient(args.socket) as client:
+            print(json.dumps(client.request(args.command)))
+        return 0
+    except FillerError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
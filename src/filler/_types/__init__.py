@@ -7,7 +7,12 @@ from ._error import (
     FillTemplateNotExistError,
     FillOutputDirError,
     FillOutputNameError,
+    FillEngineError,
+    FillSchemaError,
+    FillShardError,
+    FillDaemonError,
 )
+from ._result import FillResult
 
 __all__ = [
     "FillerError",
@@ -18,4 +23,9 @@ __all__ = [
     "FillTemplateNotExistError",
     "FillOutputDirError",
     "FillOutputNameError",
+    "FillEngineError",
+    "FillSchemaError",
+    "FillShardError",
+    "FillDaemonError",
+    "FillResult",
 ]
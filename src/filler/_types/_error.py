@@ -6,6 +6,10 @@ __all__ = [
     "FillTemplateTypeError",
     "FillTemplateNotExistError",
     "FillOutputDirError",
+    "FillEngineError",
+    "FillSchemaError",
+    "FillShardError",
+    "FillDaemonError",
 ]
 
 
@@ -95,3 +99,61 @@ class FillOutputDirError(ParamError):
 
 class FillOutputNameError(ParamError):
     pass
+
+
+class FillEngineError(ParamError):
+    """
+    Exception raised for errors in the input.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(
+        self, message="It should be an engine supported by the template type!"
+    ):
+        self.message = message
+        super().__init__(self.message)
+
+
+class FillSchemaError(FillDataCollectionError):
+    """
+    Exception raised when the data does not match the schema of a fill.
+
+    Attributes:
+        message -- explanation of the error
+        issues -- the issues found, see SchemaIssue
+    """
+
+    def __init__(
+        self, message="It should hold the columns of the template!", issues=()
+    ):
+        self.message = message
+        self.issues = list(issues)
+        super().__init__(self.message)
+
+
+class FillShardError(ParamError):
+    """
+    Exception raised for errors in the input.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message="It should be one of the shards of the fill!"):
+        self.message = message
+        super().__init__(self.message)
+
+
+class FillDaemonError(FillerError):
+    """
+    Exception raised when talking to a render daemon fails.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message="It should be a render daemon listening on its socket!"):
+        self.message = message
+        super().__init__(self.message)
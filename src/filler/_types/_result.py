@@ -0,0 +1,22 @@
+from typing import Any, NamedTuple, Optional
+
+__all__ = [
+    "FillResult",
+]
+
+
+class FillResult(NamedTuple):
+    """
+    The result of filling one row into a template.
+
+    Attributes:
+        key -- the label of the row
+        path -- the output path, None if the fill failed
+        error -- the exception raised by the fill, None if it succeeded
+        skipped -- True if the output was already up to date, and the row was not filled again
+    """
+
+    key: Any
+    path: Optional[str]
+    error: Optional[BaseException] = None
+    skipped: bool = False
@@ -1,9 +1,34 @@
 from ._path import create_output_dir, create_output_path
-from ._utils import is_number, rand_float
-from ._fill import fill_docx, fill_xlsx  # , is_empty as gen_is_empty
+import importlib
+
+from ._utils import is_number, rand_float, is_series, is_dataframe
+from ._fill import fill_docx, fill_xlsx, load_template  # , is_empty as gen_is_empty
+from ._xlsxzip import XlsxZipRenderer
+from ._source import iter_rows, csv_rows, parquet_rows, cursor_rows
+from ._prepare import prepare_frame, prepare_row, prepare_rows
+from ._sink import Sink, DirectorySink, ZipSink, TarSink, Durability
+from ._metrics import Metrics, MetricsSummary
+from ._manifest import Manifest, fill_incremental, template_digest
+from ._rendercache import RenderCache
+from ._templatecache import TemplateCache, template_cache
+from ._async import render_bytes, run_limited, fill_async
+from ._parallel import fill_rows, fill_parallel
+from ._schema import (
+    Schema,
+    SchemaIssue,
+    template_placeholders,
+    validate_frame,
+    validate_data,
+)
+from ._shard import Shard, ShardManifest, shard_of, fill_shard, verify_shards
+from ._daemon import RenderDaemon, DaemonClient, default_socket
+from ._pipeline import Pipeline, iter_batches, fill_pipeline
+from ._consolidate import Consolidate, XlsxBook, DocxBook, fill_consolidated
+from ._options import FillOptions
 from ._check import (
     is_fill_row_type,
     is_fill_rows_type,
+    is_fill_rows_iter,
     is_template_type,
     is_dir,
     is_empty,
@@ -16,13 +41,80 @@ __all__ = [
     "create_output_path",
     "is_number",
     "rand_float",
+    "is_series",
+    "is_dataframe",
     "fill_docx",
     "fill_xlsx",
+    "load_template",
+    "DocxRenderer",
+    "XlsxRenderer",
+    "XlsxZipRenderer",
+    "DocxZipRenderer",
+    "iter_rows",
+    "csv_rows",
+    "parquet_rows",
+    "cursor_rows",
+    "prepare_frame",
+    "prepare_row",
+    "prepare_rows",
+    "Sink",
+    "DirectorySink",
+    "ZipSink",
+    "TarSink",
+    "Durability",
+    "Metrics",
+    "MetricsSummary",
+    "Manifest",
+    "fill_incremental",
+    "template_digest",
+    "RenderCache",
+    "TemplateCache",
+    "template_cache",
+    "render_bytes",
+    "run_limited",
+    "fill_async",
+    "fill_rows",
+    "fill_parallel",
+    "Schema",
+    "SchemaIssue",
+    "template_placeholders",
+    "validate_frame",
+    "validate_data",
+    "Shard",
+    "ShardManifest",
+    "shard_of",
+    "fill_shard",
+    "verify_shards",
+    "RenderDaemon",
+    "DaemonClient",
+    "default_socket",
+    "Pipeline",
+    "iter_batches",
+    "fill_pipeline",
+    "Consolidate",
+    "XlsxBook",
+    "DocxBook",
+    "fill_consolidated",
+    "FillOptions",
     "is_fill_row_type",
     "is_fill_rows_type",
+    "is_fill_rows_iter",
     "is_template_type",
     "is_dir",
     "is_empty",
     "is_output_name",
     # "gen_is_empty",
 ]
+
+# The renderers importing a template backend, loaded on first access
+_LAZY = {
+    "DocxRenderer": "._docx",
+    "XlsxRenderer": "._xlsx",
+    "DocxZipRenderer": "._docxzip",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
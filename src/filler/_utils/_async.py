@@ -0,0 +1,150 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+from .._types import FillResult
+from ._fill import fill_docx, fill_xlsx
+from ._sink import Sink
+from ._templatecache import TemplateCache, template_cache as shared_template_cache
+
+__all__ = [
+    "render_bytes",
+    "run_limited",
+    "fill_async",
+]
+
+# Returned by next() once the jobs are exhausted
+_DONE = object()
+
+
+def render_bytes(
+    data: Any,
+    template: str,
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    cache: Optional[TemplateCache] = None,
+) -> bytes:
+    """
+    Fill 'data' into a template loaded by a template cache, and return the filled file.
+    Run by the executors of fill_async, in threads or in worker processes.
+    :param data: Data to fill
+    :param template: Path to the template file
+    :param engine: Engine loading the template, see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param cache: The template cache, default is the one shared by the process
+    """
+    fillers = {
+        "docx": fill_docx,
+        "xlsx": fill_xlsx,
+    }
+
+    if cache is None:
+        cache = shared_template_cache
+    buffer = BytesIO()
+    with cache.checkout(template, engine, compresslevel) as renderer:
+        fillers[template[-4:]](data, renderer, buffer)
+    return buffer.getvalue()
+
+
+async def run_limited(
+    executor: Optional[Executor],
+    func: Callable,
+    *args,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Any:
+    """
+    Run func(*args) in 'executor', the default executor of the loop when None,
+    holding 'semaphore' if any while it runs.
+    """
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, func, *args)
+    async with semaphore:
+        return await loop.run_in_executor(executor, func, *args)
+
+
+async def fill_async(
+    jobs: Iterable,
+    template: str,
+    sink: Sink,
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    concurrency: int = 4,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    cache: Optional[TemplateCache] = None,
+) -> AsyncIterator[FillResult]:
+    """
+    Fill jobs into a template without blocking the event loop, and yield the results in job order.
+
+    Rows are read, and filled files written to the sink, in the default executor of the loop.
+    Rows are rendered in 'executor', a thread pool by default, or e.g. a ProcessPoolExecutor
+    whose workers each keep the template loaded. At most 'concurrency' rows are in flight, and
+    'semaphore', which can be shared by several fills, bounds the renders running at a time.
+
+    Closing the generator, or cancelling the task iterating over it, cancels the renders
+    which have not started yet; those already running complete in the background.
+    :param jobs: (row label, row data, output file name) tuples
+    :param template: Path to the template file
+    :param sink: Where the filled files are written
+    :param engine: Engine loading the template, see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param executor: Where the rows are rendered, default is the default executor of the loop
+    :param concurrency: Number of rows in flight
+    :param semaphore: Bounds the renders running at a time, default is 'concurrency'
+    :param cache: Template cache of the renders run in threads, default is a new one.
+        Worker processes use their own shared cache
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = semaphore or asyncio.Semaphore(concurrency)
+    if isinstance(executor, ProcessPoolExecutor):
+        cache = None
+    elif cache is None:
+        cache = TemplateCache()
+
+    async def render(key, data, name) -> Any:
+        try:
+            return await run_limited(
+                executor,
+                render_bytes,
+                data,
+                template,
+                engine,
+                compresslevel,
+                cache,
+                semaphore=semaphore,
+            )
+        except Exception as e:
+            return FillResult(key, None, e)
+
+    jobs = iter(jobs)
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                job = await loop.run_in_executor(None, next, jobs, _DONE)
+                if job is _DONE:
+                    exhausted = True
+                    break
+                pending.append((job, asyncio.ensure_future(render(*job))))
+
+            if not pending:
+                break
+
+            (key, _, name), task = pending.popleft()
+            result = await task
+            if not isinstance(result, FillResult):
+                try:
+                    location = await loop.run_in_executor(
+                        None, sink.write_bytes, name, result
+                    )
+                    result = FillResult(key, location)
+                except Exception as e:
+                    result = FillResult(key, None, e)
+            yield result
+    finally:
+        for _, task in pending:
+            task.cancel()
@@ -1,11 +1,16 @@
 import os
 from pathlib import Path
-from typing import Union, Dict, Any
-import pandas as pd
+from typing import TYPE_CHECKING, Union, Dict, Any, Iterable
+
+from ._utils import is_series, is_dataframe
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 __all__ = [
     "is_fill_row_type",
     "is_fill_rows_type",
+    "is_fill_rows_iter",
     "is_template_type",
     "is_dir",
     "is_empty",
@@ -13,7 +18,7 @@ __all__ = [
 ]
 
 
-def is_fill_row_type(value: Union[pd.Series, Dict[str, Any]]) -> bool:
+def is_fill_row_type(value: Union["pd.Series", Dict[str, Any]]) -> bool:
     """
     This function checks if the provided value is Union[pd.Series, Dict[str, Any]].
     In other words, it is a dictionary or a pandas Series.
@@ -24,6 +29,7 @@ def is_fill_row_type(value: Union[pd.Series, Dict[str, Any]]) -> bool:
     Returns:
     bool: True if all conditions are met, False otherwise.
 
+    >>> import pandas as pd
     >>> is_fill_row_type(pd.Series([1, 2, 3]))
     True
     >>> is_fill_row_type({"a":1, "b":2, "c":3})
@@ -33,13 +39,13 @@ def is_fill_row_type(value: Union[pd.Series, Dict[str, Any]]) -> bool:
 
     """
 
-    if isinstance(value, (pd.Series, Dict)):
+    if is_series(value) or isinstance(value, Dict):
         return True
     else:
         return False
 
 
-def is_fill_rows_type(value: Union[pd.DataFrame, Dict[str, Dict[str, Any]]]) -> bool:
+def is_fill_rows_type(value: Union["pd.DataFrame", Dict[str, Dict[str, Any]]]) -> bool:
     """
     This function checks if the provided value is Union[ pd.DataFrame, Dict[str, Dict[str, Any]] ].
     In other words, it is a DataFrame or a two-layer nested dictionary.
@@ -50,6 +56,7 @@ def is_fill_rows_type(value: Union[pd.DataFrame, Dict[str, Dict[str, Any]]]) ->
     Returns:
     bool: True if all conditions are met, False otherwise.
 
+    >>> import pandas as pd
     >>> is_fill_rows_type(pd.DataFrame(data={"A": [1, 2, 3], "B": [4, 5, 6]}))
     True
     >>> is_fill_rows_type({"A": {"1": 1}, "B": {"2": 2}})
@@ -58,7 +65,7 @@ def is_fill_rows_type(value: Union[pd.DataFrame, Dict[str, Dict[str, Any]]]) ->
     False
     """
 
-    if isinstance(value, pd.DataFrame):
+    if is_dataframe(value):
         return True
     elif isinstance(value, Dict):
         if all(isinstance(val, Dict) for val in value.values()):
@@ -67,6 +74,32 @@ def is_fill_rows_type(value: Union[pd.DataFrame, Dict[str, Dict[str, Any]]]) ->
     return False
 
 
+def is_fill_rows_iter(value: Any) -> bool:
+    """
+    This function checks if the provided value is an iterable of rows, which is read lazily.
+    In other words, it is iterable but is neither a string, a dictionary nor a pandas object.
+
+    Args:
+    value: The value to check.
+
+    Returns:
+    bool: True if all conditions are met, False otherwise.
+
+    >>> is_fill_rows_iter(iter([{"A": 1}]))
+    True
+    >>> import pandas as pd
+    >>> is_fill_rows_iter(pd.DataFrame(data={"A": [1, 2, 3]}))
+    False
+    >>> is_fill_rows_iter("A")
+    False
+    """
+
+    if isinstance(value, (str, bytes, Dict)) or is_dataframe(value) or is_series(value):
+        return False
+
+    return isinstance(value, Iterable)
+
+
 def is_template_type(filename: str) -> bool:
     """
     This function checks if the provided file matches the allowed template types.
@@ -118,7 +151,7 @@ def is_dir(dir: str) -> bool:
     return os.path.isdir(dir)
 
 
-def is_empty(value: Union[pd.DataFrame, pd.Series, Dict[str, Any]]) -> bool:
+def is_empty(value: Union["pd.DataFrame", "pd.Series", Dict[str, Any]]) -> bool:
     """
     This function checks whether the provided value is empty.
 
@@ -128,6 +161,7 @@ def is_empty(value: Union[pd.DataFrame, pd.Series, Dict[str, Any]]) -> bool:
     Returns:
     bool: True if the value is empty, False otherwise.
 
+    >>> import pandas as pd
     >>> is_empty(pd.DataFrame())
     True
     >>> is_empty(pd.Series(dtype='float64'))
@@ -138,7 +172,7 @@ def is_empty(value: Union[pd.DataFrame, pd.Series, Dict[str, Any]]) -> bool:
     False
     """
 
-    if isinstance(value, (pd.DataFrame, pd.Series)):
+    if is_dataframe(value) or is_series(value):
         return value.empty
     if isinstance(value, Dict):
         return not bool(value)
@@ -0,0 +1,720 @@
+import html
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from xml.etree import ElementTree
+
+from .._types import (
+    FillEngineError,
+    FillOutputNameError,
+    FillResult,
+    FillTemplateTypeError,
+)
+from ._fill import load_template
+from ._metrics import Metrics, timed
+from ._sink import DirectorySink, Sink, remove_file, temporary_path
+from ._xlsxzip import MAIN_NS, REL_NS, read_sheets
+from ._zip import write_raw
+
+__all__ = [
+    "Consolidate",
+    "XlsxBook",
+    "DocxBook",
+    "fill_consolidated",
+]
+
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+WORKSHEET_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+)
+CONTENT_TYPES_NAME = "[Content_Types].xml"
+CALC_CHAIN_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/calcChain"
+)
+# The relationships of a worksheet whose targets its copies can share
+SHARED_SHEET_RELATIONSHIPS = {
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink",
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/printerSettings",
+}
+
+SHEETS_PATTERN = re.compile(rb"<sheets\b[^>]*?(?:/>|>.*?</sheets>)", re.DOTALL)
+DEFINED_NAMES_PATTERN = re.compile(
+    rb"<definedNames\b[^>]*?(?:/>|>.*?</definedNames>)", re.DOTALL
+)
+# The sheet shown first, which the copies of the worksheets do not keep
+VIEW_ATTR_PATTERN = re.compile(rb'\s(?:activeTab|firstSheet|tabSelected)="[^"]*"')
+RELATIONSHIP_PATTERN = re.compile(rb"<Relationship\b[^>]*>")
+RELATIONSHIPS_END = b"</Relationships>"
+OVERRIDE_PATTERN = re.compile(rb"<Override\b[^>]*>")
+TYPES_END = b"</Types>"
+ATTR_PATTERN = re.compile(rb'([\w:]+)="([^"]*)"')
+
+BODY_PATTERN = re.compile(rb"(<w:body\b[^>]*>)(.*)(</w:body>)", re.DOTALL)
+SECTION_PATTERN = re.compile(rb"<w:sectPr\b(?:[^>]*/>|.*?</w:sectPr>)\s*$", re.DOTALL)
+# The id of a drawing, unique in a document, see DocxTemplate.fix_docpr_ids
+DRAWING_ID_PATTERN = re.compile(rb'(<wp:docPr\b[^>]*?\sid=")(\d+)(")')
+
+# A reference to a sheet in a formula, quoted or not, e.g. "'My Sheet'!" or 'Sheet1!'
+SHEET_REF_PATTERN = re.compile(r"'((?:[^']|'')+)'!|(?<![\w.])([^\W\d][\w.]*)!")
+
+# Characters which are not allowed in sheet names, and their largest length
+SHEET_NAME_PATTERN = re.compile(r"[\[\]:*?/\\]")
+SHEET_NAME_LENGTH = 31
+
+
+class Consolidate(NamedTuple):
+    """
+    Fill the rows of a batch into a few consolidated files, rather than one file per row:
+    a copy of the worksheets of a xlsx template, or of the body of a docx template, per row.
+
+    Attributes:
+        name -- the name of the consolidated files, without extension, formatted with
+            their 'index', from 1, default is 'filled_{index:04d}'
+        rows_per_file -- the rows filled into a file, the next rows go into the next file,
+            default is every row in one file
+    """
+
+    name: str = "filled_{index:04d}"
+    rows_per_file: Optional[int] = None
+
+    def check(self):
+        """
+        Raise a FillOutputNameError if the consolidated files can not be named.
+        """
+        if self.rows_per_file is not None and not (
+            isinstance(self.rows_per_file, int) and self.rows_per_file > 0
+        ):
+            raise FillOutputNameError(
+                f"The rows per file {self.rows_per_file!r} are incorrect!"
+                "It should be a positive integer, or None for a single file!"
+            )
+        self.file_name(1, "xlsx")
+
+    def file_name(self, index: int, extension: str) -> str:
+        """
+        The name, with extension, of the consolidated file at 'index', from 1.
+        """
+        try:
+            name = self.name.format(index=index)
+        except (KeyError, IndexError, ValueError) as e:
+            raise FillOutputNameError(
+                f"The consolidated file name {self.name!r} is incorrect! "
+                f"It can only be formatted with its index: {e!r}"
+            ) from e
+        return f"{name}.{extension}"
+
+
+class TemplateSheet(NamedTuple):
+    """
+    A worksheet of a xlsx template, copied for each row of a consolidated workbook.
+
+    Attributes:
+        title -- its name in the template
+        name -- its part name
+        state -- its visibility, None when it is visible
+        rels -- the part name of its relationships, None when it has none
+        relationship -- the type of the relationship of the workbook to it
+        content_type -- its content type
+    """
+
+    title: str
+    name: str
+    state: Optional[str]
+    rels: Optional[str]
+    relationship: str
+    content_type: str
+
+
+class XlsxBook:
+    """
+    A workbook consolidating rows filled into a xlsx template, with a copy of the
+    worksheets of the template per row, written to a zip package as rows are added.
+
+    Each row adds a copy of every worksheet of the template, named after the row, and
+    filled like XlsxZipRenderer fills them. The other parts of the template, e.g. its
+    styles and shared strings, are written once, when the workbook is closed. The defined
+    names of the template, e.g. print areas, are copied for each row, scoped to its
+    copies of the worksheets and referencing them: a name of the workbook is defined in
+    every copy of the row. The calculation chain is left out. Worksheets related to other
+    parts than hyperlinks and printer settings, e.g. to tables or drawings, can not be copied.
+    """
+
+    def __init__(self, renderer, file: IO[bytes], metrics: Optional[Metrics] = None):
+        """
+        :param renderer: The template, loaded by XlsxZipRenderer
+        :param file: Writable binary stream of the workbook
+        :param metrics: Receives the rows_repeated counter, see Metrics
+        """
+        self.renderer = renderer
+        self.metrics = metrics
+        self.parts = {member.info.filename: member for member in renderer.members}
+
+        workbook = ElementTree.fromstring(self.parts["xl/workbook.xml"].blob)
+        states = {
+            sheet.get("name"): sheet.get("state")
+            for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet")
+        }
+        titles = list(states)
+        # Relationship type, by part name, of the parts related to the workbook
+        self.relationships = {
+            relationship_target(rel.get("Target")): rel.get("Type")
+            for rel in ElementTree.fromstring(
+                self.parts["xl/_rels/workbook.xml.rels"].blob
+            )
+        }
+        # Content type, by part name, of the parts overriding the default ones
+        content_types = {
+            override.get("PartName")[1:]: override.get("ContentType")
+            for override in ElementTree.fromstring(
+                self.parts[CONTENT_TYPES_NAME].blob
+            ).iter(f"{{{CONTENT_TYPES_NS}}}Override")
+        }
+
+        self.sheets: List[TemplateSheet] = []
+        for title, name in read_sheets(
+            {name: member.blob for name, member in self.parts.items()}
+        ):
+            rels = rels_name(name)
+            if rels in self.parts:
+                check_shared_relationships(name, self.parts[rels].blob)
+            else:
+                rels = None
+            self.sheets.append(
+                TemplateSheet(
+                    title,
+                    name,
+                    states.get(title),
+                    rels,
+                    self.relationships[name],
+                    content_types.get(name, WORKSHEET_CONTENT_TYPE),
+                )
+            )
+
+        # (attributes but the scope, sheet title of the scope, formula) of each defined name
+        self.defined_names: List[Tuple[Dict[str, str], Optional[str], str]] = []
+        for defined_name in workbook.iter(f"{{{MAIN_NS}}}definedName"):
+            attrs = dict(defined_name.attrib)
+            scope = attrs.pop("localSheetId", None)
+            if scope is not None:
+                if not scope.isdigit() or int(scope) >= len(titles):
+                    continue
+                scope = titles[int(scope)]
+            self.defined_names.append((attrs, scope, defined_name.text or ""))
+
+        self.zout = zipfile.ZipFile(file, "w")
+        # (sheet name, part name, template sheet) of each worksheet of the workbook
+        self.written: List[Tuple[str, str, TemplateSheet]] = []
+        self._names = set()
+        self._count = 0
+
+    def add(self, title: str, data: Any):
+        """
+        Fill a row into copies of the worksheets of the template, named after 'title'.
+        :param title: Name of the row, e.g. its output file name
+        :param data: Data to fill, can be of type pandas.Series or dict
+        """
+        rendered = self.renderer.render_parts(data, self.metrics)
+        sheets = []
+        for sheet in self.sheets:
+            self._count += 1
+            name = posixpath.join(
+                posixpath.dirname(sheet.name), f"sheet{self._count}.xml"
+            )
+            member = self.parts[sheet.name]
+            info = zipfile.ZipInfo(name, member.info.date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info._compresslevel = self.renderer.compresslevel
+            with self.zout.open(info, "w") as f:
+                for chunk in unselect(rendered.get(sheet.name, member.blob)):
+                    f.write(chunk)
+            if sheet.rels is not None:
+                member = self.parts[sheet.rels]
+                self.zout.writestr(
+                    zipfile.ZipInfo(rels_name(name), member.info.date_time),
+                    member.blob,
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+            sheets.append((name, sheet))
+
+        # Only name the worksheets of a row once all of them are written
+        for name, sheet in sheets:
+            sheet_title = title if len(self.sheets) == 1 else f"{title} {sheet.title}"
+            self.written.append((self.sheet_name(sheet_title), name, sheet))
+
+    def sheet_name(self, title: str) -> str:
+        """
+        Return a valid sheet name for 'title', distinct from those of the workbook.
+        """
+        name = SHEET_NAME_PATTERN.sub("_", title).strip("'") or "Sheet"
+        candidate = name[:SHEET_NAME_LENGTH]
+        number = 1
+        while candidate.lower() in self._names:
+            number += 1
+            suffix = f" ({number})"
+            candidate = name[: SHEET_NAME_LENGTH - len(suffix)] + suffix
+        self._names.add(candidate.lower())
+        return candidate
+
+    def close(self):
+        """
+        Write the other parts of the template, listing the worksheets of the rows, and
+        close the workbook.
+        """
+        try:
+            self.write_parts()
+        finally:
+            self.zout.close()
+
+    def write_parts(self):
+        # The worksheets of the template and their relationships, and the calculation chain
+        left_out = {sheet.name for sheet in self.sheets}
+        left_out.update(sheet.rels for sheet in self.sheets if sheet.rels is not None)
+        left_out.update(
+            name
+            for name, relationship in self.relationships.items()
+            if relationship == CALC_CHAIN_TYPE
+        )
+
+        sheets = []
+        relationships = []
+        overrides = []
+        for number, (title, name, sheet) in enumerate(self.written, 1):
+            attrs = f'name="{html.escape(title)}" sheetId="{number}"'
+            if sheet.state:
+                attrs += f' state="{html.escape(sheet.state)}"'
+            sheets.append(
+                f'<sheet xmlns:r="{REL_NS}" {attrs} r:id="rIdFillerSheet{number}"/>'
+            )
+            relationships.append(
+                f'<Relationship Id="rIdFillerSheet{number}" '
+                f'Type="{sheet.relationship}" Target="/{name}"/>'
+            )
+            overrides.append(
+                f'<Override PartName="/{name}" ContentType="{sheet.content_type}"/>'
+            )
+
+        workbook = self.parts["xl/workbook.xml"].blob
+        workbook = SHEETS_PATTERN.sub(
+            lambda _: f"<sheets>{''.join(sheets)}</sheets>".encode("utf-8"),
+            workbook,
+            count=1,
+        )
+        workbook = DEFINED_NAMES_PATTERN.sub(
+            lambda _: self.write_defined_names().encode("utf-8"), workbook, count=1
+        )
+        workbook = VIEW_ATTR_PATTERN.sub(b"", workbook)
+
+        rels = self.parts["xl/_rels/workbook.xml.rels"].blob
+        rels = RELATIONSHIP_PATTERN.sub(
+            lambda match: (
+                b""
+                if relationship_target(
+                    dict(ATTR_PATTERN.findall(match.group(0)))[b"Target"].decode(
+                        "utf-8"
+                    )
+                )
+                in left_out
+                else match.group(0)
+            ),
+            rels,
+        )
+        rels = rels.replace(
+            RELATIONSHIPS_END,
+            "".join(relationships).encode("utf-8") + RELATIONSHIPS_END,
+        )
+
+        types = self.parts[CONTENT_TYPES_NAME].blob
+        types = OVERRIDE_PATTERN.sub(
+            lambda match: (
+                b""
+                if dict(ATTR_PATTERN.findall(match.group(0)))[b"PartName"][1:].decode(
+                    "utf-8"
+                )
+                in left_out
+                else match.group(0)
+            ),
+            types,
+        )
+        types = types.replace(TYPES_END, "".join(overrides).encode("utf-8") + TYPES_END)
+
+        rewritten = {
+            "xl/workbook.xml": workbook,
+            "xl/_rels/workbook.xml.rels": rels,
+            CONTENT_TYPES_NAME: types,
+        }
+        for name, member in self.parts.items():
+            if name in left_out:
+                continue
+            if name in rewritten:
+                self.zout.writestr(
+                    member.info,
+                    rewritten[name],
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=self.renderer.compresslevel,
+                )
+            else:
+                write_raw(self.zout, member)
+
+    def write_defined_names(self) -> str:
+        """
+        Return the defined names of the workbook: those of the template, for each row,
+        scoped to its copies of the worksheets.
+        """
+        if not self.defined_names or not self.sheets:
+            return ""
+        names = []
+        # The rows add a copy of every worksheet, in the order of the template
+        count = len(self.sheets)
+        for start in range(0, len(self.written), count):
+            copies = self.written[start : start + count]
+            titles = {sheet.title: title for title, _, sheet in copies}
+            for attrs, scope, formula in self.defined_names:
+                if scope is not None and scope not in titles:
+                    continue
+                formula = rename_sheets(formula, titles)
+                for index, (_, _, sheet) in enumerate(copies, start):
+                    if scope is not None and sheet.title != scope:
+                        continue
+                    scoped = {**attrs, "localSheetId": str(index)}
+                    names.append(
+                        "<definedName %s>%s</definedName>"
+                        % (
+                            " ".join(
+                                f'{name}="{html.escape(value)}"'
+                                for name, value in scoped.items()
+                            ),
+                            html.escape(formula, quote=False),
+                        )
+                    )
+        return f"<definedNames>{''.join(names)}</definedNames>"
+
+
+class DocxBook:
+    """
+    A document consolidating rows filled into a docx template, with a copy of the body
+    of the template per row, each in its own section, written to a zip package as rows
+    are added.
+
+    The bodies are filled like DocxZipRenderer fills them, and each row starts a new
+    section, on a new page, with the section properties of the template. The drawings
+    of each row are numbered after those of the previous rows. The headers, footers,
+    footnotes and core properties are shared by the sections: templates holding
+    placeholders in them can not be consolidated, nor rows holding values which add
+    parts to the package (InlineImage, Subdoc).
+    """
+
+    def __init__(self, renderer, file: IO[bytes], metrics: Optional[Metrics] = None):
+        """
+        :param renderer: The template, loaded by DocxZipRenderer
+        :param file: Writable binary stream of the document
+        :param metrics: Unused, for symmetry with XlsxBook
+        """
+        from ._docxzip import member_name
+
+        if renderer.shared_placeholders:
+            raise FillTemplateTypeError(
+                f"The template {renderer.template} can not be filled into a consolidated "
+                "document, its sections share the parts holding placeholders: "
+                f"{', '.join(renderer.shared_placeholders)}!"
+            )
+        self.renderer = renderer
+        self.metrics = metrics
+        self.body = member_name(renderer.doc.docx._part)
+        self.zout = zipfile.ZipFile(file, "w")
+        self._stream = None
+        self._suffix = b""
+        # The section properties of the previous row, which close its section
+        self._section = None
+        # The last id of the drawings of the document
+        self._drawing_id = 0
+
+    def add(self, title: str, data: Any):
+        """
+        Fill a row into a copy of the body of the template, in a new section.
+        :param title: Name of the row, unused: sections have no name
+        :param data: Data to fill, a dict
+        """
+        from ._docxzip import InlineImage, Subdoc
+
+        if any(isinstance(value, (InlineImage, Subdoc)) for value in data.values()):
+            raise FillEngineError(
+                "Values adding parts to the document (InlineImage, Subdoc) "
+                "can not be filled into a consolidated document!"
+            )
+        parts = self.renderer.render_parts(data)
+        match = BODY_PATTERN.search(parts.pop(self.body))
+        content = match.group(2)
+        section = SECTION_PATTERN.search(content)
+        if section is not None:
+            content = content[: section.start()]
+            section = section.group(0)
+
+        if self._stream is None:
+            self.open(parts, match.string[: match.end(1)])
+            self._suffix = match.string[match.start(3) :]
+        elif self._section is not None:
+            self._stream.write(b"<w:p><w:pPr>" + self._section + b"</w:pPr></w:p>")
+        else:
+            self._stream.write(b'<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        self._stream.write(DRAWING_ID_PATTERN.sub(self.drawing_id, content))
+        self._section = section
+
+    def drawing_id(self, match: "re.Match") -> bytes:
+        """
+        Number a drawing of a row after the drawings of the document so far.
+        """
+        self._drawing_id += 1
+        return b"%s%d%s" % (match.group(1), self._drawing_id, match.group(3))
+
+    def open(self, parts: Dict[str, bytes], prefix: bytes):
+        """
+        Write the parts of the package, filled with the first row, and open the body.
+        The drawings of the body are numbered after those of the other parts.
+        """
+        for member in self.renderer.members:
+            name = member.info.filename
+            if name == self.body:
+                continue
+            for match in DRAWING_ID_PATTERN.finditer(parts.get(name, member.blob)):
+                self._drawing_id = max(self._drawing_id, int(match.group(2)))
+            if name in parts:
+                self.zout.writestr(
+                    member.info,
+                    parts[name],
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=self.renderer.compresslevel,
+                )
+            else:
+                write_raw(self.zout, member)
+
+        info = zipfile.ZipInfo(self.body, (1980, 1, 1, 0, 0, 0))
+        for member in self.renderer.members:
+            if member.info.filename == self.body:
+                info = zipfile.ZipInfo(self.body, member.info.date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info._compresslevel = self.renderer.compresslevel
+        self._stream = self.zout.open(info, "w")
+        self._stream.write(prefix)
+
+    def close(self):
+        """
+        Close the last section, the body and the document.
+        """
+        try:
+            if self._stream is not None:
+                self._stream.write((self._section or b"") + self._suffix)
+                self._stream.close()
+        finally:
+            self.zout.close()
+
+
+def rels_name(name: str) -> str:
+    """
+    The name of the relationships part of the part 'name'.
+
+    >>> rels_name("xl/worksheets/sheet1.xml")
+    'xl/worksheets/_rels/sheet1.xml.rels'
+    """
+    directory, base = posixpath.split(name)
+    return posixpath.join(directory, "_rels", f"{base}.rels")
+
+
+def rename_sheets(formula: str, titles: Dict[str, str]) -> str:
+    """
+    Replace the references to the sheets 'titles' in a formula by references to their new titles.
+
+    >>> rename_sheets("Data!$A$1:$B$2,'My Data'!A1,Other!A1", {"Data": "a", "My Data": "b's"})
+    "'a'!$A$1:$B$2,'b''s'!A1,Other!A1"
+    """
+
+    def rename(match: "re.Match") -> str:
+        title = match.group(2) or match.group(1).replace("''", "'")
+        if title not in titles:
+            return match.group(0)
+        return "'%s'!" % titles[title].replace("'", "''")
+
+    return SHEET_REF_PATTERN.sub(rename, formula)
+
+
+def relationship_target(target: str) -> str:
+    """
+    The part name of the target of a relationship of the workbook.
+    """
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join("xl", target))
+
+
+def check_shared_relationships(name: str, rels: bytes):
+    """
+    Raise a FillTemplateTypeError if the copies of a worksheet can not share its relationships.
+    """
+    for rel in ElementTree.fromstring(rels).iter(f"{{{PACKAGE_REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        if rel.get("Type") not in SHARED_SHEET_RELATIONSHIPS:
+            raise FillTemplateTypeError(
+                f"The worksheet {name} of the template can not be copied into a "
+                f"consolidated workbook, it is related to {rel.get('Target')}!"
+            )
+
+
+def unselect(xml: Any) -> Iterator[bytes]:
+    """
+    Yield the chunks of a worksheet, which is not the selected one anymore.
+    """
+    if isinstance(xml, bytes):
+        yield VIEW_ATTR_PATTERN.sub(b"", xml, count=1)
+        return
+    first = True
+    for chunk in xml:
+        if first:
+            # The sheet views come before the rows, in the first chunk
+            chunk = VIEW_ATTR_PATTERN.sub(b"", chunk, count=1)
+            first = False
+        yield chunk
+
+
+def fill_consolidated(
+    jobs: Iterable,
+    template: str,
+    sink: Sink,
+    consolidate: Consolidate,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+) -> Iterator[FillResult]:
+    """
+    Fill jobs into consolidated files, rolling over to the next file every
+    'rows_per_file' rows, and yield the results in job order, see Consolidate.
+    Each file is written to a temporary file while its rows are filled, and handed
+    to the sink once complete: the result of a row is where its file will be. When the
+    jobs raise, or the results are not all consumed, the file being filled is discarded.
+    :param jobs: (row label, row data, output file name) tuples, the output file name
+        names the sheets of the row in a workbook
+    :param template: Path to the template file, rendered by its 'zip' engine
+    :param sink: Where the consolidated files are written
+    :param consolidate: How the files are named, and how many rows they hold
+    :param compresslevel: Deflate level of the filled parts, see load_template
+    :param metrics: Receives the timings of each phase and the counters, see Metrics
+    """
+    consolidate.check()
+    extension = template[-4:]
+    renderer = load_template(template, "zip", compresslevel, metrics)
+    books = {"xlsx": XlsxBook, "docx": DocxBook}
+
+    index = 0
+    book = None
+    file = None
+    try:
+        for key, data, name in jobs:
+            if book is None:
+                index += 1
+                file = ConsolidatedFile(sink, consolidate.file_name(index, extension))
+                book = books[extension](renderer, file.stream, metrics)
+                rows = 0
+            try:
+                title = posixpath.splitext(posixpath.basename(name))[0]
+                with timed(metrics, "render"):
+                    book.add(title, data)
+                result = FillResult(key, file.location)
+                rows += 1
+            except Exception as e:
+                result = FillResult(key, None, e)
+            if metrics is not None:
+                metrics.count("rows")
+                if result.error is not None:
+                    metrics.count("errors")
+
+            if rows == consolidate.rows_per_file:
+                with timed(metrics, "save"):
+                    book.close()
+                    file.commit(metrics)
+                book = None
+            yield result
+    except BaseException:
+        if book is not None:
+            try:
+                book.close()
+            except Exception:
+                pass
+            file.discard()
+        raise
+
+    if book is not None:
+        with timed(metrics, "save"):
+            book.close()
+            if rows:
+                file.commit(metrics)
+            else:
+                file.discard()
+
+
+class ConsolidatedFile:
+    """
+    A consolidated file being written, to a temporary file, which becomes the file
+    once complete: moved in place in the directory of a DirectorySink, handed to the
+    sink otherwise.
+    """
+
+    def __init__(self, sink: Sink, name: str):
+        self.sink = sink
+        self.name = name
+        if isinstance(sink, DirectorySink):
+            self.location = os.path.join(sink.output_dir, name)
+            self.temporary = temporary_path(self.location)
+            self.stream = open(self.temporary, "wb")
+        else:
+            self.location = name
+            self.stream = tempfile.TemporaryFile()
+
+    def commit(self, metrics: Optional[Metrics] = None):
+        """
+        Make the temporary file the consolidated file.
+        """
+        if metrics is not None:
+            metrics.count("bytes_written", self.stream.tell())
+        if isinstance(self.sink, DirectorySink):
+            self.stream.close()
+            self.sink.commit(self.temporary, self.location)
+            return
+        try:
+            self.stream.seek(0)
+            self.location = self.sink.write(self.name, self.copy)
+        finally:
+            self.stream.close()
+
+    def discard(self):
+        """
+        Remove the temporary file, of a consolidated file without any row, or not complete.
+        """
+        self.stream.close()
+        if isinstance(self.sink, DirectorySink):
+            remove_file(self.temporary)
+
+    def copy(self, target: Any):
+        if isinstance(target, str):
+            with open(target, "wb") as f:
+                shutil.copyfileobj(self.stream, f)
+        else:
+            shutil.copyfileobj(self.stream, target)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
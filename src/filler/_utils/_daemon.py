@@ -0,0 +1,522 @@
+import builtins
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .. import _types
+from .._types import FillDaemonError
+from ._async import render_bytes
+from ._fill import ENGINES
+from ._sink import DirectorySink
+from ._templatecache import template_cache
+
+__all__ = [
+    "RenderDaemon",
+    "DaemonClient",
+    "default_socket",
+]
+
+# The lengths of a frame, followed by the frame: a JSON message, then the bytes it carries
+FRAME = struct.Struct(">II")
+
+# The credentials of the peer of a Unix socket, see SO_PEERCRED: pid, uid and gid
+PEER_CREDENTIALS = struct.Struct("3i")
+
+# How long a connection waits for a request before checking whether the daemon drains, in seconds
+POLL = 0.5
+
+
+def default_socket() -> str:
+    """
+    Return the path of the socket of the daemon: $FILLER_SOCKET, or a socket in the
+    runtime directory of the user, see runtime_directory.
+    """
+    socket_path = os.environ.get("FILLER_SOCKET")
+    if socket_path:
+        return socket_path
+    return os.path.join(runtime_directory(), "filler.sock")
+
+
+def runtime_directory() -> str:
+    """
+    Return a directory only the user can access: $XDG_RUNTIME_DIR, or a directory of the
+    user in the temporary directory, created with mode 0700 if missing.
+    Raise a FillDaemonError if the directory is owned by someone else, or other users
+    can access it.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if not directory:
+        directory = os.path.join(tempfile.gettempdir(), f"filler-{os.geteuid()}")
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+    status = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.geteuid()
+        or status.st_mode & 0o077
+    ):
+        raise FillDaemonError(
+            f"The directory of the socket {directory} is not private!"
+            "It should be a directory owned by the user, with mode 0700!"
+        )
+    return directory
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """
+    Return the user id of the process at the other end of a Unix socket,
+    None when the platform does not tell it.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    credentials = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, PEER_CREDENTIALS.size
+    )
+    _, uid, _ = PEER_CREDENTIALS.unpack(credentials)
+    return uid
+
+
+def plain_value(value: Any) -> Any:
+    """
+    Return the JSON value of a numpy scalar, e.g. a value of a pandas Series,
+    raise a TypeError for other values which are not JSON values.
+    """
+    if hasattr(value, "item") and hasattr(value, "dtype"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not a JSON value")
+
+
+def error_message(error: BaseException) -> Dict[str, str]:
+    """
+    Return the message sent for an exception: its type and its message.
+    """
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+def rebuild_error(error: Dict[str, str]) -> Exception:
+    """
+    Return the exception of an error message: the filler error, or the builtin exception,
+    of the same name, else a FillDaemonError.
+    """
+    name, message = error["type"], error["message"]
+    error_type = getattr(_types, name, None) or getattr(builtins, name, None)
+    if isinstance(error_type, type) and issubclass(error_type, Exception):
+        try:
+            return error_type(message)
+        except TypeError:
+            pass
+    return FillDaemonError(f"{name}: {message}")
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any], blob: bytes = b""):
+    """
+    Send a message, and the bytes it carries, as a frame.
+    """
+    encoded = json.dumps(message, default=plain_value).encode("utf-8")
+    sock.sendall(FRAME.pack(len(encoded), len(blob)) + encoded)
+    if blob:
+        sock.sendall(blob)
+
+
+def receive_exactly(sock: socket.socket, size: int) -> bytes:
+    """
+    Receive 'size' bytes, fewer only when the peer closed the connection.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            break
+        received += count
+    return bytes(view[:received])
+
+
+def receive_message(sock: socket.socket) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """
+    Receive a frame and return its message and the bytes it carries,
+    None when the peer closed the connection.
+    """
+    header = receive_exactly(sock, FRAME.size)
+    if not header:
+        return None
+    if len(header) < FRAME.size:
+        raise FillDaemonError("The connection closed in the middle of a frame!")
+    size, blob_size = FRAME.unpack(header)
+    frame = receive_exactly(sock, size + blob_size)
+    if len(frame) < size + blob_size:
+        raise FillDaemonError("The connection closed in the middle of a frame!")
+    try:
+        message = json.loads(frame[:size].decode("utf-8"))
+    except ValueError as e:
+        raise FillDaemonError(f"The frame is not a JSON message: {e}") from e
+    if not isinstance(message, dict):
+        raise FillDaemonError("The frame is not a JSON object!")
+    return message, frame[size:]
+
+
+def warm_worker(
+    templates: Iterable[str], engine: Optional[str], compresslevel: Optional[int]
+):
+    """
+    Import the backends of every engine, and load 'templates' into the template cache
+    of the worker process, before it receives any job.
+    """
+    for engines in ENGINES.values():
+        for renderer in engines.values():
+            module, _ = renderer.split(".")
+            importlib.import_module(f".{module}", __package__)
+    for template in templates:
+        template_cache.get(template, engine, compresslevel)
+
+
+def render_job(
+    data: Any,
+    template: str,
+    engine: Optional[str],
+    compresslevel: Optional[int],
+    output: Optional[str],
+) -> Union[str, bytes]:
+    """
+    Fill 'data' into a template of the template cache of the worker process, and write
+    the filled file to 'output', or return its content when 'output' is None.
+    """
+    blob = render_bytes(data, template, engine, compresslevel)
+    if output is None:
+        return blob
+    sink = DirectorySink(os.path.dirname(output), remove_stale=False)
+    return sink.write_bytes(os.path.basename(output), blob)
+
+
+class RenderDaemon:
+    """
+    A pool of worker processes keeping the backends imported and the templates parsed,
+    serving render jobs over a local Unix socket, so that short-lived processes fill
+    templates without paying the import and the parsing of the templates themselves.
+
+    Each connection sends requests, and receives their responses, in order: frames of the
+    4 bytes big-endian lengths of a JSON object and of the bytes following it.
+    Requests hold an 'op', one of:
+        render -- fill 'data', plain JSON values, into 'template', with 'engine' and
+            'compresslevel', and write it to 'output', or return its content, the bytes
+            of the frame, when 'output' is None
+        ping, stats -- the state of the daemon
+        reload -- start new worker processes, which import filler and the backends again,
+            e.g. to pick new code up; the jobs of the previous ones complete first
+        drain -- stop accepting connections and requests, complete the jobs in progress, and exit
+    Responses hold 'ok', and either 'result', 'content' when the result is the bytes of
+    the frame, or 'error', the 'type' and 'message' of the exception raised.
+
+    The socket is only accessible to the user running the daemon, and connections of
+    other users are closed, see peer_uid.
+    SIGTERM drains the daemon, and SIGHUP reloads it, when it serves in the main thread.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        templates: Iterable[str] = (),
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+    ):
+        """
+        :param socket_path: Path of the socket, default is default_socket()
+        :param workers: Number of worker processes, default is the number of CPUs
+        :param templates: Templates loaded by each worker before it receives any job
+        :param engine: Engine loading 'templates', see load_template
+        :param compresslevel: Deflate level of 'templates', see load_template
+        """
+        self.socket_path = socket_path or default_socket()
+        self.workers = workers or os.cpu_count() or 1
+        self.templates = [os.path.abspath(template) for template in templates]
+        self.engine = engine
+        self.compresslevel = compresslevel
+        self.generation = 0
+        self.jobs = 0
+        self.errors = 0
+        self.draining = threading.Event()
+        self._lock = threading.Lock()
+        self._executor = self.start_workers()
+        self._server = None
+
+    def start_workers(self) -> ProcessPoolExecutor:
+        # Spawned, not forked, so that they do not inherit the modules of the daemon
+        return ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_worker,
+            initargs=(self.templates, self.engine, self.compresslevel),
+        )
+
+    def serve_forever(self):
+        """
+        Accept connections until the daemon is drained.
+        """
+        remove_stale_socket(self.socket_path)
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon.handle(self.request)
+
+        server = socketserver.ThreadingUnixStreamServer(
+            self.socket_path, Handler, bind_and_activate=False
+        )
+        server.daemon_threads = False
+        server.server_bind()
+        # Only the user running the daemon can connect: the default socket is in a private
+        # directory, see runtime_directory, and each connection checks its peer, see peer_uid
+        os.chmod(self.socket_path, 0o600)
+        server.server_activate()
+        self._server = server
+        if self.draining.is_set():
+            self.drain()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.drain())
+            if hasattr(signal, "SIGHUP"):
+                signal.signal(signal.SIGHUP, lambda *_: self.reload())
+
+        try:
+            server.serve_forever()
+        finally:
+            # Wait for the connections, which close once their request in progress completes
+            server.server_close()
+            with self._lock:
+                self._executor.shutdown(wait=True)
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def handle(self, sock: socket.socket):
+        """
+        Serve the requests of a connection, until it closes or the daemon drains.
+        Connections of other users are closed at once.
+        """
+        if peer_uid(sock) not in (None, os.geteuid()):
+            return
+        sock.settimeout(POLL)
+        while not self.draining.is_set():
+            try:
+                # Only time out between requests, not in the middle of one
+                if not sock.recv(1, socket.MSG_PEEK):
+                    return
+            except socket.timeout:
+                continue
+            sock.settimeout(None)
+            received = receive_message(sock)
+            if received is None:
+                return
+            request, _ = received
+            blob = b""
+            try:
+                result = self.dispatch(request)
+                if isinstance(result, bytes):
+                    response, blob = {"ok": True, "content": True}, result
+                else:
+                    response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": error_message(e)}
+            send_message(sock, response, blob)
+            sock.settimeout(POLL)
+
+    def dispatch(self, request: Dict[str, Any]) -> Any:
+        """
+        Run a request, and return its result.
+        """
+        op = request.get("op")
+        if op == "render":
+            try:
+                with self._lock:
+                    self.jobs += 1
+                    future = self._executor.submit(
+                        render_job,
+                        request["data"],
+                        request["template"],
+                        request.get("engine"),
+                        request.get("compresslevel"),
+                        request.get("output"),
+                    )
+                return future.result()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+        if op in ("ping", "stats"):
+            return self.stats()
+        if op == "reload":
+            self.reload()
+            return self.stats()
+        if op == "drain":
+            self.drain()
+            return self.stats()
+        raise FillDaemonError(f"{op!r} is not an operation of the daemon!")
+
+    def reload(self):
+        """
+        Start new worker processes, and let the previous ones complete their jobs.
+        The new workers import filler, the backends and the templates afresh.
+        """
+        with self._lock:
+            previous, self._executor = self._executor, self.start_workers()
+            self.generation += 1
+        threading.Thread(target=previous.shutdown, daemon=True).start()
+
+    def drain(self):
+        """
+        Stop accepting connections and requests, and let the jobs in progress complete.
+        serve_forever returns once they did.
+        """
+        self.draining.set()
+        if self._server is not None:
+            # shutdown waits for serve_forever, which may be running in this thread
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the state of the daemon: its process, workers, generation, i.e. the number
+        of reloads, and the number of render jobs received and failed.
+        """
+        return {
+            "pid": os.getpid(),
+            "workers": self.workers,
+            "generation": self.generation,
+            "jobs": self.jobs,
+            "errors": self.errors,
+            "draining": self.draining.is_set(),
+        }
+
+
+def remove_stale_socket(socket_path: str):
+    """
+    Remove the socket of a daemon which exited without removing it,
+    raise a FillDaemonError if a daemon still listens on it.
+    """
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise FillDaemonError(f"A daemon already listens on {socket_path}!")
+
+
+class DaemonClient:
+    """
+    A connection to a RenderDaemon, which can be shared by threads.
+
+        with DaemonClient() as client:
+            client.render({"name": "x"}, "/path/to/a.docx", "/path/to/out.docx")
+    """
+
+    def __init__(
+        self, socket_path: Optional[str] = None, timeout: Optional[float] = None
+    ):
+        """
+        :param socket_path: Path of the socket of the daemon, default is default_socket()
+        :param timeout: Seconds to wait for a response, default is forever
+        Raise a FillDaemonError if no daemon listens on the socket, or if another user runs it.
+        """
+        self.socket_path = socket_path or default_socket()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.socket_path)
+        except OSError as e:
+            self.sock.close()
+            raise FillDaemonError(
+                f"No daemon listens on {self.socket_path}! Start one with: python -m filler daemon"
+            ) from e
+        if peer_uid(self.sock) not in (None, os.geteuid()):
+            self.sock.close()
+            raise FillDaemonError(
+                f"The daemon listening on {self.socket_path} is run by another user!"
+            )
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, op: str, **fields) -> Any:
+        """
+        Send a request to the daemon, and return its result, or raise its error.
+        Raise a FillDaemonError if a field is not a plain JSON value.
+        """
+        with self._lock:
+            try:
+                send_message(self.sock, {"op": op, **fields})
+                received = receive_message(self.sock)
+            except (TypeError, ValueError) as e:
+                # Nothing was sent, the message is encoded before being sent
+                raise FillDaemonError(
+                    f"The request can not be sent: {e}! Data should hold plain JSON values."
+                ) from e
+            except OSError as e:
+                # The stream may be in the middle of a frame, it can not be used anymore
+                self.close()
+                raise FillDaemonError(
+                    f"The connection to the daemon failed: {e}"
+                ) from e
+        if received is None:
+            raise FillDaemonError("The daemon closed the connection, it is draining!")
+        response, blob = received
+        if not response["ok"]:
+            raise rebuild_error(response["error"])
+        if response.get("content"):
+            return blob
+        return response["result"]
+
+    def render(
+        self,
+        data: Dict[str, Any],
+        template: str,
+        output: Optional[str] = None,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+    ) -> Union[str, bytes]:
+        """
+        Fill 'data' into a template, write the filled file to 'output' and return its path,
+        or return its content when 'output' is None. Paths are those of the daemon.
+        """
+        return self.request(
+            "render",
+            data=data,
+            template=os.path.abspath(template),
+            output=None if output is None else os.path.abspath(output),
+            engine=engine,
+            compresslevel=compresslevel,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return self.request("stats")
+
+    def reload(self) -> Dict[str, Any]:
+        return self.request("reload")
+
+    def drain(self) -> Dict[str, Any]:
+        return self.request("drain")
+
+    def close(self):
+        self.sock.close()
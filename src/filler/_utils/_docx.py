@@ -0,0 +1,89 @@
+import re
+from typing import IO, Optional, Union
+
+from docxtpl import DocxTemplate
+
+from ._docxzip import DOCX_PROPERTIES, FOOTNOTES_CONTENT_TYPE, template_keys
+from ._metrics import Metrics, timed
+
+__all__ = [
+    "DocxRenderer",
+]
+
+
+class DocxRenderer:
+    """
+    A docx template loaded and parsed once, which can be rendered many times.
+
+    docxtpl reloads the whole package from 'template' whenever a rendered
+    DocxTemplate is rendered again, so the parts replaced by a render are kept
+    here and put back after each save instead.
+    """
+
+    def __init__(self, template: str, metrics: Optional[Metrics] = None):
+        self.template = template
+        with timed(metrics, "load"):
+            self.doc = DocxTemplate(template)
+            self.doc.init_docx()
+
+        docx = self.doc.docx
+        self._body = docx._element.body
+        self._targets = {key: rel._target for key, rel in docx._part.rels.items()}
+        self._properties = {
+            prop: getattr(docx.core_properties, prop) for prop in DOCX_PROPERTIES
+        }
+        self._footnotes = [
+            (part, part._blob)
+            for part in docx.part.package.parts
+            if part.content_type == FOOTNOTES_CONTENT_TYPE and hasattr(part, "_blob")
+        ]
+
+        # docxtpl locates the placeholders on each render, they are only counted here
+        with timed(metrics, "scan"):
+            self.placeholders = len(re.findall(r"\{\{", self.doc.get_xml()))
+            for uri in (self.doc.HEADER_URI, self.doc.FOOTER_URI):
+                for _, part in self.doc.get_headers_footers(uri):
+                    xml = self.doc.get_part_xml(part)
+                    self.placeholders += len(re.findall(r"\{\{", xml))
+            # The data keys referenced by the template
+            self.keys = template_keys(self.doc)
+
+    def render(
+        self,
+        data: dict,
+        full_path: Union[str, IO[bytes]],
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Render 'data' into the template and save to 'full_path'.
+        :param data: Data to fill, a dict
+        :param full_path: Path where the filled file is saved, or a writable binary stream
+        :param metrics: Receives the timings of the render and save phases, see Metrics
+        """
+        try:
+            with timed(metrics, "render"):
+                self.doc.render(data)
+            with timed(metrics, "save"):
+                self.doc.save(full_path)
+        finally:
+            self.reset()
+
+        if metrics is not None:
+            metrics.count("placeholders", self.placeholders)
+
+    def reset(self):
+        """
+        Put back the parts replaced by the last render.
+        """
+        docx = self.doc.docx
+        root = docx._element
+        root.replace(root.body, self._body)
+        for key, target in self._targets.items():
+            docx._part.rels[key]._target = target
+        for prop, value in self._properties.items():
+            setattr(docx.core_properties, prop, value)
+        for part, blob in self._footnotes:
+            part._blob = blob
+
+        # Stop docxtpl from reloading the template on the next render
+        self.doc.is_rendered = False
@@ -0,0 +1,287 @@
+import re
+from io import BytesIO
+from typing import IO, Any, Dict, List, Optional, Set, Tuple, Union
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml import parse_xml
+from docxtpl import DocxTemplate, InlineImage
+from jinja2 import Environment, Template, meta
+
+from ._metrics import Metrics, timed
+from ._zip import read_members, write_members
+
+try:
+    from docxtpl import Subdoc
+except ImportError:  # docxtpl only provides Subdoc when docxcompose is installed
+    Subdoc = InlineImage
+
+__all__ = [
+    "DocxZipRenderer",
+    "template_keys",
+]
+
+FOOTNOTES_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"
+)
+
+# The string core properties docxtpl renders, see DocxTemplate.render_properties
+DOCX_PROPERTIES = [
+    "author",
+    "comments",
+    "identifier",
+    "language",
+    "subject",
+    "title",
+]
+
+# The names Jinja provides to every template besides the globals of its environment
+JINJA_NAMES = {"loop", "caller", "varargs", "kwargs", "self"}
+
+
+class DocxZipRenderer:
+    """
+    A docx template compiled once, which can be rendered many times.
+
+    docxtpl patches the template xml and compiles it with Jinja on each render,
+    then saves the whole package again. Here the body, headers, footers, footnotes
+    and core properties are patched and compiled once, and the other parts are
+    serialized once, the way docxtpl would save them. A render only runs the Jinja
+    templates and writes the rendered parts next to the static ones, so the output
+    parts are the same bytes docxtpl writes. The static parts are copied without
+    recompressing them.
+
+    Values which add parts to the package (InlineImage, Subdoc) can not be rendered
+    this way, rows holding them are rendered by docxtpl.
+    """
+
+    def __init__(
+        self,
+        template: str,
+        compresslevel: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.template = template
+        self.compresslevel = compresslevel
+        with timed(metrics, "load"):
+            self.doc = DocxTemplate(template)
+            self.doc.render_init()
+
+            docx = self.doc.docx
+            package = docx.part.package
+            self._core = package._core_properties_part
+
+            # The package as docxtpl saves it, before any render
+            buffer = BytesIO()
+            docx.save(buffer)
+            self.members = read_members(buffer)
+
+        with timed(metrics, "scan"):
+            self._compile(package)
+
+        self._fallback = None
+
+    def _compile(self, package):
+        """
+        Patch and compile the parts holding placeholders.
+        """
+        docx = self.doc.docx
+        self.placeholders = 0
+
+        self._body = self._compile_xml(self.doc.get_xml())
+
+        # (part, member name, encoding, compiled template) of each header and footer
+        self._headers_footers: List[Tuple[Any, str, str, Template]] = []
+        for uri in (self.doc.HEADER_URI, self.doc.FOOTER_URI):
+            for _, part in self.doc.get_headers_footers(uri):
+                xml = self.doc.get_part_xml(part)
+                self._headers_footers.append(
+                    (
+                        part,
+                        member_name(part),
+                        self.doc.get_headers_footers_encoding(xml),
+                        self._compile_xml(xml),
+                    )
+                )
+
+        # (part, member name, compiled template) of each footnotes part
+        self._footnotes: List[Tuple[Any, str, Template]] = [
+            (part, member_name(part), self._compile_xml(part.blob.decode("utf-8")))
+            for part in package.parts
+            if part.content_type == FOOTNOTES_CONTENT_TYPE
+        ]
+
+        self._properties: Dict[str, Tuple[str, Template]] = {
+            prop: (
+                getattr(docx.core_properties, prop),
+                Template(getattr(docx.core_properties, prop)),
+            )
+            for prop in DOCX_PROPERTIES
+        }
+
+        # The parts but the body holding placeholders, by member name, and the core properties
+        self.shared_placeholders = [
+            name
+            for part, name, *_ in self._headers_footers + self._footnotes
+            if is_template(self.doc.get_part_xml(part))
+        ]
+        if any(is_template(value) for value, _ in self._properties.values()):
+            self.shared_placeholders.append("core properties")
+
+        # The data keys referenced by the template
+        self.keys = template_keys(self.doc)
+
+    def _compile_xml(self, xml: str) -> Template:
+        """
+        Compile the xml of a part, counting its placeholders, see compile_xml.
+        """
+        self.placeholders += xml.count("{{")
+        return compile_xml(self.doc, xml)
+
+    def render(
+        self,
+        data: dict,
+        full_path: Union[str, IO[bytes]],
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Render 'data' into the template and save to 'full_path'.
+        :param data: Data to fill, a dict
+        :param full_path: Path where the filled file is saved, or a writable binary stream
+        :param metrics: Receives the timings of the render and save phases, see Metrics
+        """
+        if any(isinstance(value, (InlineImage, Subdoc)) for value in data.values()):
+            if self._fallback is None:
+                from ._docx import DocxRenderer
+
+                self._fallback = DocxRenderer(self.template, metrics)
+            self._fallback.render(data, full_path, metrics)
+            return
+
+        with timed(metrics, "render"):
+            parts = self.render_parts(data)
+        with timed(metrics, "save"):
+            write_members(full_path, self.members, parts, self.compresslevel)
+
+        if metrics is not None:
+            metrics.count("placeholders", self.placeholders)
+
+    def render_parts(self, data: dict) -> Dict[str, bytes]:
+        """
+        Render 'data' into the compiled parts, and return the rendered blobs by member name.
+        :param data: Data to fill, a dict
+        """
+        doc = self.doc
+        doc.docx_ids_index = 1000
+        parts = {}
+
+        # Body, see DocxTemplate.render
+        xml = render_xml(doc, self._body, doc.docx._part, data)
+        tree = doc.fix_tables(xml)
+        doc.fix_docpr_ids(tree)
+        root = doc.docx._element
+        body = root.body
+        root.replace(body, tree)
+        try:
+            parts[member_name(doc.docx._part)] = serialize_part_xml(root)
+        finally:
+            root.replace(tree, body)
+
+        # Headers and footers
+        for part, name, encoding, template in self._headers_footers:
+            xml = render_xml(doc, template, part, data)
+            parts[name] = serialize_part_xml(parse_xml(xml.encode(encoding)))
+
+        # Core properties
+        properties = doc.docx.core_properties
+        try:
+            for prop, (_, template) in self._properties.items():
+                setattr(properties, prop, template.render(data))
+            parts[member_name(self._core)] = self._core.blob
+        finally:
+            for prop, (value, _) in self._properties.items():
+                setattr(properties, prop, value)
+
+        # Footnotes
+        for part, name, template in self._footnotes:
+            parts[name] = render_xml(doc, template, part, data).encode("utf-8")
+
+        return parts
+
+
+def template_keys(doc: DocxTemplate) -> Set[str]:
+    """
+    Return the names of the variables referenced by a docx template, in its body,
+    headers, footers, footnotes and core properties.
+    The Jinja globals and builtins, e.g. range or loop, are not data keys.
+
+    >>> import os, tempfile
+    >>> from docx import Document
+    >>> document = Document()
+    >>> _ = document.add_paragraph("{% for i in range(n) %}{{ loop.index }}{% endfor %}")
+    >>> path = os.path.join(tempfile.mkdtemp(), "loop.docx")
+    >>> document.save(path)
+    >>> doc = DocxTemplate(path)
+    >>> doc.init_docx()
+    >>> template_keys(doc)
+    {'n'}
+    """
+    env = Environment()
+    keys = doc.get_undeclared_template_variables(env)
+
+    docx = doc.docx
+    sources = [
+        doc.patch_xml(part.blob.decode("utf-8"))
+        for part in docx.part.package.parts
+        if part.content_type == FOOTNOTES_CONTENT_TYPE
+    ]
+    sources.extend(
+        getattr(docx.core_properties, prop) or "" for prop in DOCX_PROPERTIES
+    )
+
+    for source in sources:
+        keys |= meta.find_undeclared_variables(env.parse(source))
+    return keys - set(env.globals) - JINJA_NAMES
+
+
+def is_template(text: Optional[str]) -> bool:
+    """
+    Whether a text holds Jinja placeholders or tags.
+
+    >>> is_template("Dear {{ name }}"), is_template("{% if vip %}VIP{% endif %}"), is_template("Page 1")
+    (True, True, False)
+    """
+    return bool(text) and ("{{" in text or "{%" in text)
+
+
+def member_name(part) -> str:
+    """
+    Return the zip member name of a package part, e.g. 'word/document.xml'.
+    """
+    return part.partname[1:]
+
+
+def compile_xml(doc: DocxTemplate, xml: str) -> Template:
+    """
+    Patch the xml of a part the way docxtpl does, and compile it with Jinja.
+    See DocxTemplate.patch_xml and DocxTemplate.render_xml_part.
+    """
+    xml = doc.patch_xml(xml)
+    xml = re.sub(r"<w:p([ >])", r"\n<w:p\1", xml)
+    return Template(xml)
+
+
+def render_xml(doc: DocxTemplate, template: Template, part, data: dict) -> str:
+    """
+    Render a compiled part, and clean up the result the way docxtpl does.
+    See DocxTemplate.render_xml_part.
+    """
+    doc.current_rendering_part = part
+    xml = template.render(data)
+    xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", xml)
+    xml = (
+        xml.replace("{_{", "{{")
+        .replace("}_}", "}}")
+        .replace("{_%", "{%")
+        .replace("%_}", "%}")
+    )
+    return doc.resolve_listing(xml)
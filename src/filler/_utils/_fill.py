@@ -1,131 +1,144 @@
-from docxtpl import DocxTemplate
-from typing import Union
-import pandas as pd
-from openpyxl import load_workbook
-import re
-from ._utils import is_empty
+import importlib
+from typing import IO, TYPE_CHECKING, Optional, Union
+
+from .._types import FillEngineError
+from ._metrics import Metrics, timed, stream_position, count_written
+from ._utils import is_series
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from ._docx import DocxRenderer
+    from ._docxzip import DocxZipRenderer
+    from ._xlsx import XlsxRenderer
+    from ._xlsxzip import XlsxZipRenderer
 
 __all__ = [
     "fill_docx",
     "fill_xlsx",
+    "load_template",
 ]
 
+# The renderers of each template type, as "module.class", the first one is the default engine.
+# Their modules are imported on first use, so that only the backends in use are loaded.
+ENGINES = {
+    "docx": {
+        "docxtpl": "_docx.DocxRenderer",
+        "zip": "_docxzip.DocxZipRenderer",
+    },
+    "xlsx": {
+        "openpyxl": "_xlsx.XlsxRenderer",
+        "zip": "_xlsxzip.XlsxZipRenderer",
+    },
+}
+
+
+def load_template(
+    template: str,
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+) -> Union["DocxRenderer", "DocxZipRenderer", "XlsxRenderer", "XlsxZipRenderer"]:
+    """
+    Load and parse a docx or xlsx template file once, so that it can be filled many times.
+    :param template: Path to the template file, with docx or xlsx extension
+    :param engine: Name of the engine rendering the template, see ENGINES, default is the first one
+    :param compresslevel: Deflate level of the rendered parts, only supported by the 'zip' engines
+    :param metrics: Receives the timings of the load and scan phases, see Metrics
+    """
+    engines = ENGINES[template[-4:]]
+    if engine is None:
+        engine = next(iter(engines))
+    if engine not in engines:
+        raise FillEngineError(
+            f"{engine!r} is not an engine of {template[-4:]} templates! "
+            f"It should be one of {list(engines)}."
+        )
+
+    if compresslevel is not None and engine != "zip":
+        raise FillEngineError(
+            f"The {engine!r} engine does not support compresslevel! Use the 'zip' engine."
+        )
+
+    module, name = engines[engine].split(".")
+    with timed(metrics, "load"):
+        renderer = getattr(importlib.import_module(f".{module}", __package__), name)
+
+    if compresslevel is None:
+        return renderer(template, metrics=metrics)
+    return renderer(template, compresslevel, metrics=metrics)
+
 
 def fill_docx(
-    data: Union[pd.Series, dict],
-    template: str,
-    full_path: str,
+    data: Union["pd.Series", dict],
+    template: Union[str, "DocxRenderer", "DocxZipRenderer"],
+    full_path: Union[str, IO[bytes]],
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
 ):
     """
     Fill elements from 'data' into a docx template file, and save to the path specified by 'full_path'.
     :param data: Data to fill, can be of type pandas.Series or dict
-    :param template: Path to the template file for data filling
-    :param full_path: Path where the filled file is saved
+    :param template: Path to the template file for data filling, or a template loaded by load_template
+    :param full_path: Path where the filled file is saved, or a writable binary stream
+    :param engine: Engine loading the template file, 'docxtpl' (default) or 'zip', see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param metrics: Receives the timings of each phase and the counters, see Metrics
 
     """
 
-    # Load the template file
-    doc = DocxTemplate(template)
+    # Load the template file, unless it has been loaded already
+    if isinstance(template, str):
+        template = load_template(template, engine, compresslevel, metrics)
 
     # If the provided data is of type pd.Series, convert it to dict
-    if isinstance(data, pd.Series):
-        data = data.to_dict()
+    if is_series(data):
+        with timed(metrics, "convert"):
+            data = data.to_dict()
 
-    # Using the render method of docxtpl to fill the template
-    doc.render(data)
+    # Using the render method of docxtpl to fill the template, and save to the specified path
+    render_template(template, data, full_path, metrics)
 
-    # Save to the specified path
-    doc.save(full_path)
 
-
-def fill_xlsx(data: Union[pd.Series, dict], template: str, full_path: str):
+def fill_xlsx(
+    data: Union["pd.Series", dict],
+    template: Union[str, "XlsxRenderer", "XlsxZipRenderer"],
+    full_path: Union[str, IO[bytes]],
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+):
     """
     Fills elements from 'data' into a xlsx template file, and saves to the path specified by 'full_path'.
     :param data: Data to fill, can be of type pandas.Series or dict
-    :param template: Path to the template file for data filling
-    :param full_path: Path where the filled file will be saved
-    """
-
-    book = load_workbook(template)  # Load the template file
-
-    # Iterate through all worksheets
-    for sheet in book.worksheets:
-
-        # Iterate through all cells in the worksheet
-        for row in sheet.iter_rows():
-            for cell in row:
-                # If the cell value is a string, and contains a placeholder (e.g., '{{A}}')
-                if isinstance(cell.value, str) and "{{" in cell.value:
-                    # Extract the placeholder (e.g., 'A')
-                    key = remove_after(remove_before(cell.value, "{{"), "}}").strip(
-                        "{}"
-                    )
-                    # If the placeholder can be found in the data, replace the placeholder with the corresponding data
-                    if key in data:
-                        if is_only_placeholder(cell.value):
-                            cell.value = data[key]
-                        else:
-                            placeholder = "{{" + key + "}}"
-                            replaced = "" if is_empty(data[key]) else str(data[key])
-                            cell_value = str(cell.value)
-                            cell.value = cell_value.replace(placeholder, replaced)
-
-    # Save the result file
-    book.save(full_path)
-
-
-def remove_before(s: str, spec: str):
-    """
-    Returns a new string with all characters removed before 'spec'
-    :param s: The original string
-    :param spec: The specific character
+    :param template: Path to the template file for data filling, or a template loaded by load_template
+    :param full_path: Path where the filled file will be saved, or a writable binary stream
+    :param engine: Engine loading the template file, 'openpyxl' (default) or 'zip', see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param metrics: Receives the timings of each phase and the counters, see Metrics
     """
-    # Find the index of 'spec' in 's'
-    idx = s.find(spec)
 
-    # If 'spec' is not found in 's', return the original string
-    if idx == -1:
-        return s
+    # Load the template file, unless it has been loaded already
+    if isinstance(template, str):
+        template = load_template(template, engine, compresslevel, metrics)
 
-    # If 'spec' is found, return the part of 's' from 'spec' to the end
-    return s[idx:]
+    render_template(template, data, full_path, metrics)
 
 
-def remove_after(s: str, spec: str) -> str:
+def render_template(
+    template, data, full_path: Union[str, IO[bytes]], metrics: Optional[Metrics]
+):
     """
-    Return a new string removed all chars after spec
-    :param s: The original string
-    :param spec: The specific char
+    Render 'data' into a loaded template, and count the bytes written when metrics are enabled.
     """
-    # Find the index of spec in s
-    idx = s.find(spec)
+    if metrics is None:
+        template.render(data, full_path)
+        return
 
-    # If spec is not found in s, return the original string
-    if idx == -1:
-        return s
-
-    # Otherwise, return the part of s before and including spec
-    return s[: idx + len(spec)]
-
-
-def is_only_placeholder(s: str) -> bool:
-    """
-    Check if a string s is a placeholder in the form of {{A}}
-    :param s: The string to confirm if it's a placeholder
-
-    >>> is_placeholder('{{AA}}')
-    True
-    >>> is_placeholder('{{编号}}')
-    True
-    >>> is_placeholder('{{a_001}}')
-    True
-    >>> is_placeholder('{{AA}}BC')
-    False
-    """
-    pattern = r"^\{\{[\w\u4e00-\u9fa5]+\}\}$"  # This pattern matches strings like {{A}} exactly
-    match = re.fullmatch(pattern, s)
-    # If there is a match, the string is a placeholder, return True, otherwise, False
-    return match is not None
+    position = stream_position(full_path)
+    template.render(data, full_path, metrics)
+    count_written(metrics, full_path, position)
 
 
 if __name__ == "__main__":
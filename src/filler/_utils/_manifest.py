@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set
+
+from .._types import FillResult
+from ._metrics import Metrics
+from ._utils import is_dataframe, is_series
+
+__all__ = [
+    "Manifest",
+    "row_digest",
+    "template_digest",
+    "fill_incremental",
+]
+
+# The file name of the manifest, in the output directory
+MANIFEST_NAME = ".filler-manifest.json"
+
+MANIFEST_VERSION = 1
+
+
+class Manifest:
+    """
+    The record of the files filled into an output directory, by output file name,
+    with the digest of the row data each of them was filled from, and the digest
+    of the template they were filled into.
+
+    A file is up to date when it exists, and was filled from the same template and
+    the same row data. When the template changed, no file is up to date.
+    """
+
+    def __init__(self, output_dir: str, template: str, name: str = MANIFEST_NAME):
+        """
+        Read the manifest of 'output_dir', if any.
+        :param output_dir: The output directory
+        :param template: The digest of the template, see template_digest
+        :param name: The file name of the manifest, e.g. one per shard filling the directory
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, name)
+        self.template = template
+        self.rows: Dict[str, str] = {}
+        # The files of a previous run, filled from another template or not
+        self.previous: Set[str] = set()
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") != MANIFEST_VERSION:
+            return
+
+        self.previous = set(manifest["rows"])
+        if manifest["template"] == template:
+            self.rows = manifest["rows"]
+
+    def is_fresh(self, name: str, digest: str) -> bool:
+        """
+        Whether the file 'name' is up to date with the row data of digest 'digest'.
+        """
+        return self.rows.get(name) == digest and os.path.isfile(
+            os.path.join(self.output_dir, name)
+        )
+
+    def record(self, name: str, digest: Optional[str]):
+        """
+        Record the file 'name' as filled from the row data of digest 'digest',
+        or forget it when 'digest' is None, e.g. when its fill failed.
+        """
+        if digest is None:
+            self.rows.pop(name, None)
+        else:
+            self.rows[name] = digest
+
+    def prune(self, names: Set[str]) -> int:
+        """
+        Delete the files of previous runs which are not in 'names', i.e. whose row
+        no longer exists, forget them, and return how many were deleted.
+        """
+        pruned = 0
+        for name in (self.previous | self.rows.keys()) - names:
+            self.rows.pop(name, None)
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+                pruned += 1
+            except FileNotFoundError:
+                pass
+        self.previous = set(self.rows)
+        return pruned
+
+    def save(self):
+        """
+        Write the manifest, replacing the previous one atomically.
+        """
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "template": self.template,
+            "rows": self.rows,
+        }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(temporary, self.path)
+
+
+def row_digest(row: Dict[str, Any]) -> str:
+    """
+    Return the digest of the data of a row, independent of the order of its columns.
+
+    >>> row_digest({"A": 1, "B": "x"}) == row_digest({"B": "x", "A": 1})
+    True
+    >>> row_digest({"A": 1}) == row_digest({"A": 2})
+    False
+    """
+    blob = json.dumps(row, sort_keys=True, ensure_ascii=False, default=json_value)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def json_value(value: Any) -> Any:
+    """
+    Return what json encodes for a value of row data it does not support: the whole
+    content of a DataFrame or a Series, e.g. the items of repeating rows, the repr otherwise.
+    """
+    if is_dataframe(value):
+        return value.to_dict("split")
+    if is_series(value):
+        return value.to_dict()
+    return repr(value)
+
+
+def template_digest(template: str, *options: Any) -> str:
+    """
+    Return the digest of a template file, and of the options it is filled with, e.g. its engine.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(template, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(repr(options).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def fill_incremental(
+    jobs: Iterable,
+    fill: Callable[[Iterable], Iterator[FillResult]],
+    manifest: Manifest,
+    checkpoint: int = 1000,
+    metrics: Optional[Metrics] = None,
+) -> Iterator[FillResult]:
+    """
+    Fill only the jobs whose file is not up to date in the manifest, and yield the results
+    of all jobs in job order, those of the skipped ones with 'skipped' set.
+
+    The manifest is saved every 'checkpoint' filled rows, so that an interrupted run
+    resumes where it stopped. Once every job is done, the files of the rows which
+    no longer exist are deleted, and the manifest is saved.
+    :param jobs: (row label, row data, output file name) tuples
+    :param fill: Function filling jobs, and yielding their results in order, e.g. fill_rows
+    :param manifest: The manifest of the output directory
+    :param checkpoint: Number of rows filled between two saves of the manifest
+    :param metrics: Receives the number of skipped rows, see Metrics
+    """
+    # (row label, output file name, row digest, up to date) of each job, in job order,
+    # waiting for their result
+    order = deque()
+    names = set()
+
+    def pending_jobs():
+        for key, data, name in jobs:
+            digest = row_digest(data)
+            fresh = manifest.is_fresh(name, digest)
+            names.add(name)
+            order.append((key, name, digest, fresh))
+            if not fresh:
+                yield key, data, name
+
+    def skipped():
+        while order and order[0][3]:
+            key, name, _, _ = order.popleft()
+            if metrics is not None:
+                metrics.count("skipped")
+            yield FillResult(key, os.path.join(manifest.output_dir, name), None, True)
+
+    filled = 0
+    try:
+        for result in fill(pending_jobs()):
+            yield from skipped()
+            _, name, digest, _ = order.popleft()
+            manifest.record(name, None if result.error else digest)
+            yield result
+
+            filled += 1
+            if filled % checkpoint == 0:
+                manifest.save()
+        yield from skipped()
+
+        manifest.prune(names)
+    finally:
+        manifest.save()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
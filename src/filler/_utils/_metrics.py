@@ -0,0 +1,214 @@
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+__all__ = [
+    "Metrics",
+    "MetricsSummary",
+    "MetricsRecorder",
+    "timed",
+    "timed_iter",
+]
+
+# The phases of a fill, timed separately, their sum is the time spent filling:
+#   load -- importing the backend and reading the template package
+#   scan -- locating and compiling the placeholders of the template
+#   convert -- turning the row data into the dict handed to the renderer
+#   render -- filling the data into the template
+#   save -- serializing and writing the filled file
+PHASES = ["load", "scan", "convert", "render", "save"]
+
+# The context manager of timed when metrics are disabled
+_NO_TIMER = nullcontext()
+
+
+class Metrics:
+    """
+    Receives the per-phase timings and the counters of the fill pipeline.
+
+    The fill functions and fillers take an optional metrics object, and skip
+    measuring altogether when it is None. Subclass it to forward the measures,
+    e.g. to a monitoring client, or use MetricsSummary to aggregate them.
+
+    Counters are:
+        rows -- rows filled, those which failed included, and errors -- rows which failed
+        placeholders -- placeholders substituted
+        cells_scanned -- template cells scanned for placeholders (xlsx)
+        bytes_written -- bytes of the filled files
+        rows_repeated -- rows written by the repeating rows of xlsx templates
+    """
+
+    def timing(self, phase: str, seconds: float):
+        """
+        Called with the duration of a phase, see PHASES.
+        """
+
+    def count(self, name: str, value: int = 1):
+        """
+        Called to increase a counter by 'value'.
+        """
+
+
+class MetricsSummary(Metrics):
+    """
+    Aggregate the measures of a fill, e.g. of a whole batch, into a summary.
+    It can be shared by threads.
+
+    >>> metrics = MetricsSummary()
+    >>> metrics.timing("render", 0.25)
+    >>> metrics.timing("render", 0.75)
+    >>> metrics.count("rows", 2)
+    >>> metrics.summary()["phases"]["render"]
+    {'calls': 2, 'seconds': 1.0, 'mean': 0.5, 'max': 0.75, 'share': 1.0}
+    >>> metrics.summary()["counters"]
+    {'rows': 2}
+    """
+
+    def __init__(self):
+        # phase -> [calls, total seconds, max seconds]
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def timing(self, phase: str, seconds: float):
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                self.phases[phase] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the calls, total, mean and max seconds of each phase, with its share
+        of the total time, and the value of each counter.
+        """
+        total = sum(seconds for _, seconds, _ in self.phases.values())
+        phases = {
+            phase: {
+                "calls": int(calls),
+                "seconds": seconds,
+                "mean": seconds / calls,
+                "max": longest,
+                "share": seconds / total if total else 0.0,
+            }
+            for phase, (calls, seconds, longest) in self.phases.items()
+        }
+        return {"phases": phases, "counters": dict(self.counters)}
+
+    def __str__(self) -> str:
+        summary = self.summary()
+        lines = [f"{'phase':<10}{'calls':>8}{'seconds':>12}{'mean ms':>10}{'share':>8}"]
+        for phase, stats in sorted(
+            summary["phases"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            lines.append(
+                f"{phase:<10}{stats['calls']:>8}{stats['seconds']:>12.3f}"
+                f"{stats['mean'] * 1000:>10.2f}{stats['share']:>8.1%}"
+            )
+        lines.extend(f"{name}: {value}" for name, value in summary["counters"].items())
+        return "\n".join(lines)
+
+
+class MetricsRecorder(Metrics):
+    """
+    Record the measures as they come, to replay them into other metrics later,
+    e.g. those of the parent process of a worker.
+    """
+
+    def __init__(self):
+        self.events: List[Tuple[str, str, Union[int, float]]] = []
+
+    def timing(self, phase: str, seconds: float):
+        self.events.append(("timing", phase, seconds))
+
+    def count(self, name: str, value: int = 1):
+        self.events.append(("count", name, value))
+
+    def replay(self, metrics: Metrics):
+        """
+        Send the recorded measures to 'metrics', and forget them.
+        """
+        for method, name, value in self.events:
+            getattr(metrics, method)(name, value)
+        self.events = []
+
+
+class _Timer:
+    def __init__(self, metrics: Metrics, phase: str):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.timing(self.phase, time.perf_counter() - self.start)
+
+
+def timed(metrics: Optional[Metrics], phase: str):
+    """
+    Return a context manager timing its block as 'phase', which does nothing when metrics is None.
+    """
+    if metrics is None:
+        return _NO_TIMER
+    return _Timer(metrics, phase)
+
+
+def timed_iter(iterable: Iterable, metrics: Optional[Metrics], phase: str) -> Iterator:
+    """
+    Iterate over 'iterable', timing the production of each item as 'phase'.
+    """
+    if metrics is None:
+        yield from iterable
+        return
+
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            metrics.timing(phase, time.perf_counter() - start)
+        yield item
+
+
+def stream_position(full_path: Union[str, IO[bytes]]) -> Optional[int]:
+    """
+    Return the position of a writable stream, None for a path or an unseekable stream.
+    """
+    if isinstance(full_path, (str, os.PathLike)):
+        return None
+    try:
+        return full_path.tell()
+    except (AttributeError, OSError):
+        return None
+
+
+def count_written(
+    metrics: Metrics, full_path: Union[str, IO[bytes]], position: Optional[int]
+):
+    """
+    Count the bytes of the file just written to 'full_path', a stream being at 'position' before.
+    """
+    if isinstance(full_path, (str, os.PathLike)):
+        metrics.count("bytes_written", os.path.getsize(full_path))
+        return
+    if position is not None:
+        metrics.count("bytes_written", full_path.tell() - position)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,149 @@
+from typing import Dict, NamedTuple, Optional, Union
+
+from .._types import (
+    ParamError,
+    FillOutputDirError,
+    FillOutputNameError,
+    FillEngineError,
+)
+from ._consolidate import Consolidate
+from ._metrics import Metrics
+from ._pipeline import Pipeline
+from ._prepare import Format
+from ._rendercache import RenderCache
+from ._schema import Schema
+from ._shard import Shard
+from ._sink import DirectorySink, Sink
+from ._templatecache import TemplateCache
+
+__all__ = [
+    "FillOptions",
+]
+
+
+class FillOptions(NamedTuple):
+    """
+    How the rows of a RowsTemplateFiller are filled, see RowsTemplateFiller.
+
+    Attributes:
+        workers -- the number of worker processes rendering the rows, 1 renders them in this process
+        chunksize -- the rows sent to a worker process at a time
+        engine -- the engine rendering the template, see load_template
+        compresslevel -- the deflate level of the rendered parts of the 'zip' engines
+        formats -- the format spec or function of columns, see prepare_rows
+        metrics -- receives the timings of each phase and the counters, see Metrics
+        incremental -- only fill the rows which changed since the last fill, see Manifest
+        cache -- renders rows with the same values once, see RenderCache
+        template_cache -- loads the template, True for the cache shared by the process
+        pipeline -- reads, normalizes, renders and writes the rows in concurrent stages
+        schema -- what the data should hold, checked before any row is rendered
+        shard -- the part of the rows filled, see Shard
+        consolidate -- fills the rows into a few consolidated files, see Consolidate
+    """
+
+    workers: int = 1
+    chunksize: int = 64
+    engine: Optional[str] = None
+    compresslevel: Optional[int] = None
+    formats: Optional[Dict[str, Format]] = None
+    metrics: Optional[Metrics] = None
+    incremental: bool = False
+    cache: Optional[RenderCache] = None
+    template_cache: Union[bool, TemplateCache] = False
+    pipeline: Optional[Pipeline] = None
+    schema: Optional[Schema] = None
+    shard: Optional[Shard] = None
+    consolidate: Optional[Consolidate] = None
+
+    def check(self, sink: Sink):
+        """
+        Raise a ParamError, or one of its subclasses, if an option is incorrect, or if
+        options which can not be combined are, or if the sink does not support them.
+        :param sink: Where the filled files are written
+
+        >>> FillOptions(workers=4, pipeline=Pipeline()).check(DirectorySink("."))
+        Traceback (most recent call last):
+        ...
+        filler._types._error.ParamError: A pipeline renders the rows in its own stages, it can not be combined with workers!
+        """
+        for name in ("workers", "chunksize"):
+            value = getattr(self, name)
+            if not (isinstance(value, int) and value > 0):
+                raise ParamError(
+                    f"The value of {name} parameter {value!r} is incorrect!"
+                    "It should be a positive integer!"
+                )
+
+        if (self.incremental or self.shard is not None) and not isinstance(
+            sink, DirectorySink
+        ):
+            raise FillOutputDirError(
+                "An incremental or sharded fill keeps its manifest next to the filled files, "
+                "output_dir should be a directory!"
+            )
+        if self.shard is not None:
+            self.shard.check()
+
+        if self.pipeline is not None:
+            self.check_unused(
+                "A pipeline renders the rows in its own stages",
+                workers=self.workers > 1,
+                cache=self.cache is not None,
+                template_cache=self.template_cache not in (False, None),
+            )
+
+        if self.consolidate is not None:
+            self.consolidate.check()
+            if self.incremental or self.shard is not None:
+                raise FillOutputNameError(
+                    "A consolidated fill writes files of many rows, "
+                    "it can not be incremental or sharded!"
+                )
+            if self.engine not in (None, "zip"):
+                raise FillEngineError(
+                    f"A consolidated fill copies the parts of the template, "
+                    f"the {self.engine!r} engine does not support it! Use the 'zip' engine."
+                )
+            self.check_unused(
+                "A consolidated fill renders the rows in this process, into its files",
+                workers=self.workers > 1,
+                cache=self.cache is not None,
+                template_cache=self.template_cache not in (False, None),
+                pipeline=self.pipeline is not None,
+            )
+
+    def check_async(self):
+        """
+        Raise a ParamError if an option an async fill can not honour is set, see
+        RowsTemplateFiller.aifill: its rows are rendered in its executor, and written as
+        they are rendered, without a manifest.
+
+        >>> FillOptions(incremental=True).check_async()
+        Traceback (most recent call last):
+        ...
+        filler._types._error.ParamError: An async fill renders the rows in its executor, it can not be combined with incremental!
+        """
+        self.check_unused(
+            "An async fill renders the rows in its executor",
+            workers=self.workers > 1,
+            cache=self.cache is not None,
+            pipeline=self.pipeline is not None,
+            metrics=self.metrics is not None,
+            incremental=self.incremental,
+            shard=self.shard is not None,
+            consolidate=self.consolidate is not None,
+        )
+
+    def check_unused(self, reason: str, **options: bool):
+        """
+        Raise a ParamError if one of 'options', which 'reason' leaves unused, is set.
+        """
+        for name, used in options.items():
+            if used:
+                raise ParamError(f"{reason}, it can not be combined with {name}!")
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
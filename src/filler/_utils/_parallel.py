@@ -0,0 +1,223 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .._types import FillResult
+from ._fill import fill_docx, fill_xlsx, load_template
+from ._metrics import Metrics, MetricsRecorder
+from ._rendercache import RenderCache
+from ._sink import Sink, DirectorySink
+
+__all__ = [
+    "fill_rows",
+    "fill_parallel",
+]
+
+# (row label, row data, output file name)
+FillJob = Tuple[Any, Any, str]
+
+# (row label, output file name, filled file), filled by a worker for the sink of the parent
+FilledFile = Tuple[Any, str, bytes]
+
+# The template loaded by each worker process, the sink it writes to,
+# the recorder of its metrics, and its render cache, see init_worker
+_worker_template = None
+_worker_filler = None
+_worker_sink = None
+_worker_metrics = None
+_worker_cache = None
+
+
+def fill_rows(
+    filler: Callable,
+    template,
+    jobs: Iterable[FillJob],
+    sink: Sink,
+    metrics: Optional[Metrics] = None,
+    cache: Optional[RenderCache] = None,
+) -> Iterator[FillResult]:
+    """
+    Fill each job into a loaded template, and yield the results, catching the error of each row.
+    :param filler: fill_docx or fill_xlsx
+    :param template: A template loaded by load_template
+    :param jobs: (row label, row data, output file name) tuples
+    :param sink: Where the filled files are written
+    :param metrics: Receives the timings of each phase and the counters, see Metrics
+    :param cache: Filled files of identical rows, rendered once, see RenderCache
+    """
+    for key, data, name in jobs:
+        try:
+            if cache is None:
+                render = lambda target: filler(data, template, target, metrics=metrics)
+            else:
+                render = lambda target: cache.fill(
+                    filler, data, template, target, metrics
+                )
+            location = sink.write(name, render)
+            result = FillResult(key, location)
+        except Exception as e:
+            result = FillResult(key, None, e)
+        if metrics is not None:
+            metrics.count("rows")
+            if result.error is not None:
+                metrics.count("errors")
+        yield result
+
+
+def init_worker(
+    template: str,
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    sink: Optional[DirectorySink] = None,
+    metrics: bool = False,
+    cache: Optional[RenderCache] = None,
+):
+    """
+    Load and parse the template once per worker process.
+    Workers write to a directory sink themselves, and send the filled files
+    back to the parent for any other sink. With metrics, workers record their
+    measures and send them back with the results of each chunk.
+    """
+    global _worker_template, _worker_filler, _worker_sink, _worker_metrics, _worker_cache
+
+    fillers = {
+        "docx": fill_docx,
+        "xlsx": fill_xlsx,
+    }
+
+    _worker_metrics = MetricsRecorder() if metrics else None
+    _worker_template = load_template(template, engine, compresslevel, _worker_metrics)
+    _worker_filler = fillers[template[-4:]]
+    _worker_sink = sink
+    _worker_cache = cache
+
+
+def fill_chunk(
+    jobs: List[FillJob],
+) -> Tuple[List[Union[FillResult, FilledFile]], Optional[MetricsRecorder]]:
+    """
+    Fill a chunk of jobs into the template loaded by init_worker,
+    and return the results with the measures recorded while filling them.
+    """
+    if _worker_sink is not None:
+        results = list(
+            fill_rows(
+                _worker_filler,
+                _worker_template,
+                jobs,
+                _worker_sink,
+                _worker_metrics,
+                _worker_cache,
+            )
+        )
+        return results, take_metrics()
+
+    results = []
+    for key, data, name in jobs:
+        try:
+            buffer = BytesIO()
+            if _worker_cache is None:
+                _worker_filler(data, _worker_template, buffer, metrics=_worker_metrics)
+            else:
+                _worker_cache.fill(
+                    _worker_filler, data, _worker_template, buffer, _worker_metrics
+                )
+            results.append((key, name, buffer.getvalue()))
+        except Exception as e:
+            results.append(FillResult(key, None, e))
+
+    return results, take_metrics()
+
+
+def take_metrics() -> Optional[MetricsRecorder]:
+    """
+    Return the measures recorded by the worker so far, and start recording anew.
+    """
+    global _worker_metrics
+
+    recorded = _worker_metrics
+    if recorded is not None:
+        _worker_metrics = MetricsRecorder()
+    return recorded
+
+
+def fill_parallel(
+    jobs: Iterable[FillJob],
+    template: str,
+    sink: Sink,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+    cache: Optional[RenderCache] = None,
+) -> Iterator[FillResult]:
+    """
+    Fill jobs into a template with a pool of worker processes, and yield the results in job order.
+
+    Jobs are sent to the workers in chunks of 'chunksize', and at most two chunks per worker
+    are in flight, so 'jobs' can be a lazy iterator.
+    :param jobs: (row label, row data, output file name) tuples
+    :param template: Path to the template file, loaded once by each worker
+    :param sink: Where the filled files are written
+    :param workers: Number of worker processes, default is the number of CPUs
+    :param chunksize: Number of jobs sent to a worker at a time
+    :param engine: Engine loading the template, see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param metrics: Receives the timings and counters measured by the workers, see Metrics
+    :param cache: Filled files of identical rows, each worker keeps its own copy, see RenderCache
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+
+    # Workers write to a directory sink, and count the rows they fill, themselves.
+    # They fsync and rename each file as its durability says, the directories of the
+    # files are in the batches of the sink, synced as they are due, and when it is closed
+    direct = isinstance(sink, DirectorySink)
+
+    jobs = iter(jobs)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(
+            template,
+            engine,
+            compresslevel,
+            sink if direct else None,
+            metrics is not None,
+            cache,
+        ),
+    ) as executor:
+        pending = deque()
+
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(jobs, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(fill_chunk, chunk))
+
+            if not pending:
+                break
+
+            results, recorded = pending.popleft().result()
+            if recorded is not None:
+                recorded.replay(metrics)
+
+            for result in results:
+                if not isinstance(result, FillResult):
+                    key, name, blob = result
+                    try:
+                        result = FillResult(key, sink.write_bytes(name, blob))
+                    except Exception as e:
+                        result = FillResult(key, None, e)
+                elif direct and result.error is None:
+                    sink.renamed(result.path)
+                if metrics is not None and not direct:
+                    metrics.count("rows")
+                    if result.error is not None:
+                        metrics.count("errors")
+                yield result
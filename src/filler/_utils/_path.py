@@ -1,5 +1,4 @@
 from typing import Union, Literal
-from pandas import Timestamp
 from datetime import datetime
 import os
 
@@ -77,7 +76,7 @@ def get_curtimestr() -> str:
     True
 
     """
-    return Timestamp.now().strftime("%Y%m%d%H%M%S")
+    return datetime.now().strftime("%Y%m%d%H%M%S")
 
 
 def is_valid_timestamp(timestamp_str):
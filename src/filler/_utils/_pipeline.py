@@ -0,0 +1,298 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .._types import FillResult
+from ._async import render_bytes
+from ._fill import fill_docx, fill_xlsx, load_template
+from ._metrics import Metrics
+from ._sink import DirectorySink, Sink
+from ._utils import is_dataframe
+
+__all__ = [
+    "Pipeline",
+    "iter_batches",
+    "fill_pipeline",
+]
+
+# How long a stage waits on a queue before checking whether the pipeline stopped, in seconds
+POLL = 0.1
+
+
+class Pipeline(NamedTuple):
+    """
+    The shape of a staged fill: read rows -> normalize -> render -> write.
+
+    Attributes:
+        normalize -- number of threads normalizing batches of rows into jobs
+        render -- number of threads rendering jobs, or of worker processes with processes
+        write -- number of threads writing the filled files, 1 for sinks other than a directory
+        depth -- capacity of the queues feeding the render and write stages, in rows
+        batch -- number of rows read and normalized at a time
+        processes -- render in worker processes instead of threads
+    """
+
+    normalize: int = 1
+    render: int = 1
+    write: int = 1
+    depth: int = 64
+    batch: int = 256
+    processes: bool = False
+
+
+# The end of the items of a queue
+_END = object()
+
+
+class _Stop(Exception):
+    pass
+
+
+class _Failure(NamedTuple):
+    """
+    An error stopping the pipeline, raised by the consumer.
+    """
+
+    error: BaseException
+
+
+def iter_batches(data: Any, size: int) -> Iterator[Any]:
+    """
+    Split the data into batches of at most 'size' rows which prepare_rows labels
+    the way it labels the whole data: DataFrame slices, or lists of (row label, row data) pairs.
+    Tuples, e.g. jobs, are batched as they are.
+
+    >>> list(iter_batches([{"A": 1}, {"A": 2}, {"A": 3}], 2))
+    [[(0, {'A': 1}), (1, {'A': 2})], [(2, {'A': 3})]]
+    >>> list(iter_batches({"a": {"A": 1}}, 2))
+    [[('a', {'A': 1})]]
+    """
+    if is_dataframe(data):
+        for start in range(0, len(data), size):
+            yield data.iloc[start : start + size]
+        return
+    if isinstance(data, dict):
+        data = data.items()
+
+    position = count()
+    batch = []
+    for item in data:
+        if is_dataframe(item):
+            if batch:
+                yield batch
+                batch = []
+            yield from iter_batches(item, size)
+            continue
+        batch.append(item if isinstance(item, tuple) else (next(position), item))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def fill_pipeline(
+    batches: Iterable[Any],
+    prepare: Callable[[Any], List[tuple]],
+    template: str,
+    sink: Sink,
+    pipeline: Pipeline = Pipeline(),
+    engine: Optional[str] = None,
+    compresslevel: Optional[int] = None,
+    metrics: Optional[Metrics] = None,
+) -> Iterator[FillResult]:
+    """
+    Fill batches of rows through a staged pipeline, and yield the results in row order.
+
+    The stages are connected by bounded queues, and at most a few batches are in flight,
+    so that a fast stage waits for a slow one instead of piling up rows or filled files:
+    memory stays flat, and the throughput is the one of the slowest stage. Errors of a
+    row are returned in its result, errors reading or normalizing the data are raised.
+    :param batches: Batches of rows, see iter_batches
+    :param prepare: Function normalizing a batch into (row label, row data, output file name) jobs,
+        e.g. list for batches of jobs
+    :param template: Path to the template file, loaded by each render thread or process
+    :param sink: Where the filled files are written
+    :param pipeline: The worker counts and queue depths of the stages
+    :param engine: Engine loading the template, see load_template
+    :param compresslevel: Deflate level of the rendered parts, see load_template
+    :param metrics: Receives the timings and counters of the render threads, see Metrics
+    """
+    fillers = {
+        "docx": fill_docx,
+        "xlsx": fill_xlsx,
+    }
+    filler = fillers[template[-4:]]
+
+    writers = pipeline.write if isinstance(sink, DirectorySink) else 1
+    # Batches read and not yet returned, bounding the rows held by the pipeline
+    in_flight = threading.BoundedSemaphore(pipeline.normalize + 2)
+    stop = threading.Event()
+
+    batch_queue = queue.Queue(pipeline.normalize)
+    job_queue = queue.Queue(pipeline.depth)
+    file_queue = queue.Queue(pipeline.depth)
+    result_queue = queue.Queue()
+    # batch number -> number of rows, set once the batch is normalized
+    sizes: Dict[int, int] = {}
+
+    def put(q: queue.Queue, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=POLL)
+                return
+            except queue.Full:
+                pass
+        raise _Stop
+
+    def get(q: queue.Queue):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=POLL)
+            except queue.Empty:
+                pass
+        raise _Stop
+
+    def stage(
+        work: Callable, workers: int, downstream: Optional[queue.Queue], ends: int
+    ):
+        """
+        Start 'workers' threads running 'work', and put 'ends' ends into 'downstream'
+        once all of them are done.
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                work()
+            except _Stop:
+                return
+            except BaseException as e:
+                result_queue.put(_Failure(e))
+                stop.set()
+                return
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and downstream is not None:
+                try:
+                    for _ in range(ends):
+                        put(downstream, _END)
+                except _Stop:
+                    pass
+
+        threads = [threading.Thread(target=run, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def read():
+        for number, batch in enumerate(batches):
+            while not in_flight.acquire(timeout=POLL):
+                if stop.is_set():
+                    raise _Stop
+            put(batch_queue, (number, batch))
+
+    def normalize():
+        while True:
+            item = get(batch_queue)
+            if item is _END:
+                return
+            number, batch = item
+            jobs = prepare(batch)
+            sizes[number] = len(jobs)
+            for index, job in enumerate(jobs):
+                put(job_queue, ((number, index), job))
+
+    def render():
+        if pipeline.processes:
+
+            def fill(data):
+                return executor.submit(
+                    render_bytes, data, template, engine, compresslevel
+                ).result()
+
+        else:
+            loaded = load_template(template, engine, compresslevel, metrics)
+
+            def fill(data):
+                buffer = BytesIO()
+                filler(data, loaded, buffer, metrics=metrics)
+                return buffer.getvalue()
+
+        while True:
+            item = get(job_queue)
+            if item is _END:
+                return
+            tag, (key, data, name) = item
+            try:
+                put(file_queue, (tag, key, name, fill(data)))
+            except _Stop:
+                raise
+            except Exception as e:
+                result_queue.put((tag, FillResult(key, None, e)))
+
+    def write():
+        while True:
+            item = get(file_queue)
+            if item is _END:
+                return
+            tag, key, name, blob = item
+            try:
+                result = FillResult(key, sink.write_bytes(name, blob))
+            except Exception as e:
+                result = FillResult(key, None, e)
+            result_queue.put((tag, result))
+
+    executor = ProcessPoolExecutor(pipeline.render) if pipeline.processes else None
+    threads = []
+    try:
+        threads += stage(read, 1, batch_queue, pipeline.normalize)
+        threads += stage(normalize, pipeline.normalize, job_queue, pipeline.render)
+        threads += stage(render, pipeline.render, file_queue, writers)
+        threads += stage(write, writers, None, 0)
+
+        # Results by (batch number, row index), until their turn comes
+        waiting = {}
+        number, index = 0, 0
+        while True:
+            size = sizes.get(number)
+            if size is not None and index >= size:
+                # The batch is done, possibly empty
+                in_flight.release()
+                number, index = number + 1, 0
+                continue
+            if (number, index) in waiting:
+                result = waiting.pop((number, index))
+                index += 1
+                if metrics is not None:
+                    metrics.count("rows")
+                    if result.error is not None:
+                        metrics.count("errors")
+                yield result
+                continue
+
+            try:
+                item = result_queue.get(timeout=POLL)
+            except queue.Empty:
+                # The stages are done, and their last results were taken
+                if (
+                    not any(thread.is_alive() for thread in threads)
+                    and result_queue.empty()
+                ):
+                    return
+                continue
+            if isinstance(item, _Failure):
+                raise item.error
+            tag, result = item
+            waiting[tag] = result
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,136 @@
+import re
+from typing import Any, List, NamedTuple, Tuple
+from ._utils import is_empty
+
+__all__ = [
+    "XlsxPlaceholder",
+    "placeholder_key",
+    "fill_placeholder",
+    "is_only_placeholder",
+    "item_placeholders",
+]
+
+# This pattern matches strings like {{A}} exactly
+ONLY_PLACEHOLDER_PATTERN = re.compile(r"^\{\{[\w\u4e00-\u9fa5]+\}\}$")
+
+# This pattern matches the placeholders of the items of a list, like {{items.qty}}
+ITEM_PLACEHOLDER_PATTERN = re.compile(
+    r"\{\{([\w\u4e00-\u9fa5]+)\.([\w\u4e00-\u9fa5]+)\}\}"
+)
+
+
+class XlsxPlaceholder(NamedTuple):
+    """
+    A template cell holding a placeholder.
+
+    Attributes:
+        sheet -- title of the worksheet
+        coordinate -- coordinate of the cell, e.g. 'A1'
+        key -- the key of the placeholder, e.g. 'A' for '{{A}}'
+        whole -- True if the placeholder is the whole cell value, False if it is inline
+        value -- the template value of the cell
+    """
+
+    sheet: str
+    coordinate: str
+    key: str
+    whole: bool
+    value: str
+
+
+def fill_placeholder(placeholder: XlsxPlaceholder, value: Any) -> Any:
+    """
+    Return the value of a placeholder cell after filling 'value' into it.
+    :param placeholder: The placeholder cell
+    :param value: The data of the placeholder key
+    """
+    if placeholder.whole:
+        return value
+
+    replaced = "" if is_empty(value) else str(value)
+    return placeholder.value.replace("{{" + placeholder.key + "}}", replaced)
+
+
+def placeholder_key(s: str) -> str:
+    """
+    Extract the key of the first placeholder in a string
+    :param s: The string holding a placeholder
+
+    >>> placeholder_key('{{AA}}')
+    'AA'
+    >>> placeholder_key('Total: {{amount}} EUR')
+    'amount'
+    """
+    return remove_after(remove_before(s, "{{"), "}}").strip("{}")
+
+
+def remove_before(s: str, spec: str):
+    """
+    Returns a new string with all characters removed before 'spec'
+    :param s: The original string
+    :param spec: The specific character
+    """
+    # Find the index of 'spec' in 's'
+    idx = s.find(spec)
+
+    # If 'spec' is not found in 's', return the original string
+    if idx == -1:
+        return s
+
+    # If 'spec' is found, return the part of 's' from 'spec' to the end
+    return s[idx:]
+
+
+def remove_after(s: str, spec: str) -> str:
+    """
+    Return a new string removed all chars after spec
+    :param s: The original string
+    :param spec: The specific char
+    """
+    # Find the index of spec in s
+    idx = s.find(spec)
+
+    # If spec is not found in s, return the original string
+    if idx == -1:
+        return s
+
+    # Otherwise, return the part of s before and including spec
+    return s[: idx + len(spec)]
+
+
+def is_only_placeholder(s: str) -> bool:
+    """
+    Check if a string s is a placeholder in the form of {{A}}
+    :param s: The string to confirm if it's a placeholder
+
+    >>> is_only_placeholder('{{AA}}')
+    True
+    >>> is_only_placeholder('{{编号}}')
+    True
+    >>> is_only_placeholder('{{a_001}}')
+    True
+    >>> is_only_placeholder('{{AA}}BC')
+    False
+    """
+    match = ONLY_PLACEHOLDER_PATTERN.fullmatch(s)
+    # If there is a match, the string is a placeholder, return True, otherwise, False
+    return match is not None
+
+
+def item_placeholders(s: str) -> List[Tuple[str, str]]:
+    """
+    Return the (list key, item field) pairs of the item placeholders in a string
+    :param s: The string holding placeholders
+
+    >>> item_placeholders('{{items.qty}} x {{items.name}}')
+    [('items', 'qty'), ('items', 'name')]
+    >>> item_placeholders('{{amount}}')
+    []
+    """
+    return ITEM_PLACEHOLDER_PATTERN.findall(s)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
@@ -0,0 +1,162 @@
+from itertools import count
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ._utils import is_empty, is_dataframe
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "prepare_frame",
+    "prepare_row",
+    "prepare_rows",
+]
+
+# A format spec of format(), e.g. ',.2f', or a function formatting a value
+Format = Union[str, Callable[[Any], str]]
+
+
+def prepare_frame(
+    frame: "pd.DataFrame", formats: Optional[Dict[str, Format]] = None
+) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Normalize a DataFrame column by column, and return its (row label, row dict) pairs.
+
+    Empty values, see is_empty_value, become '', the columns found in 'formats'
+    are converted to their final string form, and numpy scalars become python ones.
+    :param frame: The data to normalize
+    :param formats: Format spec or function by column name
+
+    >>> import pandas as pd
+    >>> frame = pd.DataFrame({"A": [1.5, None], "B": ["x", "  "]})
+    >>> prepare_frame(frame, {"A": ".2f"})
+    [(0, {'A': '1.50', 'B': 'x'}), (1, {'A': '', 'B': ''})]
+    >>> prepare_frame(frame)
+    [(0, {'A': 1.5, 'B': 'x'}), (1, {'A': '', 'B': ''})]
+    """
+    import pandas as pd
+
+    formats = formats or {}
+
+    columns = {}
+    for name, column in frame.items():
+        empty = column.isna()
+        if column.dtype.kind == "O":  # strings, or values of mixed types
+            empty |= column.map(is_blank).astype(bool)
+        spec = formats.get(name)
+        if spec is not None:
+            column = column[~empty].map(formatter(spec))
+        if empty.any() or spec is not None:
+            column = column.astype(object).reindex(frame.index).where(~empty, "")
+        columns[name] = column
+
+    records = pd.DataFrame(columns, index=frame.index).to_dict("records")
+    return list(zip(frame.index, records))
+
+
+def prepare_row(
+    row: Union["pd.Series", Dict[str, Any]], formats: Optional[Dict[str, Format]] = None
+) -> Dict[str, Any]:
+    """
+    Normalize a single row the way prepare_frame normalizes a DataFrame, value by value.
+    :param row: The data to normalize
+    :param formats: Format spec or function by column name
+
+    >>> prepare_row({"A": 1.5, "B": None}, {"A": ".2f"})
+    {'A': '1.50', 'B': ''}
+    """
+    formats = formats or {}
+
+    prepared = {}
+    for name, value in row.items():
+        if is_empty_value(value):
+            value = ""
+        elif name in formats:
+            value = formatter(formats[name])(value)
+        elif hasattr(value, "item"):  # numpy scalar
+            value = value.item()
+        prepared[name] = value
+
+    return prepared
+
+
+def prepare_rows(
+    data: Union["pd.DataFrame", Dict[str, Dict[str, Any]], Iterable[Any]],
+    formats: Optional[Dict[str, Format]] = None,
+    chunksize: int = 10000,
+) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+    """
+    Normalize the rows of the data before rendering, and iterate over (row label, row dict) pairs.
+
+    DataFrames, and DataFrame chunks of an iterable, are normalized by prepare_frame
+    'chunksize' rows at a time, the other rows one by one by prepare_row. See iter_rows
+    for the accepted data.
+    :param data: The data to normalize
+    :param formats: Format spec or function by column name
+    :param chunksize: Number of DataFrame rows normalized at a time
+    """
+    if is_dataframe(data):
+        for start in range(0, len(data), chunksize):
+            yield from prepare_frame(data.iloc[start : start + chunksize], formats)
+        return
+    if isinstance(data, dict):
+        for key, row in data.items():
+            yield key, prepare_row(row, formats)
+        return
+
+    position = count()
+    for item in data:
+        if is_dataframe(item):
+            yield from prepare_rows(item, formats, chunksize)
+        elif isinstance(item, tuple):
+            key, row = item
+            yield key, prepare_row(row, formats)
+        else:
+            yield next(position), prepare_row(item, formats)
+
+
+def is_empty_value(value: Any) -> bool:
+    """
+    Checks if a value of a row is empty, i.e. filled as '': a missing value (NaN, None,
+    NA, NaT), or a string of whitespace only. Lists and dicts, e.g. the items of repeating
+    rows, are values even when empty.
+
+    >>> is_empty_value(float("nan")), is_empty_value("  "), is_empty_value([])
+    (True, True, False)
+    """
+    if isinstance(value, (list, tuple, dict)):
+        return False
+    return is_empty(value)
+
+
+def is_blank(value: Any) -> bool:
+    """
+    Checks if a value is a string of whitespace only, e.g. '' or '  '.
+    """
+    return isinstance(value, str) and not value.strip()
+
+
+def formatter(spec: Format) -> Callable[[Any], str]:
+    """
+    Return the function formatting a value according to 'spec'.
+    """
+    if callable(spec):
+        return spec
+    return lambda value: format(value, spec)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
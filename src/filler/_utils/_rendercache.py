@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator
+from io import BytesIO
+from typing import IO, Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from ._manifest import json_value, template_digest
+from ._metrics import Metrics
+from ._sink import final_path
+from ._utils import is_series
+
+__all__ = [
+    "RenderCache",
+]
+
+
+class CachedFile(NamedTuple):
+    """
+    A filled file kept by a RenderCache.
+
+    Attributes:
+        blob -- the bytes of the filled file
+        path -- where the filled file was first written, None if it was written to a stream
+        identity -- the inode, size and modification time of the file at path when it was
+            written, a file rewritten since then is not linked, see file_identity
+    """
+
+    blob: bytes
+    path: Optional[str]
+    identity: Optional[Tuple[int, int, int]] = None
+
+
+class RenderCache:
+    """
+    Filled files by the template they were filled into, and the values of the
+    placeholders that template references, so that rows filling identical files
+    are only rendered once.
+
+    On a hit, the bytes of the filled file are written again instead of rendering
+    the row. With link, they are hard linked to the first file written when it
+    still exists and has not been rewritten since, so the files of identical rows
+    share their storage: editing one of them edits them all.
+
+    The cache holds at most max_bytes of filled files, the least recently used
+    are evicted first. A cache sent to worker processes starts empty in each of them.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, link: bool = False):
+        """
+        :param max_bytes: Total size of the filled files held by the cache
+        :param link: Hard link the files of identical rows when possible
+        """
+        self.max_bytes = max_bytes
+        self.link = link
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._files: "OrderedDict[str, CachedFile]" = OrderedDict()
+        # Template digest by loaded template
+        self._templates = weakref.WeakKeyDictionary()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes, "link": self.link}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def key(self, template, data: Union[dict, Any]) -> Optional[str]:
+        """
+        Return the cache key of a row filled into a loaded template: the digest of the template,
+        and of the values of the keys the template references. None when one of those values
+        is an iterator, e.g. the items of repeating rows, which can only be read once.
+        """
+        digest = self._templates.get(template)
+        if digest is None:
+            digest = template_digest(
+                template.template,
+                type(template).__name__,
+                getattr(template, "compresslevel", None),
+            )
+            self._templates[template] = digest
+
+        values = [[key, data.get(key)] for key in sorted(template.keys) if key in data]
+        if any(isinstance(value, Iterator) for _, value in values):
+            return None
+        blob = json.dumps(values, ensure_ascii=False, default=json_value)
+        return hashlib.blake2b(
+            f"{digest}:{blob}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def fill(
+        self,
+        filler: Callable,
+        data: Union[dict, Any],
+        template,
+        full_path: Union[str, IO[bytes]],
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Fill 'data' into a loaded template with 'filler', e.g. fill_docx, unless an identical
+        file is in the cache, and write the filled file to 'full_path'.
+        """
+        if is_series(data):
+            data = data.to_dict()
+
+        key = self.key(template, data)
+        if key is None:
+            filler(data, template, full_path, metrics=metrics)
+            return
+
+        cached = self._files.get(key)
+        if cached is not None:
+            self._files.move_to_end(key)
+            self.hits += 1
+            if metrics is not None:
+                metrics.count("cache_hits")
+                metrics.count("bytes_written", len(cached.blob))
+            linked = self.write(cached, full_path)
+            if self.link and not linked and isinstance(full_path, str):
+                # Link the next identical rows to this file, the first one is gone
+                self._files[key] = written_file(cached.blob, full_path)
+            return
+
+        self.misses += 1
+        buffer = BytesIO()
+        filler(data, template, buffer, metrics=metrics)
+        blob = buffer.getvalue()
+        self.write(CachedFile(blob, None), full_path)
+        if isinstance(full_path, str):
+            self.put(key, written_file(blob, full_path))
+        else:
+            self.put(key, CachedFile(blob, None))
+
+    def write(self, cached: CachedFile, full_path: Union[str, IO[bytes]]) -> bool:
+        """
+        Write a cached file to a path, linking it when enabled, or to a writable binary stream.
+        Return whether it was linked: the file it was first written to may have been moved,
+        deleted or rewritten since, e.g. by a later fill of other data.
+        """
+        if not isinstance(full_path, str):
+            full_path.write(cached.blob)
+            return False
+
+        if (
+            self.link
+            and cached.path is not None
+            and file_identity(cached.path) == cached.identity
+        ):
+            try:
+                if os.path.lexists(full_path):
+                    os.remove(full_path)
+                os.link(cached.path, full_path)
+                return True
+            except OSError:  # moved or deleted, or another file system
+                pass
+
+        with open(full_path, "wb") as f:
+            f.write(cached.blob)
+        return False
+
+    def put(self, key: str, cached: CachedFile):
+        """
+        Add a filled file to the cache, evicting the least recently used ones beyond max_bytes.
+        """
+        if len(cached.blob) > self.max_bytes:
+            return
+
+        self._files[key] = cached
+        self.size += len(cached.blob)
+        while self.size > self.max_bytes:
+            _, evicted = self._files.popitem(last=False)
+            self.size -= len(evicted.blob)
+            self.evictions += 1
+
+    def clear(self):
+        self._files.clear()
+        self._templates.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hits, misses and evictions of the cache, and the number and size of its files.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "files": len(self._files),
+            "bytes": self.size,
+        }
+
+
+def file_identity(full_path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    The inode, size and modification time of a file, which a rename keeps and a rewrite
+    changes, None if it does not exist.
+    """
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def written_file(blob: bytes, full_path: str) -> CachedFile:
+    """
+    A filled file just written to 'full_path'. A sink may write to a temporary file,
+    linked files are the renamed one, which keeps the identity of the temporary file.
+    """
+    return CachedFile(blob, final_path(full_path), file_identity(full_path))
@@ -0,0 +1,162 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+)
+
+from ._fill import load_template
+from ._utils import is_dataframe
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "Schema",
+    "SchemaIssue",
+    "template_placeholders",
+    "validate_frame",
+    "validate_data",
+]
+
+# The dtype kinds, see numpy.dtype.kind, accepted by the names of Schema.dtypes
+DTYPE_KINDS = {
+    "number": "iuf",
+    "integer": "iu",
+    "float": "f",
+    "bool": "b",
+    "datetime": "M",
+    "timedelta": "m",
+    "string": "OSU",
+    "object": "O",
+}
+
+
+class Schema(NamedTuple):
+    """
+    What the data filled into a template should hold, checked before rendering any row.
+
+    Attributes:
+        required -- the columns which must exist, default is every placeholder of the template
+        dtypes -- the expected dtype of columns, by column name: a name of DTYPE_KINDS,
+            e.g. 'number' or 'datetime', or dtype kind characters, e.g. 'iu'
+        max_null_ratio -- the largest share of empty values allowed in the required columns,
+            for all of them, or by column name
+    """
+
+    required: Optional[Iterable[str]] = None
+    dtypes: Optional[Dict[str, str]] = None
+    max_null_ratio: Optional[Union[float, Dict[str, float]]] = None
+
+
+class SchemaIssue(NamedTuple):
+    """
+    A way the data does not match a Schema.
+
+    Attributes:
+        column -- the column at fault
+        problem -- 'missing', 'dtype' or 'nulls'
+        detail -- explanation of the problem
+    """
+
+    column: str
+    problem: str
+    detail: str
+
+
+def template_placeholders(
+    template: str, engine: Optional[str] = None, compresslevel: Optional[int] = None
+) -> Set[str]:
+    """
+    Return the data keys referenced by a template: the keys of the placeholder cells
+    of a xlsx template, the Jinja variables of a docx template.
+    Parameters are those of load_template.
+    """
+    return set(load_template(template, engine, compresslevel).keys)
+
+
+def validate_frame(
+    frame: "pd.DataFrame", placeholders: Iterable[str], schema: Schema = Schema()
+) -> List[SchemaIssue]:
+    """
+    Check a DataFrame against a schema, column by column, and return the issues found.
+    :param frame: The data to fill
+    :param placeholders: The data keys referenced by the template, see template_placeholders
+    :param schema: What the data should hold
+
+    >>> import pandas as pd
+    >>> frame = pd.DataFrame({"name": ["a", None, None], "age": ["1", "2", "3"]})
+    >>> schema = Schema(dtypes={"age": "number"}, max_null_ratio=0.5)
+    >>> for issue in validate_frame(frame, {"name", "age", "city"}, schema):
+    ...     print(issue.column, issue.problem)
+    city missing
+    age dtype
+    name nulls
+    """
+    required = placeholders if schema.required is None else schema.required
+    required = sorted(set(required))
+    present = [column for column in required if column in frame.columns]
+
+    issues = [
+        SchemaIssue(column, "missing", "is referenced by the template but not a column")
+        for column in required
+        if column not in frame.columns
+    ]
+
+    for column, expected in sorted((schema.dtypes or {}).items()):
+        if column not in frame.columns:
+            if column not in required:
+                issues.append(
+                    SchemaIssue(column, "missing", "has a dtype but is not a column")
+                )
+            continue
+        dtype = frame.dtypes[column]
+        if dtype.kind not in DTYPE_KINDS.get(expected, expected):
+            issues.append(
+                SchemaIssue(column, "dtype", f"is {dtype}, expected {expected}")
+            )
+
+    if schema.max_null_ratio is not None and present and len(frame):
+        ratios = frame[present].isna().mean()
+        for column in present:
+            limit = schema.max_null_ratio
+            if isinstance(limit, dict):
+                limit = limit.get(column)
+            if limit is not None and ratios[column] > limit:
+                issues.append(
+                    SchemaIssue(
+                        column,
+                        "nulls",
+                        f"is {ratios[column]:.1%} empty, at most {limit:.1%} allowed",
+                    )
+                )
+
+    return issues
+
+
+def validate_data(
+    data: Union["pd.DataFrame", Dict[str, Dict[str, Any]]],
+    placeholders: Iterable[str],
+    schema: Schema = Schema(),
+) -> List[SchemaIssue]:
+    """
+    Check a DataFrame, or a dictionary of rows, against a schema, see validate_frame.
+    """
+    if not is_dataframe(data):
+        import pandas as pd
+
+        data = pd.DataFrame.from_dict(
+            {key: dict(row) for key, row in data.items()}, orient="index"
+        )
+    return validate_frame(data, placeholders, schema)
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
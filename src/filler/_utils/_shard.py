@@ -0,0 +1,259 @@
+import glob
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from .._types import FillResult, FillShardError
+
+__all__ = [
+    "Shard",
+    "ShardManifest",
+    "shard_of",
+    "fill_shard",
+    "verify_shards",
+]
+
+# The file name of the manifest of a shard, in the output directory
+SHARD_MANIFEST_NAME = ".filler-shard-{index}-of-{count}.json"
+# The file name of the manifest of an incremental fill of a shard, see Manifest
+SHARD_INCREMENTAL_NAME = ".filler-manifest-{index}-of-{count}.json"
+SHARD_MANIFEST_PATTERN = re.compile(r"^\.filler-shard-(\d+)-of-(\d+)\.json$")
+
+SHARD_MANIFEST_VERSION = 1
+
+
+class Shard(NamedTuple):
+    """
+    The part of the rows of a fill rendered by one of 'count' processes or machines.
+
+    Rows are assigned to shards by a stable hash of their output file name, or of the
+    value of their 'key' column, so that every run of every shard agrees on it whatever
+    the process, the machine or the order of the rows.
+
+    Attributes:
+        index -- the index of this shard, from 0 to count - 1
+        count -- the number of shards
+        key -- the column whose values are hashed, rows with the same value are in the
+            same shard, default is the output file name
+    """
+
+    index: int
+    count: int
+    key: Optional[str] = None
+
+    def check(self):
+        """
+        Raise a FillShardError if the shard is not one of 'count' shards.
+        """
+        if not (
+            isinstance(self.index, int)
+            and isinstance(self.count, int)
+            and 0 <= self.index < self.count
+        ):
+            raise FillShardError(
+                f"The shard {self.index!r} of {self.count!r} is incorrect!"
+                "The index should be an integer from 0 to the number of shards - 1!"
+            )
+
+    def owns(self, value: Any) -> bool:
+        """
+        Whether the rows of a key value, or of an output file name, belong to this shard.
+        """
+        return shard_of(value, self.count) == self.index
+
+    @property
+    def manifest_name(self) -> str:
+        """
+        The file name of the manifest of the shard, see ShardManifest.
+        """
+        return SHARD_MANIFEST_NAME.format(index=self.index, count=self.count)
+
+    @property
+    def incremental_name(self) -> str:
+        """
+        The file name of the manifest of the incremental fills of the shard, see Manifest.
+        """
+        return SHARD_INCREMENTAL_NAME.format(index=self.index, count=self.count)
+
+
+def shard_of(value: Any, count: int) -> int:
+    """
+    Return the shard of a key value among 'count' shards, the same in every process.
+
+    >>> shard_of("report-1", 4)
+    3
+    >>> [shard_of(value, 1) for value in ["a", 2, None]]
+    [0, 0, 0]
+    """
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+class ShardManifest:
+    """
+    The record of the files filled by a shard into an output directory, which a merge
+    step reads to check that every shard completed, see verify_shards.
+    """
+
+    def __init__(self, output_dir: str, shard: Shard, template: str):
+        """
+        :param output_dir: The output directory, shared by the shards
+        :param shard: The shard filling the directory
+        :param template: The digest of the template, see template_digest
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, shard.manifest_name)
+        self.shard = shard
+        self.template = template
+        self.complete = False
+        # Size of the filled files, by output file name
+        self.files: Dict[str, int] = {}
+        # Error message of the failed rows, by output file name
+        self.errors: Dict[str, str] = {}
+
+    def record(self, name: str, result: FillResult):
+        """
+        Record the result of the row filling the file 'name'.
+        """
+        if result.error is not None:
+            self.errors[name] = f"{type(result.error).__name__}: {result.error}"
+            self.files.pop(name, None)
+            return
+        self.errors.pop(name, None)
+        self.files[name] = os.path.getsize(os.path.join(self.output_dir, name))
+
+    def save(self):
+        """
+        Write the manifest, replacing the previous one atomically.
+        """
+        manifest = {
+            "version": SHARD_MANIFEST_VERSION,
+            "shard": self.shard.index,
+            "count": self.shard.count,
+            "key": self.shard.key,
+            "template": self.template,
+            "complete": self.complete,
+            "files": self.files,
+            "errors": self.errors,
+        }
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(temporary, self.path)
+
+
+def fill_shard(
+    jobs: Iterable,
+    fill: Callable[[Iterable], Iterator[FillResult]],
+    manifest: ShardManifest,
+) -> Iterator[FillResult]:
+    """
+    Fill only the jobs of a shard, yield their results in job order, and record them
+    in the manifest of the shard, which is saved complete once every job is done.
+    :param jobs: (row label, row data, output file name) tuples, of all the shards
+    :param fill: Function filling jobs, and yielding their results in order, e.g. fill_rows
+    :param manifest: The manifest of the shard
+    """
+    shard = manifest.shard
+    # Output file names of the jobs of the shard, waiting for their result
+    order = deque()
+
+    def shard_jobs():
+        for key, data, name in jobs:
+            if shard.owns(name if shard.key is None else data[shard.key]):
+                order.append(name)
+                yield key, data, name
+
+    manifest.save()
+    try:
+        for result in fill(shard_jobs()):
+            manifest.record(order.popleft(), result)
+            yield result
+        manifest.complete = True
+    finally:
+        manifest.save()
+
+
+def verify_shards(output_dir: str, count: Optional[int] = None) -> List[str]:
+    """
+    Check the manifests of the shards filling an output directory, and return the problems
+    found: missing or incomplete shards, shards disagreeing on the fill, files filled by
+    several shards, failed rows, and filled files which are missing or changed size.
+    :param output_dir: The output directory shared by the shards
+    :param count: The number of shards, default is the one recorded by the shards,
+        which should all agree on it
+    """
+    manifests = {}
+    for path in glob.glob(os.path.join(glob.escape(output_dir), ".filler-shard-*")):
+        match = SHARD_MANIFEST_PATTERN.match(os.path.basename(path))
+        if match is None:
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            return [f"The manifest {path!r} can not be read: {e}"]
+        if manifest.get("version") != SHARD_MANIFEST_VERSION:
+            return [f"The manifest {path!r} is of an unknown version"]
+        manifests[(manifest["shard"], manifest["count"])] = manifest
+
+    if not manifests:
+        return [f"No shard manifest in {output_dir!r}"]
+
+    if count is None:
+        counts = {shard_count for _, shard_count in manifests}
+        if len(counts) > 1:
+            return [
+                f"The shards were filled with different numbers of shards: {sorted(counts)}"
+            ]
+        count = counts.pop()
+    # The manifests of previous fills with another number of shards
+    manifests = {
+        shard: manifest for shard, manifest in manifests.items() if shard[1] == count
+    }
+
+    problems = []
+
+    for index in range(count):
+        manifest = manifests.get((index, count))
+        if manifest is None:
+            problems.append(f"Shard {index} of {count} is missing")
+        elif not manifest["complete"]:
+            problems.append(f"Shard {index} of {count} did not complete")
+
+    for field in ["template", "key"]:
+        values = {repr(manifest[field]) for manifest in manifests.values()}
+        if len(values) > 1:
+            problems.append(f"The shards disagree on their {field}: {sorted(values)}")
+
+    owners: Dict[str, int] = {}
+    for (index, _), manifest in sorted(manifests.items()):
+        for name, size in manifest["files"].items():
+            if name in owners:
+                problems.append(
+                    f"{name!r} was filled by shards {owners[name]} and {index}"
+                )
+                continue
+            owners[name] = index
+            try:
+                actual = os.path.getsize(os.path.join(output_dir, name))
+            except OSError:
+                problems.append(f"{name!r} of shard {index} is missing")
+                continue
+            if actual != size:
+                problems.append(
+                    f"{name!r} of shard {index} is {actual} bytes, {size} were written"
+                )
+        for name, error in manifest["errors"].items():
+            problems.append(f"{name!r} of shard {index} failed: {error}")
+
+    return problems
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
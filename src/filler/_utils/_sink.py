@@ -0,0 +1,464 @@
+import os
+import secrets
+import tarfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from io import BytesIO
+from os import path
+from typing import IO, Callable, NamedTuple, Optional, Set, Union
+
+from .._types import FillOutputDirError, FillOutputNameError
+
+__all__ = [
+    "Sink",
+    "DirectorySink",
+    "ZipSink",
+    "TarSink",
+    "Durability",
+]
+
+# A function writing a filled file to a path or a writable binary stream
+Render = Callable[[Union[str, IO[bytes]]], None]
+
+# The prefix and suffix of the temporary file a filled file is written to, next to it,
+# around the name of the file and a unique part, e.g. '.filler-a001.docx.5f2c9e01a4b7.tmp'
+TEMPORARY_PREFIX = ".filler-"
+TEMPORARY_SUFFIX = ".tmp"
+
+# The age, in seconds, of the temporary files left by a crashed fill, removed by DirectorySink
+STALE_SECONDS = 3600
+
+DURABILITY_POLICIES = ["none", "file", "batch"]
+
+
+class Sink(ABC):
+    """
+    Where a batch fill writes its filled files.
+
+    A sink is given each filled file by name, e.g. 'a001.docx', and returns
+    where it has been written. Sinks are context managers, closed on exit,
+    or aborted if the block raised.
+    Subclasses implement write, and can not be instantiated otherwise.
+
+    >>> class Incomplete(Sink):
+    ...     pass
+    >>> Incomplete()  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    TypeError: Can't instantiate abstract class Incomplete...
+    """
+
+    @abstractmethod
+    def write(self, name: str, render: Render) -> str:
+        """
+        Write the file rendered by 'render' under 'name', and return where it has been written.
+        :param name: File name, with extension, and with or without a relative directory
+        :param render: Function writing the file to the path or stream it is given
+        """
+
+    def write_bytes(self, name: str, blob: bytes) -> str:
+        """
+        Write a file already rendered to bytes under 'name', and return where it has been written.
+        """
+        return self.write(name, lambda stream: stream.write(blob))
+
+    def close(self):
+        pass
+
+    def abort(self):
+        """
+        Close the sink after an error, leaving nothing incomplete behind where it can.
+        """
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Durability(NamedTuple):
+    """
+    How a DirectorySink makes the filled files durable, i.e. survive a crash of the machine.
+
+    Whatever the policy, each file is written to a temporary file next to it, and renamed
+    once complete, so that a crash never leaves a half-written file under its name.
+
+    Attributes:
+        policy -- 'none': leave flushing the files to the operating system, they may be
+                lost or empty after a crash of the machine,
+            'file': fsync each file before renaming it, and its directory after,
+            'batch': fsync each file before renaming it, and the directories of the files
+                renamed since the last batch every 'files' files or 'seconds' seconds,
+                and when the sink is closed: a file may be lost after a crash until then,
+                but never be empty under its name
+        files -- the number of files of a batch
+        seconds -- the longest time a file waits for its batch, checked as files are written
+    """
+
+    policy: str = "none"
+    files: int = 256
+    seconds: float = 1.0
+
+    def check(self):
+        """
+        Raise a FillOutputDirError if the policy is not one of DURABILITY_POLICIES.
+        """
+        if self.policy not in DURABILITY_POLICIES:
+            raise FillOutputDirError(
+                f"The durability policy {self.policy!r} is incorrect!"
+                f"It should be one of {DURABILITY_POLICIES}."
+            )
+
+
+class DirectorySink(Sink):
+    """
+    Write each filled file into a directory, e.g. one made by create_output_dir.
+
+    Each file is written to a temporary file of a unique name in the same directory, then
+    renamed atomically, so that a crash never leaves a half-written file for a consumer to pick
+    up, and concurrent fills of the directory never write to the same temporary file. How the
+    files are flushed to the disk is set by durability, see Durability.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        durability: Durability = Durability(),
+        remove_stale: bool = True,
+    ):
+        """
+        :param output_dir: The directory of the filled files
+        :param durability: When the filled files are flushed to the disk, default is never
+        :param remove_stale: Remove the temporary files older than STALE_SECONDS, left in
+            output_dir by a crashed fill, those of a running fill are younger
+        """
+        durability.check()
+        self.output_dir = output_dir
+        self.durability = durability
+        # Directories of the files renamed since the last batch
+        self._pending: Set[str] = set()
+        self._count = 0
+        self._synced = time.monotonic()
+        self._lock = threading.Lock()
+        if remove_stale:
+            remove_stale_files(output_dir)
+
+    def __getstate__(self):
+        # A copy sent to a worker process does not scan the directory again
+        return {
+            "output_dir": self.output_dir,
+            "durability": self.durability,
+            "remove_stale": False,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def write(self, name: str, render: Render) -> str:
+        full_path = path.join(self.output_dir, name)
+        temporary = temporary_path(full_path)
+        try:
+            render(temporary)
+        except BaseException:
+            remove_file(temporary)
+            raise
+        self.commit(temporary, full_path)
+        return full_path
+
+    def write_bytes(self, name: str, blob: bytes) -> str:
+        return self.write(name, lambda full_path: write_file(full_path, blob))
+
+    def commit(self, temporary: str, full_path: str):
+        """
+        Rename a complete temporary file to 'full_path', flushing it as durability says.
+        """
+        policy = self.durability.policy
+        if policy != "none":
+            fsync_file(temporary)
+        os.replace(temporary, full_path)
+        if policy == "file":
+            fsync_directory(path.dirname(full_path))
+        else:
+            self.renamed(full_path)
+
+    def renamed(self, full_path: str):
+        """
+        Add the directory of a file renamed, e.g. by a worker process, to the batch,
+        and fsync the batch when it is due. Only the 'batch' policy has batches.
+        """
+        if self.durability.policy != "batch":
+            return
+        with self._lock:
+            self._pending.add(path.dirname(full_path))
+            self._count += 1
+            due = (
+                self._count >= self.durability.files
+                or time.monotonic() - self._synced >= self.durability.seconds
+            )
+        if due:
+            self.sync()
+
+    def sync(self):
+        """
+        fsync the directories of the files renamed since the last batch.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._count = 0
+            self._synced = time.monotonic()
+        for directory in sorted(pending):
+            fsync_directory(directory)
+
+    def close(self):
+        self.sync()
+
+
+def temporary_path(full_path: str) -> str:
+    """
+    Create the empty temporary file 'full_path' is written to, before it is renamed,
+    and return its path. Its name is unique, and holds the name of 'full_path'.
+    """
+    directory, name = path.split(full_path)
+    while True:
+        temporary = path.join(
+            directory,
+            f"{TEMPORARY_PREFIX}{name}.{secrets.token_hex(6)}{TEMPORARY_SUFFIX}",
+        )
+        try:
+            # Like open, the permissions of the file are those the umask leaves
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return temporary
+
+
+def final_path(full_path: str) -> str:
+    """
+    The file a temporary file is renamed to, see temporary_path, any other path otherwise.
+
+    >>> final_path("out/.filler-a001.docx.5f2c9e01a4b7.tmp"), final_path("out/a001.docx")
+    ('out/a001.docx', 'out/a001.docx')
+    """
+    directory, name = path.split(full_path)
+    if name.startswith(TEMPORARY_PREFIX) and name.endswith(TEMPORARY_SUFFIX):
+        name = name[len(TEMPORARY_PREFIX) : -len(TEMPORARY_SUFFIX)].rpartition(".")[0]
+        return path.join(directory, name)
+    return full_path
+
+
+def remove_stale_files(directory: str):
+    """
+    Remove the temporary files of 'directory' older than STALE_SECONDS, see temporary_path.
+    """
+    oldest = time.time() - STALE_SECONDS
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if not (
+                entry.name.startswith(TEMPORARY_PREFIX)
+                and entry.name.endswith(TEMPORARY_SUFFIX)
+            ):
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < oldest:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def write_file(full_path: str, blob: bytes):
+    with open(full_path, "wb") as f:
+        f.write(blob)
+
+
+def remove_file(full_path: str):
+    try:
+        os.remove(full_path)
+    except OSError:
+        pass
+
+
+def fsync_file(full_path: str):
+    """
+    Flush a file to the disk, unless it has been removed since it was written.
+    """
+    try:
+        fd = os.open(full_path, os.O_RDWR)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(directory: str):
+    """
+    Flush the entries of a directory, i.e. the names of the files renamed into it, to the disk.
+    Directories can not be opened on every platform, e.g. Windows, where this does nothing.
+    """
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ArchiveSink(Sink):
+    """
+    Append each filled file to a single archive as it is produced.
+
+    An archive given by path is written to a temporary file next to it, renamed once the
+    sink is closed, so that an error or a crash never leaves a truncated archive under its
+    name; when the sink is aborted the temporary file is removed. An archive given as a
+    stream is the caller's, and holds the files written until then.
+    Each name can only be written once, a name already in the archive raises a
+    FillOutputNameError.
+    """
+
+    def __init__(self, file: Union[str, IO[bytes]]):
+        """
+        :param file: Path or writable binary stream of the archive
+        """
+        self.file = file
+        self.temporary = temporary_path(file) if isinstance(file, str) else None
+        self.names: Set[str] = set()
+
+    @property
+    def target(self) -> Union[str, IO[bytes]]:
+        """
+        The path or stream the archive is written to.
+        """
+        return self.file if self.temporary is None else self.temporary
+
+    def check_name(self, name: str):
+        if name in self.names:
+            raise FillOutputNameError(f"{name!r} is already in the archive!")
+
+    def write(self, name: str, render: Render) -> str:
+        self.check_name(name)
+        buffer = BytesIO()
+        render(buffer)
+        return self.write_bytes(name, buffer.getvalue())
+
+    def write_bytes(self, name: str, blob: bytes) -> str:
+        self.check_name(name)
+        self.add(name, blob)
+        self.names.add(name)
+        return name
+
+    @abstractmethod
+    def add(self, name: str, blob: bytes):
+        """
+        Add the member 'name' holding 'blob' to the archive.
+        """
+
+    @abstractmethod
+    def close_archive(self):
+        pass
+
+    def close(self):
+        self.close_archive()
+        if self.temporary is not None:
+            os.replace(self.temporary, self.file)
+            self.temporary = None
+
+    def abort(self):
+        try:
+            self.close_archive()
+        finally:
+            if self.temporary is not None:
+                remove_file(self.temporary)
+                self.temporary = None
+
+
+class ZipSink(ArchiveSink):
+    """
+    Append each filled file to a single zip archive as it is produced.
+
+    Only one filled file is held in memory at a time. Filled docx and xlsx files
+    are zip packages already, so they are stored without compression by default.
+    See ArchiveSink for when the archive is complete.
+    """
+
+    def __init__(
+        self,
+        file: Union[str, IO[bytes]],
+        compression: int = zipfile.ZIP_STORED,
+        compresslevel: Optional[int] = None,
+    ):
+        super().__init__(file)
+        try:
+            self.zip = zipfile.ZipFile(
+                self.target, "w", compression=compression, compresslevel=compresslevel
+            )
+        except BaseException:
+            if self.temporary is not None:
+                remove_file(self.temporary)
+            raise
+
+    def add(self, name: str, blob: bytes):
+        info = zipfile.ZipInfo(name, time.localtime()[:6])
+        info.compress_type = self.zip.compression
+        info.external_attr = 0o644 << 16
+        self.zip.writestr(info, blob)
+
+    def close_archive(self):
+        self.zip.close()
+
+
+class TarSink(ArchiveSink):
+    """
+    Append each filled file to a single tar archive as it is produced.
+
+    The archive is written as a stream, and only one filled file is held in memory at a time.
+    See ArchiveSink for when the archive is complete.
+    """
+
+    def __init__(self, file: Union[str, IO[bytes]], compression: str = ""):
+        """
+        :param file: Path or writable binary stream of the archive
+        :param compression: '' (default), 'gz', 'bz2' or 'xz'
+        """
+        super().__init__(file)
+        mode = f"w|{compression}"
+        try:
+            if self.temporary is not None:
+                self.tar = tarfile.open(self.temporary, mode)
+            else:
+                self.tar = tarfile.open(fileobj=file, mode=mode)
+        except BaseException:
+            if self.temporary is not None:
+                remove_file(self.temporary)
+            raise
+
+    def add(self, name: str, blob: bytes):
+        info = tarfile.TarInfo(name)
+        info.size = len(blob)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self.tar.addfile(info, BytesIO(blob))
+
+    def close_archive(self):
+        self.tar.close()
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
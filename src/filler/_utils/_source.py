@@ -0,0 +1,127 @@
+from itertools import count
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ._utils import is_dataframe
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "iter_rows",
+    "csv_rows",
+    "parquet_rows",
+    "cursor_rows",
+]
+
+# (row label, row data)
+Row = Tuple[Any, Union["pd.Series", Dict[str, Any]]]
+
+
+def iter_rows(
+    data: Union["pd.DataFrame", Dict[str, Dict[str, Any]], Iterable[Any]],
+) -> Iterator[Row]:
+    """
+    Iterate over (row label, row data) pairs of the data, without loading it all.
+
+    'data' can be a DataFrame, a dictionary of rows by label, or an iterable of
+    DataFrame chunks (e.g. pd.read_csv(..., chunksize=...)), of (row label, row data)
+    pairs (e.g. csv_rows, parquet_rows, cursor_rows), or of rows, labelled by their position.
+
+    >>> list(iter_rows({"a001": {"A": 1}}))
+    [('a001', {'A': 1})]
+    >>> list(iter_rows([{"A": 1}, {"A": 2}]))
+    [(0, {'A': 1}), (1, {'A': 2})]
+    >>> import pandas as pd
+    >>> [key for key, _ in iter_rows(pd.DataFrame({"A": [1, 2]}, index=["x", "y"]))]
+    ['x', 'y']
+    """
+    if is_dataframe(data):
+        yield from data.iterrows()
+        return
+    if isinstance(data, dict):
+        yield from data.items()
+        return
+
+    position = count()
+    for item in data:
+        if is_dataframe(item):
+            yield from item.iterrows()
+        elif isinstance(item, tuple):
+            yield item
+        else:
+            yield next(position), item
+
+
+def csv_rows(path: str, chunksize: int = 10000, **kwargs) -> Iterator["pd.DataFrame"]:
+    """
+    Read a csv file 'chunksize' rows at a time, and iterate over its rows in DataFrame chunks.
+    The row labels are the row positions in the file. Columns are read with the nullable
+    dtypes of pandas by default, so that an integer column with empty cells keeps its
+    integers, e.g. 1 rather than 1.0, in every chunk.
+    :param path: Path of the csv file
+    :param chunksize: Number of rows held in memory at a time
+    :param kwargs: Other parameters of pd.read_csv
+    """
+    import pandas as pd
+
+    kwargs.setdefault("dtype_backend", "numpy_nullable")
+    with pd.read_csv(path, chunksize=chunksize, **kwargs) as reader:
+        yield from reader
+
+
+def parquet_rows(path: str, columns: Optional[List[str]] = None) -> Iterator[Row]:
+    """
+    Read a parquet file one row group at a time, and iterate over its rows.
+    The row labels are the row positions in the file. Requires pyarrow.
+    :param path: Path of the parquet file
+    :param columns: Columns to read, default is all of them
+    """
+    import pyarrow.parquet as pq
+
+    position = count()
+    parquet = pq.ParquetFile(path)
+    for index in range(parquet.num_row_groups):
+        for row in parquet.read_row_group(index, columns=columns).to_pylist():
+            yield next(position), row
+
+
+def cursor_rows(cursor, size: int = 1000) -> Iterator[Row]:
+    """
+    Fetch the result of an executed DB-API cursor 'size' rows at a time, and iterate over its rows.
+    The row labels are the row positions in the result.
+    :param cursor: A DB-API cursor, on which a query has been executed, a statement
+        returning no rows, e.g. an UPDATE, has no rows to iterate over
+    :param size: Number of rows fetched at a time
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").execute("SELECT 1 AS A, 'x' AS B")
+    >>> list(cursor_rows(cursor))
+    [(0, {'A': 1, 'B': 'x'})]
+    """
+    if cursor.description is None:
+        return
+    columns = [column[0] for column in cursor.description]
+
+    position = count()
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+        for row in rows:
+            yield next(position), dict(zip(columns, row))
+
+
+if __name__ == "__main__":
+    import doctest
+
+    doctest.testmod()
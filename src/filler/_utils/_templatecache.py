@@ -0,0 +1,271 @@
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ._fill import load_template
+from ._metrics import Metrics
+
+__all__ = [
+    "TemplateCache",
+    "template_cache",
+]
+
+# (absolute path, engine, compresslevel)
+TemplateKey = Tuple[str, Optional[str], Optional[int]]
+
+
+class CachedTemplate(NamedTuple):
+    """
+    A template loaded by a TemplateCache.
+
+    Attributes:
+        renderer -- the template, as loaded by load_template
+        mtime -- the modification time of the template file when it was loaded, in ns
+        size -- the size of the template file when it was loaded
+        memory -- the estimated memory held by each of its renderers
+        pool -- the renderers of the template, renderers are not thread safe, see RendererPool
+    """
+
+    renderer: Any
+    mtime: int
+    size: int
+    memory: int
+    pool: "RendererPool"
+
+
+class RendererPool:
+    """
+    The renderers of a template, each rendering in one thread at a time.
+
+    The pool starts with the renderer loaded by the cache. When every renderer is busy,
+    another one is loaded, up to 'size' renderers, so that threads render the same
+    template concurrently. Beyond that, threads wait for a renderer to be free.
+    """
+
+    def __init__(self, renderer: Any, size: int, load: Callable[[], Any]):
+        """
+        :param renderer: The first renderer of the template
+        :param size: The largest number of renderers
+        :param load: Function loading another renderer of the template
+        """
+        self.size = size
+        self.count = 1
+        self._load = load
+        self._idle: List[Any] = [renderer]
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def hold(self) -> Iterator[Any]:
+        """
+        Hold a free renderer while in the block, loading another one when all are busy.
+        """
+        with self._condition:
+            while not self._idle and self.count >= self.size:
+                self._condition.wait()
+            if self._idle:
+                renderer = self._idle.pop()
+            else:
+                renderer = None
+                self.count += 1
+
+        if renderer is None:
+            try:
+                renderer = self._load()
+            except BaseException:
+                with self._condition:
+                    self.count -= 1
+                    self._condition.notify()
+                raise
+
+        try:
+            yield renderer
+        finally:
+            with self._condition:
+                self._idle.append(renderer)
+                self._condition.notify()
+
+
+class TemplateCache:
+    """
+    Templates loaded by load_template, kept across fills, so that filling a template
+    again does not parse it again.
+
+    Templates are found by path, engine and compresslevel, and loaded again when the
+    modification time or the size of their file changed. At most max_entries templates,
+    holding at most max_bytes, are kept, the least recently used are evicted first.
+    The memory held by a template is estimated by the uncompressed size of its package.
+
+    The cache can be shared by threads. A renderer only renders in one thread at a time:
+    threads checking the same template out concurrently get renderers of their own, up to
+    renderers_per_template of them, loaded as needed, see RendererPool. Each of them counts
+    in the estimated memory of the template.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        max_bytes: int = 512 * 2**20,
+        renderers_per_template: int = 4,
+    ):
+        """
+        :param max_entries: Number of templates kept
+        :param max_bytes: Estimated memory of the templates kept
+        :param renderers_per_template: Number of threads rendering a template at a time
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.renderers_per_template = renderers_per_template
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._templates: "OrderedDict[TemplateKey, CachedTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Held while a template loads, so that threads missing it load it once
+        self._loading: Dict[TemplateKey, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @property
+    def memory(self) -> int:
+        """
+        The estimated memory of the renderers of the templates kept.
+        """
+        return sum(
+            cached.memory * cached.pool.count for cached in self._templates.values()
+        )
+
+    def get(
+        self,
+        template: str,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> CachedTemplate:
+        """
+        Return a template from the cache, loading it when it is missing or its file changed.
+        Its renderer must not render in several threads at a time, see checkout.
+        Parameters are those of load_template.
+        """
+        path = os.path.abspath(template)
+        key = (path, engine, compresslevel)
+        # Taken before loading, so that a file changing while it loads is loaded again next time
+        stat = os.stat(path)
+
+        cached = self._lookup(key, stat, metrics)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            # Loaded by another thread meanwhile
+            cached = self._lookup(key, stat, metrics)
+            if cached is not None:
+                return cached
+
+            with self._lock:
+                self.misses += 1
+            if metrics is not None:
+                metrics.count("template_cache_misses")
+            renderer = load_template(path, engine, compresslevel, metrics)
+            cached = CachedTemplate(
+                renderer,
+                stat.st_mtime_ns,
+                stat.st_size,
+                package_size(path),
+                RendererPool(
+                    renderer,
+                    self.renderers_per_template,
+                    lambda: load_template(path, engine, compresslevel),
+                ),
+            )
+
+            with self._lock:
+                self._loading.pop(key, None)
+                self._templates[key] = cached
+                while len(self._templates) > 1 and (
+                    len(self._templates) > self.max_entries
+                    or self.memory > self.max_bytes
+                ):
+                    self._remove(next(iter(self._templates)))
+                    self.evictions += 1
+
+        return cached
+
+    def _lookup(
+        self, key: TemplateKey, stat: os.stat_result, metrics: Optional[Metrics]
+    ) -> Optional[CachedTemplate]:
+        """
+        Return a cached template if its file did not change, forget it if it did.
+        """
+        with self._lock:
+            cached = self._templates.get(key)
+            if cached is None:
+                return None
+            if (cached.mtime, cached.size) != (stat.st_mtime_ns, stat.st_size):
+                self.invalidations += 1
+                self._remove(key)
+                return None
+
+            self._templates.move_to_end(key)
+            self.hits += 1
+        if metrics is not None:
+            metrics.count("template_cache_hits")
+        return cached
+
+    @contextmanager
+    def checkout(
+        self,
+        template: str,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> Iterator[Any]:
+        """
+        Get a template from the cache, see get, and hold one of its renderers while in the block.
+
+            with template_cache.checkout("a.docx") as renderer:
+                fill_docx(data, renderer, "out.docx")
+        """
+        cached = self.get(template, engine, compresslevel, metrics)
+        with cached.pool.hold() as renderer:
+            yield renderer
+
+    def _remove(self, key: TemplateKey):
+        self._templates.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hits, misses, invalidations and evictions of the cache,
+        and the number and estimated memory of its templates.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "templates": len(self._templates),
+                "bytes": self.memory,
+            }
+
+
+def package_size(path: str) -> int:
+    """
+    Return the uncompressed size of the members of a zip package.
+    """
+    with zipfile.ZipFile(path) as package:
+        return sum(info.file_size for info in package.infolist())
+
+
+# The cache shared by the fillers of the process
+template_cache = TemplateCache()
@@ -1,19 +1,22 @@
 import random
-import numpy as np
-import pandas as pd
+import sys
 
 
 __all__ = [
     "is_number",
     "rand_float",
     "is_empty",
+    "is_series",
+    "is_dataframe",
 ]
 
 
 def is_empty(value: object) -> bool:
     """
     Checks generally if a given value is empty or not.
+    numpy and pandas values are only checked when those modules have been imported by the caller.
 
+    >>> import numpy as np, pandas as pd
     >>> print(is_empty(None))
     True
     >>> print(is_empty(np.nan))
@@ -36,19 +39,48 @@ def is_empty(value: object) -> bool:
     False
 
     """
-    if isinstance(value, (np.ndarray, pd.DataFrame, pd.Series)):
-        return value.size == 0 or value.isna().all()
-    elif isinstance(value, (float, np.float32, np.float64)):
-        return np.isnan(value)
+    np = sys.modules.get("numpy")
+    pd = sys.modules.get("pandas")
+
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.size == 0 or bool(value.isna().all(axis=None))
+    elif np is not None and isinstance(value, np.ndarray):
+        return value.size == 0 or pd is not None and pd.isna(value).all()
+    elif isinstance(value, float) or np is not None and isinstance(value, np.floating):
+        return value != value  # NaN
     elif value is None or value == {} or value == []:
         return True
     elif isinstance(value, str) and value.strip() == "":
         return True
-    elif pd.isnull(value):  # This checks for pd.NA
+    elif isinstance(value, (list, tuple, dict)):  # e.g. the items of repeating rows
+        return False
+    elif pd is not None and pd.isnull(value):  # This checks for pd.NA
         return True
     return False
 
 
+def is_series(value: object) -> bool:
+    """
+    Checks if a value is a pandas Series, without importing pandas.
+
+    >>> is_series({"A": 1})
+    False
+    """
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.Series)
+
+
+def is_dataframe(value: object) -> bool:
+    """
+    Checks if a value is a pandas DataFrame, without importing pandas.
+
+    >>> is_dataframe([{"A": 1}])
+    False
+    """
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(value, pd.DataFrame)
+
+
 def is_number(str: str) -> bool:
     """
     Determine whether a string is a number, and return True if it is a number, else False
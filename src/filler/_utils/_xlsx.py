@@ -0,0 +1,113 @@
+from typing import IO, Any, List, Optional, Union
+
+from openpyxl import load_workbook
+
+from ._metrics import Metrics, timed
+from ._placeholder import (
+    XlsxPlaceholder,
+    placeholder_key,
+    fill_placeholder,
+    is_only_placeholder,
+)
+
+__all__ = [
+    "XlsxRenderer",
+    "compile_xlsx",
+]
+
+
+class XlsxRenderer:
+    """
+    A xlsx template loaded and parsed once, which can be rendered many times.
+
+    The placeholder cells are found once by compile_xlsx, each render only
+    touches those cells, and puts them back after saving, with their number format,
+    which openpyxl changes for dates and times.
+
+    Rows are not repeated: a placeholder like '{{items.qty}}' is the plain key
+    'items.qty', only the 'zip' engine repeats rows for the items of a list.
+    """
+
+    def __init__(self, template: str, metrics: Optional[Metrics] = None):
+        self.template = template
+        with timed(metrics, "load"):
+            self.book = load_workbook(template)
+        with timed(metrics, "scan"):
+            self.placeholders = compile_xlsx(self.book, metrics)
+            self._cells = [
+                self.book[placeholder.sheet][placeholder.coordinate]
+                for placeholder in self.placeholders
+            ]
+            self._formats = [cell.number_format for cell in self._cells]
+        # The data keys referenced by the template
+        self.keys = {placeholder.key for placeholder in self.placeholders}
+
+    def render(
+        self,
+        data: Union[dict, Any],
+        full_path: Union[str, IO[bytes]],
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Render 'data' into the template and save to 'full_path'.
+        :param data: Data to fill, can be of type pandas.Series or dict
+        :param full_path: Path where the filled file is saved, or a writable binary stream
+        :param metrics: Receives the timings of the render and save phases, see Metrics
+        """
+        try:
+            substituted = 0
+            with timed(metrics, "render"):
+                for cell, placeholder in zip(self._cells, self.placeholders):
+                    # If the placeholder can be found in the data, replace the placeholder with the corresponding data
+                    if placeholder.key in data:
+                        cell.value = fill_placeholder(
+                            placeholder, data[placeholder.key]
+                        )
+                        substituted += 1
+
+            # Save the result file
+            with timed(metrics, "save"):
+                self.book.save(full_path)
+
+            if metrics is not None:
+                metrics.count("placeholders", substituted)
+        finally:
+            for cell, placeholder, number_format in zip(
+                self._cells, self.placeholders, self._formats
+            ):
+                cell.value = placeholder.value
+                cell.number_format = number_format
+
+
+def compile_xlsx(book, metrics: Optional[Metrics] = None) -> List[XlsxPlaceholder]:
+    """
+    Scan all cells of all worksheets of a workbook once, and return the placeholder cells.
+    :param book: An openpyxl workbook
+    :param metrics: Receives the number of cells scanned, see Metrics
+    """
+    placeholders = []
+    scanned = 0
+
+    # Iterate through all worksheets
+    for sheet in book.worksheets:
+
+        # Iterate through all cells in the worksheet
+        for row in sheet.iter_rows():
+            scanned += len(row)
+            for cell in row:
+                value = cell.value
+                # If the cell value is a string, and contains a placeholder (e.g., '{{A}}')
+                if isinstance(value, str) and "{{" in value:
+                    placeholders.append(
+                        XlsxPlaceholder(
+                            sheet.title,
+                            cell.coordinate,
+                            placeholder_key(value),
+                            is_only_placeholder(value),
+                            value,
+                        )
+                    )
+
+    if metrics is not None:
+        metrics.count("cells_scanned", scanned)
+    return placeholders
@@ -0,0 +1,954 @@
+import datetime
+import html
+import math
+import numbers
+import posixpath
+import re
+from functools import partial
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from xml.etree import ElementTree
+
+from ._placeholder import (
+    ITEM_PLACEHOLDER_PATTERN,
+    XlsxPlaceholder,
+    placeholder_key,
+    fill_placeholder,
+    is_only_placeholder,
+    item_placeholders,
+)
+from ._metrics import Metrics, timed
+from ._utils import is_empty, is_dataframe, is_series
+from ._zip import deflated_member, read_members, write_members
+
+__all__ = [
+    "XlsxZipRenderer",
+]
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# A cell element, either empty '<c r="A1"/>' or with content '<c r="A1" t="s"><v>0</v></c>'
+CELL_PATTERN = re.compile(rb"<c\b([^>]*?)(?:/>|>(.*?)</c>)", re.DOTALL)
+ATTR_PATTERN = re.compile(rb'([\w:]+)="([^"]*)"')
+VALUE_PATTERN = re.compile(rb"<v>([^<]*)</v>")
+TEXT_PATTERN = re.compile(rb"<t(?:\s[^>]*)?>(.*?)</t>", re.DOTALL)
+# A row element, either empty '<row r="1"/>' or with cells '<row r="1"><c .../></row>'
+ROW_PATTERN = re.compile(rb"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.DOTALL)
+# The attributes holding cell references which move with their rows, e.g. merged cells
+REF_ATTR_PATTERN = re.compile(rb'(?<=\s)(r|ref|sqref)="([^"]*)"')
+CELL_REF_PATTERN = re.compile(rb"(\$?[A-Z]{1,3}\$?)(\d+)")
+# The text of a formula, and the cell references or ranges of its sheet in it, e.g. 'B$2:B4',
+# not those of other sheets, e.g. 'Rates!A1', nor names or functions, e.g. 'LOG10('
+FORMULA_PATTERN = re.compile(rb"(<f\b[^>]*>)([^<]+)(?=</f>)")
+FORMULA_REF_PATTERN = re.compile(
+    rb"(?<![\w.!$:])(\$?[A-Z]{1,3})(\$?)(\d+)(?::(\$?[A-Z]{1,3})(\$?)(\d+))?(?![\w(!:])"
+)
+DIMENSION_PATTERN = re.compile(rb"<dimension\b[^>]*/>")
+# The style of a cell, and the number formats and cell styles of a stylesheet
+STYLE_ATTR_PATTERN = re.compile(rb'\ss="(\d+)"')
+STYLESHEET_PATTERN = re.compile(rb"<styleSheet\b[^>]*>")
+NUM_FMTS_PATTERN = re.compile(rb"<numFmts\b[^>]*?(?:/>|>(.*?)</numFmts>)", re.DOTALL)
+NUM_FMT_PATTERN = re.compile(rb"<numFmt\b([^>]*?)/>")
+CELL_XFS_PATTERN = re.compile(rb"<cellXfs\b[^>]*?(?:/>|>(.*?)</cellXfs>)", re.DOTALL)
+XF_PATTERN = re.compile(rb"<xf\b([^>]*?)(/>|>.*?</xf>)", re.DOTALL)
+XF_FORMAT_PATTERN = re.compile(rb'\s(?:numFmtId|applyNumberFormat)="[^"]*"')
+# The literal text and locales of a number format, which do not make it a date format,
+# and the letters which do, see openpyxl.styles.numbers.is_date_format
+FORMAT_LITERAL_PATTERN = re.compile(r'".*?"|\[(?!hh?\]|mm?\]|ss?\])[^\]]*\]')
+DATE_FORMAT_PATTERN = re.compile(r"(?<![_\\])[dmhysDMHYS]")
+
+# The number format openpyxl gives a cell filled with each date and time type,
+# see openpyxl.cell.cell.TIME_FORMATS, and those built into Excel
+DATE_FORMATS = [
+    (datetime.datetime, "yyyy-mm-dd h:mm:ss"),
+    (datetime.date, "yyyy-mm-dd"),
+    (datetime.time, "h:mm:ss"),
+    (datetime.timedelta, "[hh]:mm:ss"),
+]
+DATE_TYPES = tuple(kind for kind, _ in DATE_FORMATS)
+BUILTIN_FORMAT_IDS = {"h:mm:ss": 21}
+BUILTIN_DATE_FORMAT_IDS = {14, 15, 16, 17, 18, 19, 20, 21, 22, 45, 46, 47}
+# The first id of the number formats of a workbook, those below are built in
+CUSTOM_FORMAT_ID = 164
+# Excel serial numbers are days since this one, see openpyxl.utils.datetime.to_excel
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+# Worksheets with repeating rows are written in chunks of about this size
+CHUNK_SIZE = 1 << 20
+
+# (placeholder, cell attributes without the type, template cell xml)
+SheetCell = Tuple[XlsxPlaceholder, bytes, bytes]
+
+# The style of a placeholder cell, b"0" when it has none -> the style of the cell
+# filled with each date and time type, see date_styles
+DateStyles = Dict[bytes, Dict[type, bytes]]
+
+
+class RegionCell(NamedTuple):
+    """
+    A cell of a repeating row.
+
+    Attributes:
+        column -- the column of the cell, e.g. b'A'
+        attrs -- the cell attributes but its reference, and its type when it holds placeholders
+        body -- the end of the xml of a cell without placeholders, after its attributes
+        text -- the template value of a cell with placeholders
+        field -- the item field when the placeholder of the item is the whole cell value
+        scalar -- the placeholder of the row data in the cell, if any
+    """
+
+    column: bytes
+    attrs: bytes
+    body: Optional[bytes]
+    text: Optional[str]
+    field: Optional[str]
+    scalar: Optional[XlsxPlaceholder]
+
+
+class Region(NamedTuple):
+    """
+    Consecutive template rows repeated for each item of a list of the row data.
+
+    Attributes:
+        key -- the data key of the list, e.g. 'items' for '{{items.qty}}'
+        first -- the number of the first template row
+        rows -- the attributes but the number, and the cells, of each template row
+    """
+
+    key: str
+    first: int
+    rows: List[Tuple[bytes, List[RegionCell]]]
+
+
+class XlsxZipRenderer:
+    """
+    A xlsx template treated as a zip package, which can be rendered many times without openpyxl.
+
+    The placeholder cells are located once in the worksheet xml, and each worksheet
+    holding placeholders is split into static byte segments around them. A render
+    joins the segments with the filled cells, and copies the other package parts
+    without recompressing them. Numbers, booleans, dates and times filled into a
+    whole-cell placeholder keep their type, anything else is written as text: dates
+    and times are Excel serial numbers, with the number format openpyxl gives them,
+    in cell styles added to the stylesheet once, when the template is loaded.
+
+    Rows holding placeholders of the items of a list, e.g. '{{items.qty}}', are repeated
+    for each item of the 'items' value of the row data: a list of dicts, or a DataFrame.
+    Consecutive rows of the same list are repeated together, and the rows below move
+    down, with the merged cells, formulas and other references of the worksheet:
+    a range ending on the last repeated row grows with it, e.g. '=SUM(B2:B2)' becomes
+    '=SUM(B2:B4)' for 3 items, and the formulas of a repeated row refer to the rows of
+    their copy, but for their absolute rows, e.g. 'B$2'. An empty list keeps a blank
+    copy of its rows, so that the ranges over them stay in place. These worksheets are
+    streamed into the filled file as their rows are rendered, so memory does not grow
+    with the number of items, which can also be an iterator; references below the
+    repeated rows of an iterator are only moved after them.
+    """
+
+    def __init__(
+        self,
+        template: str,
+        compresslevel: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        self.template = template
+        self.compresslevel = compresslevel
+        with timed(metrics, "load"):
+            self.members = read_members(template)
+
+        parts = {member.info.filename: member.blob for member in self.members}
+
+        self.placeholders: List[XlsxPlaceholder] = []
+        # worksheet part name -> static segments, and the placeholder cells between them
+        self._sheets: Dict[str, Tuple[List[bytes], List[SheetCell]]] = {}
+        # worksheet part name -> static parts, compiled like the sheets above, and the
+        # repeating rows between them
+        self._regions: Dict[
+            str, List[Union[Tuple[List[bytes], List[SheetCell]], Region]]
+        ] = {}
+
+        with timed(metrics, "scan"):
+            shared_strings = read_shared_strings(parts)
+            for title, name in read_sheets(parts):
+                compiled = compile_regions(title, parts[name], shared_strings, metrics)
+                if compiled is not None:
+                    self._regions[name] = compiled
+                    for segments, cells in compiled[::2]:
+                        self.placeholders.extend(
+                            placeholder for placeholder, _, _ in cells
+                        )
+                    continue
+
+                segments, cells = compile_sheet(
+                    title, parts[name], shared_strings, metrics
+                )
+                if cells:
+                    self._sheets[name] = (segments, cells)
+                    self.placeholders.extend(placeholder for placeholder, _, _ in cells)
+            self._styles = self.add_date_styles(parts)
+        # The data keys referenced by the template
+        self.keys = {placeholder.key for placeholder in self.placeholders}
+        for compiled in self._regions.values():
+            for region in compiled[1::2]:
+                self.keys.add(region.key)
+                self.keys.update(
+                    cell.scalar.key
+                    for _, cells in region.rows
+                    for cell in cells
+                    if cell.scalar is not None
+                )
+
+    def add_date_styles(self, parts: Dict[str, bytes]) -> DateStyles:
+        """
+        Add the styles of the dates and times filled into the placeholder cells to the
+        stylesheet of the package, see date_styles, and return them.
+        """
+        bases = {attrs for _, cells in self._sheets.values() for _, attrs, _ in cells}
+        for compiled in self._regions.values():
+            bases.update(attrs for _, cells in compiled[::2] for _, attrs, _ in cells)
+            bases.update(
+                cell.attrs
+                for region in compiled[1::2]
+                for _, cells in region.rows
+                for cell in cells
+                if cell.body is None
+            )
+        name = read_styles(parts)
+        if not bases or name is None:
+            return {}
+
+        blob, styles = date_styles(parts[name], map(cell_style, bases))
+        self.members = [
+            (
+                deflated_member(member, blob, self.compresslevel)
+                if member.info.filename == name
+                else member
+            )
+            for member in self.members
+        ]
+        return styles
+
+    def render(
+        self,
+        data: Union[dict, Any],
+        full_path: Union[str, IO[bytes]],
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Render 'data' into the template and save to 'full_path'.
+        :param data: Data to fill, can be of type pandas.Series or dict
+        :param full_path: Path where the filled file is saved, or a writable binary stream
+        :param metrics: Receives the timings of the render and save phases, see Metrics
+        """
+        with timed(metrics, "render"):
+            rendered = self.render_parts(data, metrics)
+        with timed(metrics, "save"):
+            write_members(full_path, self.members, rendered, self.compresslevel)
+
+        if metrics is not None:
+            metrics.count(
+                "placeholders",
+                sum(placeholder.key in data for placeholder in self.placeholders),
+            )
+
+    def render_parts(
+        self, data: Union[dict, Any], metrics: Optional[Metrics] = None
+    ) -> Dict[str, Union[bytes, Iterator[bytes]]]:
+        """
+        Render 'data' into the worksheets holding placeholders, and return them by member name.
+        Worksheets with repeating rows are chunks, rendered while they are consumed.
+        :param data: Data to fill, can be of type pandas.Series or dict
+        :param metrics: Receives the rows_repeated counter, see Metrics
+        """
+        rendered = {
+            name: render_sheet(segments, cells, data, self._styles)
+            for name, (segments, cells) in self._sheets.items()
+        }
+        for name, compiled in self._regions.items():
+            rendered[name] = render_regions(compiled, data, metrics, self._styles)
+        return rendered
+
+
+def read_shared_strings(parts: Dict[str, bytes]) -> List[str]:
+    """
+    Return the plain text of each shared string of the package.
+    """
+    blob = parts.get("xl/sharedStrings.xml")
+    if blob is None:
+        return []
+
+    strings = []
+    for si in ElementTree.fromstring(blob):
+        # Plain '<si><t>' or rich text '<si><r><t>', phonetic runs '<rPh>' are skipped
+        texts = [child for child in si if child.tag == f"{{{MAIN_NS}}}t"]
+        for run in si.iterfind(f"{{{MAIN_NS}}}r"):
+            texts.extend(run.iterfind(f"{{{MAIN_NS}}}t"))
+        strings.append("".join(t.text or "" for t in texts))
+
+    return strings
+
+
+def read_workbook_rels(parts: Dict[str, bytes]) -> Dict[str, Tuple[str, str]]:
+    """
+    Return the (type, part name) pair of each relationship of the workbook, by id.
+    """
+    targets = {}
+    for rel in ElementTree.fromstring(parts["xl/_rels/workbook.xml.rels"]):
+        target = rel.get("Target")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id")] = (rel.get("Type", ""), target)
+    return targets
+
+
+def read_styles(parts: Dict[str, bytes]) -> Optional[str]:
+    """
+    Return the part name of the stylesheet of the package, None if it has none.
+    """
+    for kind, target in read_workbook_rels(parts).values():
+        if kind.endswith("/styles") and target in parts:
+            return target
+    return None
+
+
+def read_sheets(parts: Dict[str, bytes]) -> List[Tuple[str, str]]:
+    """
+    Return the (title, part name) pair of each worksheet of the package.
+    """
+    targets = {id: target for id, (_, target) in read_workbook_rels(parts).items()}
+
+    workbook = ElementTree.fromstring(parts["xl/workbook.xml"])
+    return [
+        (sheet.get("name"), targets[sheet.get(f"{{{REL_NS}}}id")])
+        for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet")
+        if targets.get(sheet.get(f"{{{REL_NS}}}id")) in parts
+    ]
+
+
+def compile_sheet(
+    title: str,
+    blob: bytes,
+    shared_strings: List[str],
+    metrics: Optional[Metrics] = None,
+) -> Tuple[List[bytes], List[SheetCell]]:
+    """
+    Split a worksheet xml into static segments around its placeholder cells.
+
+    Returns the segments, and for each placeholder cell the placeholder,
+    the cell attributes to keep (everything but the type) and the template cell xml.
+    The cells scanned are counted into 'metrics'.
+    """
+    segments = []
+    cells = []
+    start = 0
+    scanned = 0
+
+    for match in CELL_PATTERN.finditer(blob):
+        scanned += 1
+        attrs = dict(ATTR_PATTERN.findall(match.group(1)))
+        text = cell_text(attrs, match.group(2) or b"", shared_strings)
+
+        # If the cell value contains a placeholder (e.g., '{{A}}')
+        if text is None or "{{" not in text:
+            continue
+
+        placeholder = XlsxPlaceholder(
+            title,
+            attrs[b"r"].decode("utf-8"),
+            placeholder_key(text),
+            is_only_placeholder(text),
+            text,
+        )
+        keep = b"".join(
+            b' %s="%s"' % (name, value) for name, value in attrs.items() if name != b"t"
+        )
+
+        segments.append(blob[start : match.start()])
+        cells.append((placeholder, keep, match.group(0)))
+        start = match.end()
+
+    segments.append(blob[start:])
+    if metrics is not None:
+        metrics.count("cells_scanned", scanned)
+    return segments, cells
+
+
+def cell_text(
+    attrs: Dict[bytes, bytes], content: bytes, shared_strings: List[str]
+) -> Optional[str]:
+    """
+    Return the text of a string cell, None for other cells.
+    :param attrs: The cell attributes
+    :param content: The xml inside the cell element
+    :param shared_strings: The shared strings of the package
+    """
+    cell_type = attrs.get(b"t")
+    if cell_type == b"s":
+        value = VALUE_PATTERN.search(content)
+        return shared_strings[int(value.group(1))] if value else ""
+    if cell_type == b"inlineStr":
+        return html.unescape(b"".join(TEXT_PATTERN.findall(content)).decode("utf-8"))
+    return None
+
+
+def compile_regions(
+    title: str,
+    blob: bytes,
+    shared_strings: List[str],
+    metrics: Optional[Metrics] = None,
+) -> Optional[List[Union[Tuple[List[bytes], List[SheetCell]], Region]]]:
+    """
+    Split a worksheet xml into its repeating rows, and the static parts around them,
+    compiled by compile_sheet. Returns None when the worksheet has no repeating rows.
+
+    A row holding placeholders of the items of a list repeats for each item of that
+    list, with the next rows holding placeholders of the same list.
+    """
+    # (list key, first row number, row matches) of each region
+    regions = []
+    for match in ROW_PATTERN.finditer(blob):
+        content = match.group(2)
+        if not content or b"{{" not in content and b't="s"' not in content:
+            continue
+        number = dict(ATTR_PATTERN.findall(match.group(1))).get(b"r")
+        if number is None:  # rows are numbered by Excel and openpyxl
+            continue
+
+        key = None
+        for cell in CELL_PATTERN.finditer(content):
+            text = cell_text(
+                dict(ATTR_PATTERN.findall(cell.group(1))),
+                cell.group(2) or b"",
+                shared_strings,
+            )
+            items = item_placeholders(text or "")
+            if items:
+                key = items[0][0]
+                break
+        if key is None:
+            continue
+
+        number = int(number)
+        if regions and regions[-1][0] == key:
+            _, first, matches = regions[-1]
+            if number == first + len(matches):
+                matches.append(match)
+                continue
+        regions.append((key, number, [match]))
+
+    if not regions:
+        return None
+
+    compiled = []
+    start = 0
+    for key, first, matches in regions:
+        compiled.append(
+            compile_sheet(
+                title, blob[start : matches[0].start()], shared_strings, metrics
+            )
+        )
+        rows = [compile_region_row(match, key, shared_strings) for match in matches]
+        compiled.append(Region(key, first, rows))
+        start = matches[-1].end()
+    compiled.append(compile_sheet(title, blob[start:], shared_strings, metrics))
+    return compiled
+
+
+def compile_region_row(
+    match: "re.Match", key: str, shared_strings: List[str]
+) -> Tuple[bytes, List[RegionCell]]:
+    """
+    Return the attributes but the number, and the cells, of a repeating row of the list 'key'.
+    """
+    row_attrs = b"".join(
+        b' %s="%s"' % (name, value)
+        for name, value in ATTR_PATTERN.findall(match.group(1))
+        if name != b"r"
+    )
+
+    cells = []
+    for cell in CELL_PATTERN.finditer(match.group(2)):
+        attrs = ATTR_PATTERN.findall(cell.group(1))
+        column = CELL_REF_PATTERN.match(dict(attrs)[b"r"]).group(1)
+        text = cell_text(dict(attrs), cell.group(2) or b"", shared_strings)
+
+        if text is None or "{{" not in text:
+            keep = b"".join(b' %s="%s"' % (n, v) for n, v in attrs if n != b"r")
+            body = cell.group(0)[len(b"<c") + len(cell.group(1)) :]
+            cells.append(RegionCell(column, keep, body, None, None, None))
+            continue
+
+        keep = b"".join(b' %s="%s"' % (n, v) for n, v in attrs if n not in (b"r", b"t"))
+        whole = ITEM_PLACEHOLDER_PATTERN.fullmatch(text)
+        field = whole.group(2) if whole is not None and whole.group(1) == key else None
+        # Placeholders of the row data, e.g. '{{currency}}', are filled in each repeated row
+        rest = ITEM_PLACEHOLDER_PATTERN.sub("", text)
+        scalar = None
+        if "{{" in rest:
+            scalar = XlsxPlaceholder(
+                "", "", placeholder_key(rest), is_only_placeholder(text), text
+            )
+        cells.append(RegionCell(column, keep, None, text, field, scalar))
+
+    return row_attrs, cells
+
+
+def render_regions(
+    compiled: List[Union[Tuple[List[bytes], List[SheetCell]], Region]],
+    data: Union[dict, Any],
+    metrics: Optional[Metrics] = None,
+    styles: Optional[DateStyles] = None,
+) -> Iterator[bytes]:
+    """
+    Render a worksheet with repeating rows, see compile_regions, in chunks of about CHUNK_SIZE.
+    The rows below each repeating region, and the references to them, move down.
+    'styles' are those of the dates and times filled into its cells, see date_styles.
+    """
+    values = [
+        data[region.key] if region.key in data else None for region in compiled[1::2]
+    ]
+    # The dimension of the worksheet is only known beforehand when the lists are sized,
+    # it is optional otherwise
+    sized = all(
+        value is None or hasattr(value, "__len__") and not isinstance(value, dict)
+        for value in values
+    )
+    shifts = []
+    if sized:
+        for region, value in zip(compiled[1::2], values):
+            # An empty list keeps a blank copy of its rows, see iter_items
+            count = 1 if value is None else max(len(value), 1)
+            shifts.append(
+                (region.first + len(region.rows) - 1, (count - 1) * len(region.rows))
+            )
+
+    out = bytearray()
+    # (last template row, rows added) of the regions rendered so far
+    moved = []
+    offset = 0
+    repeated = 0
+    for index, part in enumerate(compiled):
+        if index % 2 == 0:
+            xml = render_sheet(*part, data, styles)
+            if sized:
+                xml = shift_refs(xml, shifts)
+            elif index > 0:
+                xml = shift_refs(xml, moved)
+            else:
+                xml = DIMENSION_PATTERN.sub(b"", xml, count=1)
+            out += xml
+            continue
+
+        region = part
+        height = len(region.rows)
+        value = values[index // 2]
+        count = 0
+        for item in iter_items(value):
+            number = region.first + offset + count * height
+            copy = partial(
+                shift_copy,
+                shifts=shifts if sized else moved,
+                rows=(region.first, region.first + height - 1),
+                offset=offset,
+                copy=count * height,
+            )
+            for row_attrs, cells in region.rows:
+                out += render_region_row(
+                    number, row_attrs, cells, region.key, item, data, copy, styles
+                )
+                number += 1
+            count += 1
+            if len(out) >= CHUNK_SIZE:
+                yield bytes(out)
+                out.clear()
+
+        repeated += count * height
+        moved.append((region.first + height - 1, (count - 1) * height))
+        offset += (count - 1) * height
+
+    if metrics is not None:
+        metrics.count("rows_repeated", repeated)
+    yield bytes(out)
+
+
+def iter_items(value: Any) -> Iterator[Optional[Any]]:
+    """
+    Iterate over the items of the list of a repeating region: dicts, Series, or the rows of
+    a DataFrame as dicts. A missing list yields None, its template rows are kept as they are.
+    An empty list yields an empty item, its rows are kept blank, so that the references to
+    them, e.g. '=SUM(D2:D2)', still hold a row of the list.
+    """
+    if value is None:
+        yield None
+        return
+
+    if is_dataframe(value):
+        columns = list(value.columns)
+        items = (
+            dict(zip(columns, row)) for row in value.itertuples(index=False, name=None)
+        )
+    elif isinstance(value, dict) or is_series(value):
+        items = iter([value])
+    else:
+        items = iter(value)
+
+    empty = True
+    for item in items:
+        empty = False
+        yield item
+    if empty:
+        yield {}
+
+
+def render_region_row(
+    number: int,
+    row_attrs: bytes,
+    cells: List[RegionCell],
+    key: str,
+    item: Optional[Any],
+    data: Union[dict, Any],
+    copy: Optional[Callable[[bytes], bytes]] = None,
+    styles: Optional[DateStyles] = None,
+) -> bytes:
+    """
+    Return the xml of a repeating row numbered 'number', filled with an item of the list 'key'.
+    'copy' moves the references of the formulas of the row to the rows of its copy, see shift_copy.
+    'styles' are those of the dates and times filled into its cells, see date_styles.
+    """
+    out = [b'<row r="%d"%s>' % (number, row_attrs)]
+    for cell in cells:
+        attrs = b' r="%s%d"%s' % (cell.column, number, cell.attrs)
+        if cell.body is not None:
+            body = cell.body
+            if copy is not None and b"<f" in body:
+                body = copy(body)
+            out.append(b"<c%s%s" % (attrs, body))
+            continue
+
+        if item is None:
+            value = cell.text
+        elif cell.field is not None:
+            value = item.get(cell.field)
+        else:
+            value = ITEM_PLACEHOLDER_PATTERN.sub(
+                lambda match: fill_item_field(match, key, item), cell.text
+            )
+            if cell.scalar is not None and cell.scalar.key in data:
+                value = fill_placeholder(
+                    cell.scalar._replace(value=value), data[cell.scalar.key]
+                )
+        out.append(cell_xml(attrs, value, styles))
+    out.append(b"</row>")
+    return b"".join(out)
+
+
+def fill_item_field(match: "re.Match", key: str, item: Any) -> str:
+    """
+    Return the text replacing an item placeholder inside a cell value.
+    """
+    if match.group(1) != key:
+        return match.group(0)
+    value = item.get(match.group(2))
+    return "" if is_empty(value) else str(value)
+
+
+def shift_refs(xml: bytes, shifts: List[Tuple[int, int]]) -> bytes:
+    """
+    Move down the row numbers and cell references of the attributes and formulas of a
+    worksheet xml, by the rows added below each repeating region.
+    :param xml: Part of a worksheet xml
+    :param shifts: (last template row, rows added) of each repeating region
+
+    >>> shift_refs(b'<c r="B4"><f>SUM(B2:B3)*B1+LOG10(B4)</f></c>', [(3, 2)])
+    b'<c r="B6"><f>SUM(B2:B5)*B1+LOG10(B6)</f></c>'
+    """
+    if not any(added for _, added in shifts):
+        return xml
+
+    def shift(row: int, absolute: bool = False) -> int:
+        return row + sum(added for last, added in shifts if row > last)
+
+    def shift_end(row: int, absolute: bool = False) -> int:
+        return row + sum(added for last, added in shifts if row >= last)
+
+    def shift_ref(match: "re.Match") -> bytes:
+        return b"%s%d" % (match.group(1), shift(int(match.group(2))))
+
+    def shift_attr(match: "re.Match") -> bytes:
+        value = match.group(2)
+        if value.isdigit():  # the number of a row
+            return b'%s="%d"' % (match.group(1), shift(int(value)))
+        return b'%s="%s"' % (match.group(1), CELL_REF_PATTERN.sub(shift_ref, value))
+
+    xml = REF_ATTR_PATTERN.sub(shift_attr, xml)
+    return shift_formulas(xml, shift, shift_end)
+
+
+def shift_copy(
+    xml: bytes,
+    shifts: List[Tuple[int, int]],
+    rows: Tuple[int, int],
+    offset: int,
+    copy: int,
+) -> bytes:
+    """
+    Move the cell references of the formulas of a copy of repeating rows: those of the
+    repeated rows to the rows of the copy, but for their absolute rows, the others like
+    shift_refs does.
+    :param xml: Cells of a repeated row
+    :param shifts: (last template row, rows added) of each repeating region, see shift_refs
+    :param rows: The first and last template rows repeated
+    :param offset: The rows added by the repeating regions above
+    :param copy: The rows of the previous copies
+
+    >>> shift_copy(b'<f>B2*C$2+B1</f>', [], (2, 2), offset=0, copy=3)
+    b'<f>B5*C$2+B1</f>'
+    """
+    first, last = rows
+
+    def shift(row: int, absolute: bool = False) -> int:
+        if first <= row <= last:
+            return row + offset + (0 if absolute else copy)
+        return row + sum(added for end, added in shifts if row > end)
+
+    return shift_formulas(xml, shift, shift)
+
+
+def shift_formulas(
+    xml: bytes,
+    shift: Callable[[int, bool], int],
+    shift_end: Callable[[int, bool], int],
+) -> bytes:
+    """
+    Move the cell references of the formulas of a worksheet xml.
+    :param xml: Part of a worksheet xml
+    :param shift: Returns the new row of a reference, or of the start of a range,
+        from its row and whether it is absolute, e.g. 'B$2'
+    :param shift_end: Returns the new row of the end of a range
+    """
+    if b"<f" not in xml:
+        return xml
+
+    def shift_ref(match: "re.Match") -> bytes:
+        column, absolute, row, end_column, end_absolute, end_row = match.groups()
+        ref = b"%s%s%d" % (column, absolute, shift(int(row), bool(absolute)))
+        if end_row is None:
+            return ref
+        end = shift_end(int(end_row), bool(end_absolute))
+        return b"%s:%s%s%d" % (ref, end_column, end_absolute, end)
+
+    def shift_formula(match: "re.Match") -> bytes:
+        return match.group(1) + FORMULA_REF_PATTERN.sub(shift_ref, match.group(2))
+
+    return FORMULA_PATTERN.sub(shift_formula, xml)
+
+
+def render_sheet(
+    segments: List[bytes],
+    cells: List[SheetCell],
+    data: Union[dict, Any],
+    styles: Optional[DateStyles] = None,
+) -> bytes:
+    """
+    Join the static segments of a worksheet with its filled placeholder cells.
+    'styles' are those of the dates and times filled into them, see date_styles.
+    """
+    out = [segments[0]]
+    for (placeholder, attrs, cell), segment in zip(cells, segments[1:]):
+        # If the placeholder can be found in the data, replace the placeholder with the corresponding data
+        if placeholder.key in data:
+            cell = cell_xml(
+                attrs, fill_placeholder(placeholder, data[placeholder.key]), styles
+            )
+        out.append(cell)
+        out.append(segment)
+
+    return b"".join(out)
+
+
+def cell_xml(attrs: bytes, value: Any, styles: Optional[DateStyles] = None) -> bytes:
+    """
+    Return the xml of a cell holding 'value', typed the way openpyxl would write it.
+    :param attrs: The cell attributes, without the type
+    :param value: The value of the cell
+    :param styles: The styles of the dates and times filled into the cell, see date_styles.
+        Without them, dates and times are written as text
+    """
+    if value == "" if isinstance(value, str) else is_empty(value):
+        return b"<c%s/>" % attrs
+    if isinstance(value, DATE_TYPES) and styles:
+        kind = next(kind for kind in DATE_TYPES if isinstance(value, kind))
+        style = styles.get(cell_style(attrs), {}).get(kind)
+        if style is not None:
+            serial = excel_serial(value)
+            return b'<c%s s="%s"><v>%s</v></c>' % (
+                STYLE_ATTR_PATTERN.sub(b"", attrs),
+                style,
+                repr(serial).encode("utf-8"),
+            )
+    if isinstance(value, bool):
+        return b'<c%s t="b"><v>%d</v></c>' % (attrs, value)
+    if isinstance(value, numbers.Integral):
+        return b"<c%s><v>%d</v></c>" % (attrs, value)
+    if isinstance(value, numbers.Real) and math.isfinite(value):
+        return b"<c%s><v>%s</v></c>" % (attrs, repr(float(value)).encode("utf-8"))
+
+    text = str(value)
+    if text.startswith("=") and len(text) > 1:
+        return b"<c%s><f>%s</f></c>" % (
+            attrs,
+            html.escape(text[1:], quote=False).encode("utf-8"),
+        )
+
+    return b'<c%s t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (
+        attrs,
+        html.escape(text, quote=False).encode("utf-8"),
+    )
+
+
+def cell_style(attrs: bytes) -> bytes:
+    """
+    Return the style of a cell, b"0" when it has none.
+
+    >>> cell_style(b' r="A1" s="3"'), cell_style(b' r="A1"')
+    (b'3', b'0')
+    """
+    match = STYLE_ATTR_PATTERN.search(attrs)
+    return b"0" if match is None else match.group(1)
+
+
+def date_styles(blob: bytes, bases: Iterable[bytes]) -> Tuple[bytes, DateStyles]:
+    """
+    Add to a stylesheet a copy of each cell style of 'bases' for each date and time type,
+    with the number format openpyxl gives them, see DATE_FORMATS, and return the stylesheet
+    and the styles. Like openpyxl, a style with a date format already is kept as it is.
+    :param blob: The xml of the stylesheet
+    :param bases: The styles of the placeholder cells, see cell_style
+    """
+    cell_xfs = CELL_XFS_PATTERN.search(blob)
+    if cell_xfs is None:
+        return blob, {}
+    xfs = [match for match in XF_PATTERN.finditer(cell_xfs.group(1) or b"")]
+
+    num_fmts = NUM_FMTS_PATTERN.search(blob)
+    formats = {}
+    for attrs in NUM_FMT_PATTERN.findall(num_fmts and num_fmts.group(1) or b""):
+        attrs = dict(ATTR_PATTERN.findall(attrs))
+        code = html.unescape(attrs.get(b"formatCode", b"").decode("utf-8"))
+        formats[int(attrs.get(b"numFmtId", b"0"))] = code
+    ids = {code: id for id, code in formats.items()}
+    ids.update(BUILTIN_FORMAT_IDS)
+    added = []
+    for _, code in DATE_FORMATS:
+        if code not in ids:
+            ids[code] = max([CUSTOM_FORMAT_ID - 1, *formats, *ids.values()]) + 1
+            added.append(
+                b'<numFmt numFmtId="%d" formatCode="%s"/>'
+                % (ids[code], html.escape(code).encode("utf-8"))
+            )
+
+    styles = {}
+    copies = []
+    for base in sorted(set(bases), key=int):
+        if int(base) >= len(xfs):
+            continue
+        xf = xfs[int(base)]
+        attrs = dict(ATTR_PATTERN.findall(xf.group(1)))
+        number_format = int(attrs.get(b"numFmtId", b"0"))
+        if number_format in BUILTIN_DATE_FORMAT_IDS or is_date_format(
+            formats.get(number_format)
+        ):
+            styles[base] = {kind: base for kind in DATE_TYPES}
+            continue
+        styles[base] = {}
+        for kind, code in DATE_FORMATS:
+            styles[base][kind] = b"%d" % (len(xfs) + len(copies))
+            copies.append(
+                b'<xf numFmtId="%d" applyNumberFormat="1"%s%s'
+                % (ids[code], XF_FORMAT_PATTERN.sub(b"", xf.group(1)), xf.group(2))
+            )
+    if not copies:
+        return blob, styles
+
+    # The cell styles come after the number formats, they are replaced first
+    content = b"".join(xf.group(0) for xf in xfs) + b"".join(copies)
+    blob = b'%s<cellXfs count="%d">%s</cellXfs>%s' % (
+        blob[: cell_xfs.start()],
+        len(xfs) + len(copies),
+        content,
+        blob[cell_xfs.end() :],
+    )
+    if added:
+        content = (num_fmts and num_fmts.group(1) or b"") + b"".join(added)
+        element = b'<numFmts count="%d">%s</numFmts>' % (
+            len(formats) + len(added),
+            content,
+        )
+        if num_fmts is not None:
+            blob = blob[: num_fmts.start()] + element + blob[num_fmts.end() :]
+        else:
+            end = STYLESHEET_PATTERN.search(blob).end()
+            blob = blob[:end] + element + blob[end:]
+    return blob, styles
+
+
+def is_date_format(code: Optional[str]) -> bool:
+    """
+    Return whether a number format code formats dates or times.
+
+    >>> is_date_format("yyyy-mm-dd"), is_date_format('0.00" days"'), is_date_format(None)
+    (True, False, False)
+    """
+    if code is None:
+        return False
+    code = FORMAT_LITERAL_PATTERN.sub("", code.split(";")[0])
+    return DATE_FORMAT_PATTERN.search(code) is not None
+
+
+def excel_serial(value: Any) -> float:
+    """
+    Return the Excel serial number of a date, time or duration, in days,
+    see openpyxl.utils.datetime.to_excel. Like openpyxl, Excel does not support timezones.
+
+    >>> excel_serial(datetime.date(2024, 1, 2)), excel_serial(datetime.time(18))
+    (45293.0, 0.75)
+    """
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds() / 86400
+    if isinstance(value, (datetime.datetime, datetime.time)) and value.tzinfo:
+        raise TypeError(
+            "Excel does not support timezones in datetimes. "
+            "The tzinfo in the datetime/time object must be set to None."
+        )
+    if isinstance(value, datetime.time):
+        return time_fraction(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+
+    days = (value - EXCEL_EPOCH).days
+    # Excel counts 1900-02-29, which did not exist
+    if 0 < days <= 60:
+        days -= 1
+    return days + time_fraction(value.time())
+
+
+def time_fraction(value: datetime.time) -> float:
+    """
+    Return the fraction of a day of a time.
+    """
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    return (seconds + value.microsecond / 10**6) / 86400
@@ -0,0 +1,140 @@
+import copy
+import struct
+import zipfile
+import zlib
+from typing import IO, Dict, Iterable, List, NamedTuple, Optional, Union
+
+__all__ = [
+    "ZipMember",
+    "read_members",
+    "write_members",
+    "deflated_member",
+]
+
+# Bit 3 of the general purpose flags: sizes and CRC follow the data in a data descriptor
+DATA_DESCRIPTOR_FLAG = 0x08
+
+
+class ZipMember(NamedTuple):
+    """
+    A member of a zip package, kept both compressed and uncompressed.
+
+    Attributes:
+        info -- the ZipInfo of the member, with its compression type, sizes and CRC
+        raw -- the compressed bytes of the member, as stored in the package
+        blob -- the uncompressed bytes of the member
+    """
+
+    info: zipfile.ZipInfo
+    raw: bytes
+    blob: bytes
+
+
+def read_members(file: Union[str, IO[bytes]]) -> List[ZipMember]:
+    """
+    Read every member of a zip package, with its compressed and uncompressed bytes.
+    :param file: Path or binary file object of the zip package
+    """
+    members = []
+    with zipfile.ZipFile(file) as zin:
+        for info in zin.infolist():
+            blob = zin.read(info)
+
+            # Skip the local file header, see zipfile.ZipFile.open
+            zin.fp.seek(info.header_offset)
+            header = struct.unpack(
+                zipfile.structFileHeader, zin.fp.read(zipfile.sizeFileHeader)
+            )
+            zin.fp.seek(header[10] + header[11], 1)  # file name and extra field
+            raw = zin.fp.read(info.compress_size)
+
+            members.append(ZipMember(info, raw, blob))
+
+    return members
+
+
+def write_members(
+    file: Union[str, IO[bytes]],
+    members: List[ZipMember],
+    rendered: Dict[str, Union[bytes, Iterable[bytes]]],
+    compresslevel: Optional[int] = None,
+):
+    """
+    Write a zip package from the members of another one.
+
+    Members found in 'rendered' are deflated from their new bytes, the others
+    are copied as they are, with their original compressed bytes and CRC.
+    New bytes can also be chunks, which are deflated as they come, so that
+    the whole member is never held in memory.
+    :param file: Path or binary file object to write the zip package to
+    :param members: The members of the source package, see read_members
+    :param rendered: New uncompressed bytes, or chunks of them, by member name
+    :param compresslevel: Deflate level of the rendered members, default is zlib's
+    """
+    with zipfile.ZipFile(file, "w") as zout:
+        for member in members:
+            name = member.info.filename
+            if name not in rendered:
+                write_raw(zout, member)
+            elif isinstance(rendered[name], bytes):
+                zout.writestr(
+                    member.info,
+                    rendered[name],
+                    compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=compresslevel,
+                )
+            else:
+                info = copy.copy(member.info)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info._compresslevel = compresslevel
+                info.file_size = 0
+                with zout.open(info, "w") as f:
+                    for chunk in rendered[name]:
+                        f.write(chunk)
+
+
+def write_raw(zout: zipfile.ZipFile, member: ZipMember):
+    """
+    Append a member to a zip file being written, without recompressing it.
+    See zipfile.ZipFile._open_to_write and zipfile._ZipWriteFile.close.
+    """
+    info = copy.copy(member.info)
+    # Sizes and CRC are known, so they go in the local header
+    info.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+
+    if zout._seekable:
+        zout.fp.seek(zout.start_dir)
+    info.header_offset = zout.fp.tell()
+    zout._didModify = True
+
+    zout.fp.write(info.FileHeader())
+    zout.fp.write(member.raw)
+    zout.start_dir = zout.fp.tell()
+
+    zout.filelist.append(info)
+    zout.NameToInfo[info.filename] = info
+
+
+def deflated_member(
+    member: ZipMember, blob: bytes, compresslevel: Optional[int] = None
+) -> ZipMember:
+    """
+    Return a member holding 'blob' instead, deflated once here, so that writing it
+    copies its compressed bytes like those of any other member.
+    :param member: The member of the source package, see read_members
+    :param blob: The new uncompressed bytes of the member
+    :param compresslevel: Deflate level of the new bytes, default is zlib's
+    """
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION if compresslevel is None else compresslevel,
+        zlib.DEFLATED,
+        -zlib.MAX_WBITS,
+    )
+    raw = compressor.compress(blob) + compressor.flush()
+
+    info = copy.copy(member.info)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.file_size = len(blob)
+    info.compress_size = len(raw)
+    info.CRC = zlib.crc32(blob)
+    return ZipMember(info, raw, blob)
@@ -1,6 +1,12 @@
 from .oto import RowTemplateFiller
+from .mto import RowsTemplateFiller
+from .otm import RowTemplatesFiller
+from .remote import RemoteRowTemplateFiller
 
 
 __all__ = [
     "RowTemplateFiller",
+    "RowsTemplateFiller",
+    "RowTemplatesFiller",
+    "RemoteRowTemplateFiller",
 ]
@@ -0,0 +1,483 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .._utils import (
+    fill_docx,
+    fill_xlsx,
+    fill_rows,
+    fill_parallel,
+    fill_async,
+    fill_pipeline,
+    iter_batches,
+    load_template,
+    prepare_rows,
+    is_fill_rows_type,
+    is_fill_rows_iter,
+    is_empty,
+    is_output_name,
+    is_dataframe,
+    Sink,
+    DirectorySink,
+    Manifest,
+    fill_incremental,
+    template_digest,
+    Schema,
+    SchemaIssue,
+    template_placeholders,
+    validate_data,
+    ShardManifest,
+    fill_shard,
+    fill_consolidated,
+    FillOptions,
+)
+
+from .._types import (
+    FillDataCollectionTypeError,
+    FillDataCollectionEmptyError,
+    FillOutputNameError,
+    FillSchemaError,
+    FillShardError,
+    FillResult,
+)
+
+from .._utils._metrics import timed_iter
+from .oto import check_template, check_outputdir, check_template_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "RowsTemplateFiller",
+]
+
+
+class RowsTemplateFiller:
+    """
+    many rows data fill into a template file, one output file per row
+
+    How the rows are filled is set by options, a FillOptions whose fields can also be
+    given as keyword arguments, e.g. RowsTemplateFiller(data, template, output_dir,
+    workers=4). The options are checked together, see FillOptions.check.
+
+    The template is loaded and parsed once per fill, and every row is rendered from it.
+    With workers greater than 1, the rows are rendered by a pool of worker processes,
+    each of them loading the template once. The engine rendering the template can be
+    chosen among those of load_template, e.g. 'zip', which also takes the deflate
+    level of the rendered parts as compresslevel.
+
+    Before rendering, the rows are normalized column by column by prepare_rows: empty
+    values become '', the columns found in formats are converted to strings with their
+    format spec or function, and the renderers are handed plain python dicts.
+
+    The data can also be an iterable of rows, e.g. csv_rows, parquet_rows or cursor_rows,
+    which is read lazily while filling: with ifill, memory stays flat whatever the
+    number of rows. Such data can only be filled once.
+
+    The filled files are written into output_dir, which can also be a sink, e.g. a ZipSink
+    or a TarSink appending every filled file to a single archive.
+    Files written into a directory are renamed into place once complete, and a DirectorySink
+    with a Durability, e.g. DirectorySink(output_dir, Durability("batch")), flushes them to
+    the disk per file or in batches; close it once the fill is done.
+
+    With metrics, e.g. a MetricsSummary, the time spent in each phase of the fill
+    (load, scan, convert, render, save) and counters such as the bytes written are
+    measured, in the worker processes too.
+
+    With incremental, a manifest in output_dir records the digest of the template and
+    of the data of each filled row. A fill then only renders the rows whose data or
+    template changed since the last fill, and deletes the files of the rows which no
+    longer exist. An interrupted incremental fill resumes where it stopped.
+
+    With a cache, rows holding the same values for the placeholders of the template are
+    only rendered once, the other ones get a copy or a hard link of the filled file,
+    see RenderCache.
+
+    With template_cache, the template is loaded by a TemplateCache, True for the cache
+    shared by the process, so that fills of the same template do not parse it again.
+    Worker processes load the template themselves.
+
+    afill and aifill fill without blocking the event loop, with at most concurrency rows
+    in flight, see fill_async.
+
+    With a pipeline, rows are read, normalized, rendered and written by separate stages
+    running concurrently, connected by bounded queues: a fast stage waits for a slow one,
+    so memory stays flat on huge fills. The render stage runs in threads, each loading the
+    template, or in worker processes; it can not be combined with workers, cache or
+    template_cache.
+    See Pipeline for the number of workers and the queue depths of each stage.
+
+    With a schema, the columns of the data are checked against the placeholders of the
+    template before any row is rendered: missing columns, unexpected dtypes and columns
+    with too many empty values raise a FillSchemaError listing every issue. validate
+    returns those issues instead. Data read lazily, e.g. csv_rows, is not validated.
+
+    With a shard, only the rows of one of several shards are filled, e.g. by separate
+    processes or machines sharing output_dir, see Shard. The output file names are those
+    of the whole data, so they are unique across shards. Each shard records the files it
+    filled in its own manifest in output_dir, which verify_shards checks once all the
+    shards are done. Incremental fills of shards keep one manifest per shard.
+    Shards and incremental fills apply to fill and ifill.
+
+    With consolidate, the rows are filled into a few consolidated files rather than one
+    file per row: a workbook with a copy of the worksheets of the template per row, named
+    after the output name of the row, or a document with a copy of the body of the template
+    per row, each in its own section. Each file is written once, and the next rows roll over
+    to the next file every rows_per_file rows, see Consolidate. Consolidated files are
+    filled by the 'zip' engines, in this process, and can not be incremental, sharded,
+    nor combined with workers, cache, template_cache or a pipeline.
+    They apply to fill and ifill.
+
+    """
+
+    def __init__(
+        self,
+        data: Union["pd.DataFrame", Dict[str, Dict[str, Any]], Iterable[Any]],
+        template: str,
+        output_dir: Union[str, Sink],
+        options: FillOptions = FillOptions(),
+        **fields: Any,
+    ):
+        # check data param
+        if not (is_fill_rows_type(data) or is_fill_rows_iter(data)):
+            raise FillDataCollectionTypeError(
+                "The type of the data parameter is incorrect!\n"
+                "It is either a DataFrame, a dictionary of dictionaries or an iterable of rows!"
+            )
+        if is_fill_rows_type(data) and is_empty(data):
+            raise FillDataCollectionEmptyError("the value of data parameter is empty!")
+
+        # check template param
+        check_template(template)
+        # check output_dir param
+        if not isinstance(output_dir, Sink):
+            check_outputdir(output_dir)
+            output_dir = DirectorySink(output_dir)
+        # check options param, and the fields replacing its own
+        try:
+            options = options._replace(**fields)
+        except ValueError as e:
+            raise TypeError(
+                f"{type(self).__name__}() got options which are not FillOptions: {e}"
+            ) from None
+        options.check(output_dir)
+        shard = options.shard
+        if shard is not None and shard.key is not None:
+            if is_dataframe(data) and shard.key not in data.columns:
+                raise FillShardError(
+                    f"The key of the shard is incorrect!"
+                    f"{shard.key!r} is not a column of the data!"
+                )
+
+        self.data = data
+        self.template = template
+        self.sink = output_dir
+        self.extension = template[-4:]
+        self.options = options._replace(
+            template_cache=check_template_cache(options.template_cache)
+        )
+        self._placeholders = None
+
+        fillers = {
+            "docx": fill_docx,
+            "xlsx": fill_xlsx,
+        }
+
+        self.filler = fillers[self.extension]
+
+        self._output_name = None
+
+    @property
+    def output_name(self) -> Optional[str]:
+        """
+        The column whose values name the output files.
+        When it is None, the row labels (DataFrame index, dictionary keys or row positions) are used.
+        """
+        return self._output_name
+
+    @output_name.setter
+    def output_name(self, value: Optional[str]):
+        if (
+            value is not None
+            and is_dataframe(self.data)
+            and value not in self.data.columns
+        ):
+            raise FillOutputNameError(
+                f"The value of output_name parameter is incorrect!"
+                f"{value!r} is not a column of the data!"
+            )
+        self._output_name = value
+
+    def rows(self, data: Any = None) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Iterate over (row label, normalized row dict) pairs of the data, see prepare_rows.
+        :param data: Part of the data, e.g. a batch of iter_batches, default is the whole data
+        """
+        return timed_iter(
+            prepare_rows(self.data if data is None else data, self.options.formats),
+            self.options.metrics,
+            "convert",
+        )
+
+    def row_output_name(self, key: Any, row: Dict[str, Any]) -> str:
+        """
+        The output file name, without extension, of a row.
+        """
+        name = str(key if self.output_name is None else row[self.output_name])
+        if not is_output_name(name):
+            raise FillOutputNameError(
+                f"The output name {name!r} of row {key!r} is incorrect!"
+                "It should be a file name without an extension, with or without a relative directory!"
+            )
+        return name
+
+    def jobs(self, data: Any = None) -> Iterator[Tuple[Any, Dict[str, Any], str]]:
+        """
+        Iterate over (row label, row data, output file name) tuples of the data.
+        :param data: Part of the data, see rows
+        """
+        for key, row in self.rows(data):
+            yield key, row, f"{self.row_output_name(key, row)}.{self.extension}"
+
+    def placeholders(self) -> Set[str]:
+        """
+        The data keys referenced by the template, see template_placeholders.
+        """
+        if self._placeholders is None:
+            self._placeholders = template_placeholders(
+                self.template, self.options.engine, self.options.compresslevel
+            )
+        return self._placeholders
+
+    def validate(self, schema: Optional[Schema] = None) -> List[SchemaIssue]:
+        """
+        Check the data against a schema, and return the issues found, see validate_data.
+        Data read lazily is not validated.
+        :param schema: What the data should hold, default is the schema of the filler, or
+            only requiring the placeholders of the template to be columns of the data
+        """
+        if is_fill_rows_iter(self.data):
+            return []
+        schema = schema or self.options.schema or Schema()
+        return validate_data(self.data, self.placeholders(), schema)
+
+    def check_schema(self):
+        """
+        Raise a FillSchemaError listing the issues found by validate, if any.
+        """
+        issues = self.validate()
+        if issues:
+            raise FillSchemaError(
+                "The data does not match the template!\n"
+                + "\n".join(f"{issue.column!r} {issue.detail}" for issue in issues),
+                issues,
+            )
+
+    def fill(self) -> List[FillResult]:
+        """
+        Fill every row into the template, and return the results in row order.
+        Each result holds where the sink wrote the row, e.g. its output path,
+        or the error raised while filling it.
+        """
+        return list(self.ifill())
+
+    def ifill(self) -> Iterator[FillResult]:
+        """
+        Fill every row into the template, and yield the results in row order, see fill.
+        Rows are read from the data as they are filled.
+        """
+        if self.options.schema is not None:
+            self.check_schema()
+
+        if self.options.consolidate is not None:
+            return fill_consolidated(
+                self.jobs(),
+                self.template,
+                self.sink,
+                self.options.consolidate,
+                self.options.compresslevel,
+                self.options.metrics,
+            )
+
+        # Shards and incremental fills wrap the fill of their jobs, see fill_jobs
+        fill = self.fill_incremental if self.options.incremental else self.fill_jobs
+        if self.options.shard is not None:
+            manifest = ShardManifest(
+                self.sink.output_dir, self.options.shard, self.template_digest()
+            )
+            return fill_shard(self.jobs(), fill, manifest)
+
+        if fill == self.fill_jobs and self.options.pipeline is not None:
+            # The pipeline reads and normalizes the rows in its own stages
+            return self.fill_pipeline(
+                iter_batches(self.data, self.options.pipeline.batch),
+                lambda batch: list(self.jobs(batch)),
+            )
+
+        return fill(self.jobs())
+
+    async def afill(
+        self,
+        executor: Optional[Executor] = None,
+        concurrency: int = 4,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> List[FillResult]:
+        """
+        Fill every row into the template without blocking the event loop,
+        and return the results in row order, see aifill.
+        """
+        return [
+            result async for result in self.aifill(executor, concurrency, semaphore)
+        ]
+
+    def aifill(
+        self,
+        executor: Optional[Executor] = None,
+        concurrency: int = 4,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> AsyncIterator[FillResult]:
+        """
+        Fill every row into the template without blocking the event loop,
+        and yield the results in row order.
+        :param executor: Where the rows are rendered, default is the default executor of the loop.
+            Worker processes of a ProcessPoolExecutor keep the template loaded
+        :param concurrency: Number of rows in flight
+        :param semaphore: Bounds the renders running at a time, e.g. shared by the fills of a service
+
+        The options of the fill which an async fill can not honour, e.g. shard or incremental,
+        raise a ParamError, see FillOptions.check_async.
+        """
+        self.options.check_async()
+        if self.options.schema is not None:
+            self.check_schema()
+
+        return fill_async(
+            self.jobs(),
+            self.template,
+            self.sink,
+            self.options.engine,
+            self.options.compresslevel,
+            executor,
+            concurrency,
+            semaphore,
+            self.options.template_cache,
+        )
+
+    def template_digest(self) -> str:
+        """
+        The digest of the template and of the options it is filled with, see template_digest.
+        """
+        return template_digest(
+            self.template, self.options.engine, self.options.compresslevel
+        )
+
+    def fill_incremental(
+        self, jobs: Iterable[Tuple[Any, Dict[str, Any], str]]
+    ) -> Iterator[FillResult]:
+        """
+        Fill the jobs whose file is not up to date in the manifest of output_dir, see fill_incremental.
+        """
+        if self.options.shard is None:
+            manifest = Manifest(self.sink.output_dir, self.template_digest())
+        else:
+            manifest = Manifest(
+                self.sink.output_dir,
+                self.template_digest(),
+                self.options.shard.incremental_name,
+            )
+        return fill_incremental(
+            jobs, self.fill_jobs, manifest, metrics=self.options.metrics
+        )
+
+    def fill_jobs(
+        self, jobs: Iterable[Tuple[Any, Dict[str, Any], str]]
+    ) -> Iterator[FillResult]:
+        """
+        Fill jobs into the template, with the pipeline or the worker processes if any, see jobs.
+        """
+        if self.options.pipeline is not None:
+            return self.fill_pipeline(iter_batches(jobs, self.options.pipeline.batch))
+
+        if self.options.workers > 1:
+            return fill_parallel(
+                jobs,
+                self.template,
+                self.sink,
+                self.options.workers,
+                self.options.chunksize,
+                self.options.engine,
+                self.options.compresslevel,
+                self.options.metrics,
+                self.options.cache,
+            )
+
+        if self.options.template_cache is not None:
+            return self.fill_cached(jobs)
+
+        template = load_template(
+            self.template,
+            self.options.engine,
+            self.options.compresslevel,
+            self.options.metrics,
+        )
+        return fill_rows(
+            self.filler,
+            template,
+            jobs,
+            self.sink,
+            self.options.metrics,
+            self.options.cache,
+        )
+
+    def fill_cached(
+        self, jobs: Iterable[Tuple[Any, Dict[str, Any], str]]
+    ) -> Iterator[FillResult]:
+        """
+        Fill jobs into the template held from the template cache while filling.
+        """
+        with self.options.template_cache.checkout(
+            self.template,
+            self.options.engine,
+            self.options.compresslevel,
+            self.options.metrics,
+        ) as template:
+            yield from fill_rows(
+                self.filler,
+                template,
+                jobs,
+                self.sink,
+                self.options.metrics,
+                self.options.cache,
+            )
+
+    def fill_pipeline(
+        self,
+        batches: Iterable[Any],
+        prepare: Callable[[Any], List[Tuple[Any, Dict[str, Any], str]]] = list,
+    ) -> Iterator[FillResult]:
+        """
+        Fill batches of rows into the template through the pipeline, see fill_pipeline.
+        """
+        return fill_pipeline(
+            batches,
+            prepare,
+            self.template,
+            self.sink,
+            self.options.pipeline,
+            self.options.engine,
+            self.options.compresslevel,
+            self.options.metrics,
+        )
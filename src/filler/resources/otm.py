@@ -0,0 +1,198 @@
+from functools import partial
+from io import BytesIO
+from os import path
+from typing import IO, TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+
+from .._utils import (
+    fill_docx,
+    fill_xlsx,
+    prepare_row,
+    is_fill_row_type,
+    is_empty,
+    is_output_name,
+    Metrics,
+    DirectorySink,
+    TemplateCache,
+)
+
+from .._types import (
+    FillDataCollectionTypeError,
+    FillDataCollectionEmptyError,
+    FillTemplateTypeError,
+    FillOutputDirError,
+    FillOutputNameError,
+)
+
+from .._utils._prepare import Format
+from .oto import check_template, check_outputdir, check_template_cache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "RowTemplatesFiller",
+]
+
+
+class RowTemplatesFiller:
+    """
+    one row data fill into several template files, one output file per template
+
+    The row is validated, converted and normalized once, see prepare_row, and the same
+    prepared data is filled into every template, e.g. a docx letter and a xlsx statement.
+
+    The output file of each template is named by its pattern in output_names, which
+    can reference output_name and the columns of the row, e.g. '{output_name}/letter'
+    or 'statement_{customer_id}'. The default pattern of a template is output_name
+    followed by the name of the template file, e.g. 'a001_letter' for 'letter.docx'.
+
+    The engine rendering the templates, their compresslevel, metrics and template_cache
+    are those of RowTemplateFiller. When filling many rows, template_cache saves parsing
+    the templates again for each of them.
+
+    """
+
+    def __init__(
+        self,
+        data: Union["pd.Series", Dict[str, Any]],
+        templates: Sequence[str],
+        output_dir: Optional[str] = None,
+        output_names: Optional[Dict[str, str]] = None,
+        formats: Optional[Dict[str, Format]] = None,
+        metrics: Optional[Metrics] = None,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        template_cache: Union[bool, TemplateCache] = False,
+    ):
+        # check data param
+        if not is_fill_row_type(data):
+            raise FillDataCollectionTypeError(
+                "The type of the data parameter is incorrect!\n"
+                "It is either a Series or a dictionary!"
+            )
+        if is_empty(data):
+            raise FillDataCollectionEmptyError("the value of data parameter is empty!")
+
+        # check templates param
+        if isinstance(templates, str) or not templates:
+            raise FillTemplateTypeError(
+                "The value of templates parameter is incorrect!"
+                "It should be a list of docx or xlsx file paths!"
+            )
+        for template in templates:
+            check_template(template)
+        # check output_dir param
+        if output_dir is not None:
+            check_outputdir(output_dir)
+
+        self.data = prepare_row(data, formats)
+        self.templates = list(templates)
+        self.output_dir = output_dir
+        self.output_names = {
+            template: f"{{output_name}}_{path.basename(template)[:-5]}"
+            for template in self.templates
+        }
+        self.output_names.update(output_names or {})
+        self.metrics = metrics
+        self.engine = engine
+        self.compresslevel = compresslevel
+        self.template_cache = check_template_cache(template_cache)
+
+        fillers = {
+            "docx": fill_docx,
+            "xlsx": fill_xlsx,
+        }
+
+        self.fillers = [fillers[template[-4:]] for template in self.templates]
+
+        self._output_name = "a001"
+
+    @property
+    def output_name(self) -> str:
+        return self._output_name
+
+    @output_name.setter
+    def output_name(self, value: str) -> str:
+        if not is_output_name(value):
+            raise FillOutputNameError(
+                "The value of output_name parameter is incorrect!"
+                "It should be a file name without an extension, with or without a relative directory!"
+            )
+        self._output_name = value
+
+    def output_files(self) -> List[str]:
+        """
+        The output file names, with extension, of the templates, in template order.
+        """
+        files = []
+        for template in self.templates:
+            try:
+                name = self.output_names[template].format_map(
+                    {**self.data, "output_name": self.output_name}
+                )
+            except (KeyError, IndexError, ValueError) as e:
+                raise FillOutputNameError(
+                    f"The output name pattern {self.output_names[template]!r} of {template} "
+                    f"is incorrect! {e!r} can not be formatted from the row."
+                ) from e
+            if not is_output_name(name):
+                raise FillOutputNameError(
+                    f"The output name {name!r} of {template} is incorrect!"
+                    "It should be a file name without an extension, with or without a relative directory!"
+                )
+            files.append(f"{name}.{template[-4:]}")
+
+        if len(set(files)) < len(files):
+            raise FillOutputNameError(
+                f"The output names {files} of the templates should be distinct!"
+            )
+        return files
+
+    def fill(self) -> List[str]:
+        """
+        Fill the data into every template, save the filled files into output_dir,
+        and return their paths, in template order.
+        """
+        if self.output_dir is None:
+            raise FillOutputDirError(
+                "output_dir parameter is None, the filled files can not be saved!"
+            )
+        sink = DirectorySink(self.output_dir, remove_stale=False)
+        return [
+            sink.write(name, partial(self.fill_template_to, index))
+            for index, name in enumerate(self.output_files())
+        ]
+
+    def fill_to_bytes(self) -> List[bytes]:
+        """
+        Fill the data into every template, and return the contents of the filled files,
+        in template order.
+        """
+        blobs = []
+        for index in range(len(self.templates)):
+            buffer = BytesIO()
+            self.fill_template_to(index, buffer)
+            blobs.append(buffer.getvalue())
+        return blobs
+
+    def fill_template_to(self, index: int, stream: Union[str, IO[bytes]]):
+        """
+        Fill the data into the template at 'index', and write the filled file to a path
+        or a writable binary stream.
+        """
+        template, filler = self.templates[index], self.fillers[index]
+        if self.template_cache is None:
+            filler(
+                self.data,
+                template,
+                stream,
+                self.engine,
+                self.compresslevel,
+                metrics=self.metrics,
+            )
+            return
+
+        with self.template_cache.checkout(
+            template, self.engine, self.compresslevel, self.metrics
+        ) as renderer:
+            filler(self.data, renderer, stream, metrics=self.metrics)
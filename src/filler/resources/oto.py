@@ -1,8 +1,9 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from io import BytesIO
 from os import path
-from pathlib import Path
-from typing import Any, Dict, Optional, Union
-
-import pandas as pd
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Union
 
 from .._utils import (
     fill_docx,
@@ -13,6 +14,12 @@ from .._utils import (
     is_dir,
     is_empty,
     is_output_name,
+    Metrics,
+    DirectorySink,
+    TemplateCache,
+    render_bytes,
+    run_limited,
+    template_cache as shared_template_cache,
 )
 
 from .._types import (
@@ -24,6 +31,9 @@ from .._types import (
     FillOutputNameError,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 __all__ = [
     "RowTemplateFiller",
 ]
@@ -33,13 +43,32 @@ class RowTemplateFiller:
     """
     one row data fill into a template fill
 
+    The filled file is saved into output_dir by fill, or written to a binary stream by
+    fill_to, or returned as bytes by fill_to_bytes. output_dir can be None when the
+    filled file is never saved to the filesystem.
+
+    With metrics, e.g. a MetricsSummary, the time spent in each phase of the fill
+    and counters such as the bytes written are measured, see Metrics.
+
+    With template_cache, the template is loaded once by a TemplateCache, True for the
+    cache shared by the process, and fillers of the same template do not parse it again
+    as long as its file is unchanged. The engine rendering the template, and its
+    compresslevel, are those of load_template.
+
+    afill, afill_to and afill_to_bytes fill without blocking the event loop: the
+    template is rendered in an executor, and the filled file written in another thread.
+
     """
 
     def __init__(
         self,
-        data: Union[pd.Series, Dict[str, Any]],
+        data: Union["pd.Series", Dict[str, Any]],
         template: str,
-        output_dir: str,
+        output_dir: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        template_cache: Union[bool, TemplateCache] = False,
     ):
         # check data param
         if not is_fill_row_type(data):
@@ -53,12 +82,17 @@ class RowTemplateFiller:
         # check template param
         check_template(template)
         # check output_dir param
-        check_outputdir(output_dir)
+        if output_dir is not None:
+            check_outputdir(output_dir)
 
         self.data = data
         self.template = template
         self.output_dir = output_dir
         self.extension = template[-4:]
+        self.metrics = metrics
+        self.engine = engine
+        self.compresslevel = compresslevel
+        self.template_cache = check_template_cache(template_cache)
 
         fillers = {
             "docx": fill_docx,
@@ -83,8 +117,94 @@ class RowTemplateFiller:
         self._output_name = value
 
     def fill(self):
-        output_path = path.join(self.output_dir, f"{self.output_name}.{self.extension}")
-        self.filler(self.data, self.template, output_path)
+        if self.output_dir is None:
+            raise FillOutputDirError(
+                "output_dir parameter is None, the filled file can not be saved!"
+            )
+        sink = DirectorySink(self.output_dir, remove_stale=False)
+        sink.write(f"{self.output_name}.{self.extension}", self.fill_to)
+
+    def fill_to(self, stream: Union[str, IO[bytes]]):
+        """
+        Fill the data into the template, and write the filled file to a writable binary stream.
+        """
+        if self.template_cache is None:
+            self.filler(
+                self.data,
+                self.template,
+                stream,
+                self.engine,
+                self.compresslevel,
+                metrics=self.metrics,
+            )
+            return
+
+        with self.template_cache.checkout(
+            self.template, self.engine, self.compresslevel, self.metrics
+        ) as template:
+            self.filler(self.data, template, stream, metrics=self.metrics)
+
+    def fill_to_bytes(self) -> bytes:
+        """
+        Fill the data into the template, and return the content of the filled file.
+        """
+        buffer = BytesIO()
+        self.fill_to(buffer)
+        return buffer.getvalue()
+
+    async def afill(
+        self,
+        executor: Optional[Executor] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        """
+        Fill the data into the template, and save the filled file into output_dir, see fill.
+        :param executor: Where the template is rendered, default is the default executor of the loop.
+            Worker processes of a ProcessPoolExecutor keep the template loaded
+        :param semaphore: Held while rendering, e.g. to bound the renders of a service
+        """
+        if self.output_dir is None:
+            raise FillOutputDirError(
+                "output_dir parameter is None, the filled file can not be saved!"
+            )
+        sink = DirectorySink(self.output_dir, remove_stale=False)
+        blob = await self.afill_to_bytes(executor, semaphore)
+        await run_limited(
+            None, sink.write_bytes, f"{self.output_name}.{self.extension}", blob
+        )
+
+    async def afill_to(
+        self,
+        stream: IO[bytes],
+        executor: Optional[Executor] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        """
+        Fill the data into the template, and write the filled file to a writable binary stream,
+        see afill.
+        """
+        blob = await self.afill_to_bytes(executor, semaphore)
+        await run_limited(None, stream.write, blob)
+
+    async def afill_to_bytes(
+        self,
+        executor: Optional[Executor] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ) -> bytes:
+        """
+        Fill the data into the template, and return the content of the filled file, see afill.
+        """
+        if isinstance(executor, ProcessPoolExecutor):
+            render = partial(
+                render_bytes,
+                self.data,
+                self.template,
+                self.engine,
+                self.compresslevel,
+            )
+        else:
+            render = self.fill_to_bytes
+        return await run_limited(executor, render, semaphore=semaphore)
 
 
 def check_template(template: str):
@@ -96,6 +216,19 @@ def check_template(template: str):
         raise FillTemplateNotExistError(f"{template} does not exist!")
 
 
+def check_template_cache(
+    template_cache: Union[bool, TemplateCache],
+) -> Optional[TemplateCache]:
+    """
+    Return the template cache of a filler, the shared one when template_cache is True.
+    """
+    if template_cache is True:
+        return shared_template_cache
+    if template_cache is False:
+        return None
+    return template_cache
+
+
 def check_outputdir(output_dir: str):
     if not is_dir(output_dir):
         raise FillOutputDirError(
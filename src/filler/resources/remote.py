@@ -0,0 +1,123 @@
+from os import path
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Union
+
+from .._utils import (
+    is_fill_row_type,
+    is_empty,
+    is_output_name,
+    is_series,
+    DaemonClient,
+)
+
+from .._types import (
+    FillDataCollectionTypeError,
+    FillDataCollectionEmptyError,
+    FillOutputDirError,
+    FillOutputNameError,
+)
+
+from .oto import check_template, check_outputdir
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+__all__ = [
+    "RemoteRowTemplateFiller",
+]
+
+
+class RemoteRowTemplateFiller:
+    """
+    one row data fill into a template file, by a render daemon
+
+    The API of RowTemplateFiller, the template being rendered by a RenderDaemon, e.g.
+    started by 'python -m filler daemon', whose workers keep the backends imported
+    and the template parsed. The filler itself imports neither of them.
+    The data is sent to the daemon as JSON: its values should be plain JSON values,
+    strings, numbers, booleans, None, lists or dicts.
+
+    client is a DaemonClient, or the path of the socket of the daemon, default is
+    default_socket(). A client can be shared by the fillers of a process.
+
+    """
+
+    def __init__(
+        self,
+        data: Union["pd.Series", Dict[str, Any]],
+        template: str,
+        output_dir: Optional[str] = None,
+        engine: Optional[str] = None,
+        compresslevel: Optional[int] = None,
+        client: Union[DaemonClient, str, None] = None,
+    ):
+        # check data param
+        if not is_fill_row_type(data):
+            raise FillDataCollectionTypeError(
+                "The type of the data parameter is incorrect!\n"
+                "It is either a Series or a dictionary!"
+            )
+        if is_empty(data):
+            raise FillDataCollectionEmptyError("the value of data parameter is empty!")
+
+        # check template param
+        check_template(template)
+        # check output_dir param
+        if output_dir is not None:
+            check_outputdir(output_dir)
+
+        self.data = data.to_dict() if is_series(data) else dict(data)
+        self.template = path.abspath(template)
+        self.output_dir = None if output_dir is None else path.abspath(output_dir)
+        self.extension = template[-4:]
+        self.engine = engine
+        self.compresslevel = compresslevel
+        if not isinstance(client, DaemonClient):
+            client = DaemonClient(client)
+        self.client = client
+
+        self._output_name = "a001"
+
+    @property
+    def output_name(self) -> str:
+        return self._output_name
+
+    @output_name.setter
+    def output_name(self, value: str) -> str:
+        if not is_output_name(value):
+            raise FillOutputNameError(
+                "The value of output_name parameter is incorrect!"
+                "It should be a file name without an extension, with or without a relative directory!"
+            )
+        self._output_name = value
+
+    def fill(self) -> str:
+        """
+        Fill the data into the template, save the filled file into output_dir, and return its path.
+        """
+        if self.output_dir is None:
+            raise FillOutputDirError(
+                "output_dir parameter is None, the filled file can not be saved!"
+            )
+        output_path = path.join(self.output_dir, f"{self.output_name}.{self.extension}")
+        return self.client.render(
+            self.data, self.template, output_path, self.engine, self.compresslevel
+        )
+
+    def fill_to(self, stream: Union[str, IO[bytes]]):
+        """
+        Fill the data into the template, and write the filled file to a writable binary stream.
+        """
+        if isinstance(stream, str):
+            self.client.render(
+                self.data, self.template, stream, self.engine, self.compresslevel
+            )
+            return
+        stream.write(self.fill_to_bytes())
+
+    def fill_to_bytes(self) -> bytes:
+        """
+        Fill the data into the template, and return the content of the filled file.
+        """
+        return self.client.render(
+            self.data, self.template, None, self.engine, self.compresslevel
+        )
@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.fixture
+def xlsx_template(tmp_path):
+    """
+    A xlsx template with a text and a number placeholder.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Statement"
+    sheet["A1"] = "{{name}}"
+    sheet["B1"] = "{{amount}}"
+    sheet["C1"] = "Total: {{amount}} EUR"
+    path = tmp_path / "statement.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def docx_template(tmp_path):
+    """
+    A docx template with placeholders in its body.
+    """
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("Dear {{ name }}, you owe {{ amount }}.")
+    path = tmp_path / "letter.docx"
+    document.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    path = tmp_path / "out"
+    path.mkdir()
+    return str(path)
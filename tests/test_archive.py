@@ -0,0 +1,115 @@
+import os
+import tarfile
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from filler import RowsTemplateFiller, TarSink, ZipSink
+from filler._types import FillOutputNameError
+
+DATA = pd.DataFrame({"name": ["a", "b", "a"], "amount": [1, 2, 3]})
+
+
+def zip_members(archive):
+    with zipfile.ZipFile(archive) as package:
+        assert package.testzip() is None
+        return {name: package.read(name) for name in package.namelist()}
+
+
+def tar_members(archive):
+    if isinstance(archive, str):
+        package = tarfile.open(archive)
+    else:
+        package = tarfile.open(fileobj=archive)
+    with package:
+        return {
+            member.name: package.extractfile(member).read()
+            for member in package.getmembers()
+        }
+
+
+ARCHIVES = [
+    pytest.param(ZipSink, "filled.zip", zip_members, id="zip"),
+    pytest.param(
+        lambda file: TarSink(file, "gz"), "filled.tar.gz", tar_members, id="tar"
+    ),
+]
+
+
+@pytest.mark.parametrize("sink, name, members", ARCHIVES)
+def test_members_are_named_after_the_rows(xlsx_template, tmp_path, sink, name, members):
+    directory = tmp_path / "archives"
+    directory.mkdir()
+    archive = str(directory / name)
+
+    with sink(archive) as output:
+        filler = RowsTemplateFiller(DATA.iloc[:2], xlsx_template, output)
+        filler.output_name = "name"
+        results = filler.fill()
+        output.write_bytes("notes/read me.txt", b"notes")
+
+    assert [result.path for result in results] == ["a.xlsx", "b.xlsx"]
+    filled = members(archive)
+    assert sorted(filled) == ["a.xlsx", "b.xlsx", "notes/read me.txt"]
+    assert filled["a.xlsx"].startswith(b"PK")
+    assert filled["notes/read me.txt"] == b"notes"
+    assert os.listdir(directory) == [name]
+
+
+@pytest.mark.parametrize("sink, name, members", ARCHIVES)
+def test_a_name_already_in_the_archive_is_rejected(
+    xlsx_template, tmp_path, sink, name, members
+):
+    archive = str(tmp_path / name)
+
+    with sink(archive) as output:
+        filler = RowsTemplateFiller(DATA, xlsx_template, output)
+        filler.output_name = "name"
+        results = filler.fill()
+
+    assert [result.error for result in results[:2]] == [None, None]
+    assert isinstance(results[2].error, FillOutputNameError)
+    assert "'a.xlsx'" in str(results[2].error)
+    # The first file of the name is kept
+    assert sorted(members(archive)) == ["a.xlsx", "b.xlsx"]
+
+
+@pytest.mark.parametrize("sink, name, members", ARCHIVES)
+def test_an_error_leaves_no_archive_behind(tmp_path, sink, name, members):
+    archive = tmp_path / name
+    archive.write_bytes(b"previous")
+
+    with pytest.raises(RuntimeError):
+        with sink(str(archive)) as output:
+            output.write_bytes("a.xlsx", b"a")
+            raise RuntimeError("stopped")
+
+    assert os.listdir(tmp_path) == [name]
+    assert archive.read_bytes() == b"previous"
+
+
+@pytest.mark.parametrize("sink, name, members", ARCHIVES)
+def test_an_archive_is_only_complete_once_closed(tmp_path, sink, name, members):
+    archive = tmp_path / name
+
+    output = sink(str(archive))
+    output.write_bytes("a.xlsx", b"a")
+    assert not archive.exists()
+    output.close()
+
+    assert members(str(archive)) == {"a.xlsx": b"a"}
+
+
+@pytest.mark.parametrize("sink, name, members", ARCHIVES)
+def test_an_error_closes_a_stream_archive(sink, name, members):
+    stream = BytesIO()
+
+    with pytest.raises(RuntimeError):
+        with sink(stream) as output:
+            output.write_bytes("a.xlsx", b"a")
+            raise RuntimeError("stopped")
+
+    # The stream is the caller's, it holds a complete archive of the files written
+    assert members(BytesIO(stream.getvalue())) == {"a.xlsx": b"a"}
@@ -0,0 +1,127 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from filler import (
+    DirectorySink,
+    MetricsSummary,
+    RenderCache,
+    RowsTemplateFiller,
+    Shard,
+)
+from filler._types import ParamError
+from filler._utils import _async
+from filler._utils._async import fill_async
+
+DATA = pd.DataFrame({"name": list("abcdefgh"), "amount": range(8)})
+
+
+def collect(results):
+    async def run():
+        return [result async for result in results]
+
+    return asyncio.run(run())
+
+
+def test_results_are_in_job_order(xlsx_template, output_dir, monkeypatch):
+    render_bytes = _async.render_bytes
+
+    def slow_render(data, *args):
+        time.sleep(random.random() / 50)
+        return render_bytes(data, *args)
+
+    monkeypatch.setattr(_async, "render_bytes", slow_render)
+    filler = RowsTemplateFiller(DATA, xlsx_template, output_dir)
+
+    results = asyncio.run(filler.afill(ThreadPoolExecutor(8), concurrency=8))
+
+    assert [result.key for result in results] == list(range(8))
+    assert [result.error for result in results] == [None] * 8
+    assert results[3].path.endswith("3.xlsx")
+
+
+def test_errors_are_held_by_their_result(xlsx_template, output_dir):
+    jobs = [
+        (0, {"name": "a", "amount": 1}, "a.xlsx"),
+        (1, {"name": "b", "amount": 2}, "missing/b.xlsx"),
+        (2, {"name": "c", "amount": 3}, "c.xlsx"),
+    ]
+
+    results = collect(fill_async(jobs, xlsx_template, DirectorySink(output_dir)))
+
+    assert [result.key for result in results] == [0, 1, 2]
+    assert isinstance(results[1].error, FileNotFoundError)
+    assert results[0].error is None and results[2].error is None
+
+
+def test_render_errors_are_held_by_their_result(xlsx_template, output_dir, monkeypatch):
+    def failing_render(data, *args):
+        raise ValueError(data["name"])
+
+    monkeypatch.setattr(_async, "render_bytes", failing_render)
+    jobs = [(0, {"name": "a"}, "a.xlsx")]
+
+    (result,) = collect(fill_async(jobs, xlsx_template, DirectorySink(output_dir)))
+
+    assert (result.key, result.path, str(result.error)) == (0, None, "a")
+
+
+@pytest.mark.parametrize("concurrency, limit", [(6, None), (6, 2)])
+def test_renders_running_at_a_time_are_bounded(
+    xlsx_template, output_dir, monkeypatch, concurrency, limit
+):
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def counted_render(*args):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return b""
+
+    monkeypatch.setattr(_async, "render_bytes", counted_render)
+    jobs = [(i, {}, f"{i}.xlsx") for i in range(24)]
+
+    async def run():
+        semaphore = None if limit is None else asyncio.Semaphore(limit)
+        results = fill_async(
+            jobs,
+            xlsx_template,
+            DirectorySink(output_dir),
+            executor=ThreadPoolExecutor(16),
+            concurrency=concurrency,
+            semaphore=semaphore,
+        )
+        return [result async for result in results]
+
+    results = asyncio.run(run())
+
+    assert len(results) == 24
+    assert 1 < peak <= (limit or concurrency)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"shard": Shard(0, 2), "incremental": True},
+        {"workers": 2},
+        {"cache": RenderCache()},
+        {"metrics": MetricsSummary()},
+    ],
+)
+def test_options_an_async_fill_can_not_honour_are_rejected(
+    xlsx_template, output_dir, fields
+):
+    filler = RowsTemplateFiller(DATA, xlsx_template, output_dir, **fields)
+
+    with pytest.raises(ParamError, match="async"):
+        filler.aifill()
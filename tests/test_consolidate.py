@@ -0,0 +1,132 @@
+import os
+import re
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from filler import Consolidate, RowsTemplateFiller
+from filler._types import FillTemplateTypeError
+
+IMAGE = Path(__file__).resolve().parents[1] / "src/filler/resources/images/filler.jpg"
+
+
+def fill(data, template, output_dir, consolidate=Consolidate()):
+    filler = RowsTemplateFiller(data, template, output_dir, consolidate=consolidate)
+    filler.output_name = "name"
+    return filler.fill()
+
+
+def test_rows_roll_over_to_the_next_workbook(xlsx_template, output_dir):
+    from openpyxl import load_workbook
+
+    data = pd.DataFrame({"name": ["a", "b", "c"], "amount": [1, 2, 3]})
+
+    results = fill(data, xlsx_template, output_dir, Consolidate(rows_per_file=2))
+
+    first, second = sorted({result.path for result in results})
+    assert [result.path for result in results] == [first, first, second]
+    assert first.endswith("filled_0001.xlsx")
+    workbook = load_workbook(first)
+    assert workbook.sheetnames == ["a", "b"]
+    assert [workbook[name]["B1"].value for name in ["a", "b"]] == [1, 2]
+    assert workbook["b"]["C1"].value == "Total: 2 EUR"
+    assert load_workbook(second).sheetnames == ["c"]
+
+
+def test_defined_names_are_scoped_to_each_row(xlsx_template, output_dir):
+    from openpyxl import load_workbook
+    from openpyxl.workbook.defined_name import DefinedName
+
+    workbook = load_workbook(xlsx_template)
+    workbook.defined_names["Amount"] = DefinedName("Amount", attr_text="Statement!$B$1")
+    workbook["Statement"].print_area = "A1:C1"
+    workbook.save(xlsx_template)
+    data = pd.DataFrame({"name": ["a", "b"], "amount": [1, 2]})
+
+    results = fill(data, xlsx_template, output_dir)
+
+    workbook = load_workbook(results[0].path)
+    for name in ["a", "b"]:
+        sheet = workbook[name]
+        assert sheet.defined_names["Amount"].attr_text == f"'{name}'!$B$1"
+        assert sheet.print_area == f"'{name}'!$A$1:$C$1"
+    assert "Amount" not in workbook.defined_names
+
+
+def test_each_row_is_a_section(docx_template, output_dir):
+    from docx import Document
+
+    document = Document(docx_template)
+    document.add_picture(str(IMAGE))
+    document.save(docx_template)
+    data = pd.DataFrame({"name": ["a", "b", "c"], "amount": [1, 2, 3]})
+
+    results = fill(data, docx_template, output_dir)
+
+    path = results[0].path
+    assert {result.path for result in results} == {path}
+    document = Document(path)
+    assert [p.text for p in document.paragraphs if p.text] == [
+        "Dear a, you owe 1.",
+        "Dear b, you owe 2.",
+        "Dear c, you owe 3.",
+    ]
+    assert len(document.sections) == 3
+    with zipfile.ZipFile(path) as package:
+        body = package.read("word/document.xml")
+    ids = re.findall(rb'<wp:docPr\b[^>]*?\sid="(\d+)"', body)
+    assert len(ids) == 3
+    assert len(set(ids)) == 3
+
+
+def test_placeholders_in_headers_are_rejected(docx_template, output_dir):
+    from docx import Document
+
+    document = Document(docx_template)
+    document.sections[0].header.paragraphs[0].text = "{{ name }}"
+    document.save(docx_template)
+    data = pd.DataFrame({"name": ["a", "b"], "amount": [1, 2]})
+
+    with pytest.raises(FillTemplateTypeError, match="header"):
+        fill(data, docx_template, output_dir)
+
+
+def failing_jobs(count):
+    for index in range(count):
+        yield index, {"name": f"n{index}", "amount": index}, f"n{index}"
+    raise RuntimeError("the source failed")
+
+
+def test_failed_jobs_discard_the_partial_file(xlsx_template, output_dir):
+    from filler._utils._consolidate import fill_consolidated
+    from filler._utils._sink import DirectorySink
+
+    results = fill_consolidated(
+        failing_jobs(3),
+        xlsx_template,
+        DirectorySink(output_dir),
+        Consolidate(rows_per_file=2),
+    )
+
+    with pytest.raises(RuntimeError, match="source"):
+        list(results)
+    assert sorted(os.listdir(output_dir)) == ["filled_0001.xlsx"]
+
+
+def test_closed_results_discard_the_partial_file(xlsx_template, tmp_path):
+    from filler import ZipSink
+    from filler._utils._consolidate import fill_consolidated
+
+    archive = tmp_path / "filled.zip"
+    with ZipSink(str(archive)) as sink:
+        results = fill_consolidated(
+            failing_jobs(3), xlsx_template, sink, Consolidate(rows_per_file=2)
+        )
+        first = [next(results) for _ in range(3)]
+        results.close()
+
+    assert {result.path for result in first} == {"filled_0001.xlsx", "filled_0002.xlsx"}
+    with zipfile.ZipFile(archive) as package:
+        assert package.namelist() == ["filled_0001.xlsx"]
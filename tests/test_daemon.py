@@ -0,0 +1,102 @@
+import os
+import threading
+from io import BytesIO
+
+import pytest
+
+from filler import DaemonClient, RenderDaemon
+from filler._types import FillDaemonError, FillEngineError
+from filler._utils._daemon import default_socket
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """
+    A daemon with one worker, serving in a thread until the test drains it.
+    """
+    daemon = RenderDaemon(str(tmp_path / "filler.sock"), workers=1)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    while daemon._server is None:
+        thread.join(0.01)
+    yield daemon
+    daemon.drain()
+    thread.join()
+
+
+def test_render(daemon, xlsx_template, output_dir):
+    from openpyxl import load_workbook
+
+    output = os.path.join(output_dir, "a.xlsx")
+    with DaemonClient(daemon.socket_path) as client:
+        path = client.render({"name": "a", "amount": 1}, xlsx_template, output)
+        content = client.render({"name": "b", "amount": 2}, xlsx_template)
+
+    assert path == output
+    assert load_workbook(path).active["A1"].value == "a"
+    assert load_workbook(BytesIO(content)).active["A1"].value == "b"
+
+
+def test_socket_is_private(daemon):
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_errors_are_raised_by_the_client(daemon, xlsx_template, tmp_path):
+    with DaemonClient(daemon.socket_path) as client:
+        with pytest.raises(FileNotFoundError):
+            client.render({"name": "a"}, str(tmp_path / "missing.xlsx"))
+        with pytest.raises(FillEngineError):
+            client.render({"name": "a"}, xlsx_template, engine="unknown")
+        with pytest.raises(FillDaemonError, match="JSON"):
+            client.render({"name": object()}, xlsx_template)
+        with pytest.raises(FillDaemonError, match="not an operation"):
+            client.request("unknown")
+
+        # The connection is still usable
+        assert client.stats()["errors"] == 2
+
+
+def test_stats_and_reload(daemon, xlsx_template):
+    with DaemonClient(daemon.socket_path) as client:
+        client.render({"name": "a", "amount": 1}, xlsx_template)
+        stats = client.stats()
+        reloaded = client.reload()
+        content = client.render({"name": "b", "amount": 2}, xlsx_template)
+
+    assert stats["pid"] == os.getpid()
+    assert stats["jobs"] == 1
+    assert stats["generation"] == 0
+    assert reloaded["generation"] == 1
+    assert content.startswith(b"PK")
+
+
+def test_drain(tmp_path):
+    socket_path = str(tmp_path / "filler.sock")
+    daemon = RenderDaemon(socket_path, workers=1)
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    while daemon._server is None:
+        thread.join(0.01)
+
+    with DaemonClient(socket_path) as client:
+        assert client.drain()["draining"]
+        thread.join(10)
+        with pytest.raises(FillDaemonError):
+            client.stats()
+
+    assert not thread.is_alive()
+    assert not os.path.exists(socket_path)
+
+
+def test_default_socket_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("FILLER_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    socket_path = default_socket()
+
+    directory = os.path.dirname(socket_path)
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    os.chmod(directory, 0o755)
+    with pytest.raises(FillDaemonError):
+        default_socket()
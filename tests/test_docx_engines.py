@@ -0,0 +1,63 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from filler._utils._fill import load_template
+
+ROWS = [
+    {"name": "Ada", "amount": 3, "items": [{"qty": 1}, {"qty": 2}]},
+    {"name": "Grace O'Hara", "amount": None, "items": []},
+]
+
+
+def add_header(document):
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "Statement of {{ name }}"
+    section.footer.paragraphs[0].text = "Page for {{ name|upper }}"
+
+
+def add_table(document):
+    table = document.add_table(rows=3, cols=1)
+    table.cell(0, 0).text = "{%tr for item in items %}"
+    table.cell(1, 0).text = "{{ item.qty }}"
+    table.cell(2, 0).text = "{%tr endfor %}"
+
+
+def add_properties(document):
+    document.core_properties.title = "Letter to {{ name }}"
+    document.core_properties.subject = "{{ amount }} due"
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [None, add_header, add_table, add_properties],
+    ids=["body", "header", "table", "properties"],
+)
+def test_zip_engine_writes_the_parts_docxtpl_writes(docx_template, edit):
+    from docx import Document
+
+    if edit is not None:
+        document = Document(docx_template)
+        edit(document)
+        document.save(docx_template)
+    renderers = {
+        engine: load_template(docx_template, engine) for engine in ("docxtpl", "zip")
+    }
+
+    for data in ROWS:
+        parts = {}
+        for engine, renderer in renderers.items():
+            buffer = BytesIO()
+            renderer.render(dict(data), buffer)
+            with zipfile.ZipFile(buffer) as package:
+                parts[engine] = {
+                    name: package.read(name) for name in package.namelist()
+                }
+
+        assert sorted(parts["zip"]) == sorted(parts["docxtpl"])
+        for name in ["word/document.xml", "docProps/core.xml"] + [
+            name for name in parts["zip"] if "header" in name or "footer" in name
+        ]:
+            assert parts["zip"][name] == parts["docxtpl"][name], name
+        assert parts["zip"] == parts["docxtpl"]
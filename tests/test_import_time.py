@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Modules only loaded when a template is filled, or when pandas data is given
+HEAVY_MODULES = ["pandas", "numpy", "docx", "docxtpl", "jinja2", "lxml", "openpyxl"]
+
+# The longest cumulative import time of filler, in seconds
+IMPORT_TIME_LIMIT = 0.5
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """
+    Run a fresh interpreter importing filler from the source tree.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, *args],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_loads_no_backend():
+    code = (
+        "import json, sys\n"
+        "import filler\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    loaded = json.loads(run_python("-c", code).stdout)
+    assert loaded == []
+
+
+def test_import_time():
+    stderr = run_python("-X", "importtime", "-c", "import filler").stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1]) / 1e6
+
+    assert not set(HEAVY_MODULES) & times.keys()
+    assert times["filler"] < IMPORT_TIME_LIMIT
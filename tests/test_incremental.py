@@ -0,0 +1,71 @@
+import os
+
+import pandas as pd
+
+from filler import RowsTemplateFiller
+
+
+def fill(data, template, output_dir):
+    filler = RowsTemplateFiller(data, template, output_dir, incremental=True)
+    filler.output_name = "name"
+    return filler.fill()
+
+
+def test_unchanged_rows_are_skipped(xlsx_template, output_dir):
+    data = pd.DataFrame({"name": ["a", "b", "c"], "amount": [1, 2, 3]})
+    first = fill(data, xlsx_template, output_dir)
+    assert [result.skipped for result in first] == [False, False, False]
+    mtimes = {
+        name: os.stat(os.path.join(output_dir, name)).st_mtime_ns
+        for name in ["a.xlsx", "b.xlsx", "c.xlsx"]
+    }
+
+    data.loc[1, "amount"] = 20
+    second = fill(data, xlsx_template, output_dir)
+
+    assert [result.skipped for result in second] == [True, False, True]
+    assert all(result.error is None for result in second)
+    assert os.stat(os.path.join(output_dir, "a.xlsx")).st_mtime_ns == mtimes["a.xlsx"]
+
+
+def test_missing_file_is_filled_again(xlsx_template, output_dir):
+    data = pd.DataFrame({"name": ["a", "b"], "amount": [1, 2]})
+    fill(data, xlsx_template, output_dir)
+    os.remove(os.path.join(output_dir, "b.xlsx"))
+
+    results = fill(data, xlsx_template, output_dir)
+
+    assert [result.skipped for result in results] == [True, False]
+    assert os.path.isfile(os.path.join(output_dir, "b.xlsx"))
+
+
+def test_removed_rows_are_pruned(xlsx_template, output_dir):
+    fill(
+        pd.DataFrame({"name": ["a", "b", "c"], "amount": [1, 2, 3]}),
+        xlsx_template,
+        output_dir,
+    )
+
+    results = fill(
+        pd.DataFrame({"name": ["a", "c"], "amount": [1, 3]}), xlsx_template, output_dir
+    )
+
+    assert [result.skipped for result in results] == [True, True]
+    files = sorted(name for name in os.listdir(output_dir) if name.endswith(".xlsx"))
+    assert files == ["a.xlsx", "c.xlsx"]
+
+
+def test_changed_template_fills_every_row(xlsx_template, output_dir):
+    from openpyxl import load_workbook
+
+    data = pd.DataFrame({"name": ["a", "b"], "amount": [1, 2]})
+    fill(data, xlsx_template, output_dir)
+
+    workbook = load_workbook(xlsx_template)
+    workbook.active["D1"] = "changed"
+    workbook.save(xlsx_template)
+    results = fill(data, xlsx_template, output_dir)
+
+    assert [result.skipped for result in results] == [False, False]
+    filled = load_workbook(os.path.join(output_dir, "a.xlsx")).active
+    assert filled["D1"].value == "changed"
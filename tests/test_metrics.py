@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+from filler import MetricsSummary, RowsTemplateFiller
+from filler._utils._metrics import PHASES
+
+DATA = pd.DataFrame({"name": ["a", "b", "missing/c"], "amount": [1, 2, 3]})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("engine", ["openpyxl", "zip"])
+def test_fill_reports_rows_bytes_and_durations(
+    xlsx_template, output_dir, engine, workers
+):
+    metrics = MetricsSummary()
+    filler = RowsTemplateFiller(
+        DATA, xlsx_template, output_dir, engine=engine, workers=workers, metrics=metrics
+    )
+    filler.output_name = "name"
+
+    results = filler.fill()
+
+    filled = [result for result in results if result.error is None]
+    assert [result.key for result in filled] == [0, 1]
+    summary = metrics.summary()
+    counters = summary["counters"]
+    assert counters["rows"] == 3
+    assert counters["errors"] == 1
+    assert counters["bytes_written"] == sum(
+        os.path.getsize(result.path) for result in filled
+    )
+    # Each of the 3 cells of the template holds a placeholder, filled for each row written
+    assert counters["cells_scanned"] == 3
+    assert counters["placeholders"] == 3 * len(filled)
+    phases = summary["phases"]
+    assert set(phases) == set(PHASES)
+    # The row whose directory is missing fails before it is rendered
+    assert phases["render"]["calls"] == phases["save"]["calls"] == len(filled)
+    assert phases["scan"]["calls"] == 1
+    for stats in phases.values():
+        assert 0 < stats["mean"] <= stats["max"] <= stats["seconds"]
+    assert sum(stats["share"] for stats in phases.values()) == pytest.approx(1)
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from filler import (
+    Consolidate,
+    FillOptions,
+    Pipeline,
+    RenderCache,
+    RowsTemplateFiller,
+    Shard,
+    ZipSink,
+)
+from filler._types import (
+    FillEngineError,
+    FillOutputDirError,
+    FillOutputNameError,
+    ParamError,
+)
+
+DATA = pd.DataFrame({"name": ["a", "b"], "amount": [1, 2]})
+
+
+def test_fields_replace_those_of_the_options(xlsx_template, output_dir):
+    options = FillOptions(engine="zip", workers=2)
+
+    filler = RowsTemplateFiller(DATA, xlsx_template, output_dir, options, workers=1)
+
+    assert (filler.options.engine, filler.options.workers) == ("zip", 1)
+    assert [result.error for result in filler.fill()] == [None, None]
+
+
+def test_unknown_fields_are_rejected(xlsx_template, output_dir):
+    with pytest.raises(TypeError, match="FillOptions"):
+        RowsTemplateFiller(DATA, xlsx_template, output_dir, worker=2)
+
+
+@pytest.mark.parametrize(
+    "fields, error",
+    [
+        ({"workers": 0}, ParamError),
+        ({"pipeline": Pipeline(), "workers": 2}, ParamError),
+        ({"pipeline": Pipeline(), "cache": RenderCache()}, ParamError),
+        ({"consolidate": Consolidate(), "incremental": True}, FillOutputNameError),
+        ({"consolidate": Consolidate(), "engine": "openpyxl"}, FillEngineError),
+        ({"consolidate": Consolidate(), "template_cache": True}, ParamError),
+        ({"shard": Shard(2, 2)}, ParamError),
+    ],
+)
+def test_conflicting_options(xlsx_template, output_dir, fields, error):
+    with pytest.raises(error):
+        RowsTemplateFiller(DATA, xlsx_template, output_dir, **fields)
+
+
+def test_manifests_need_a_directory(xlsx_template, tmp_path):
+    sink = ZipSink(str(tmp_path / "filled.zip"))
+
+    with pytest.raises(FillOutputDirError):
+        RowsTemplateFiller(DATA, xlsx_template, sink, incremental=True)
@@ -0,0 +1,81 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from filler import RowTemplatesFiller, TemplateCache
+from filler._types import FillOutputNameError, FillTemplateTypeError
+
+ROW = {"name": "Ada", "amount": 12, "customer": "c42"}
+
+
+def test_every_template_is_filled(xlsx_template, docx_template, output_dir):
+    from docx import Document
+    from openpyxl import load_workbook
+
+    filler = RowTemplatesFiller(ROW, [docx_template, xlsx_template], output_dir)
+
+    paths = filler.fill()
+
+    assert paths == [
+        os.path.join(output_dir, "a001_letter.docx"),
+        os.path.join(output_dir, "a001_statement.xlsx"),
+    ]
+    assert Document(paths[0]).paragraphs[0].text == "Dear Ada, you owe 12."
+    assert load_workbook(paths[1]).active["C1"].value == "Total: 12 EUR"
+
+
+def test_output_names_reference_the_row(xlsx_template, docx_template, output_dir):
+    filler = RowTemplatesFiller(
+        ROW,
+        [docx_template, xlsx_template],
+        output_dir,
+        output_names={
+            docx_template: "{output_name}/letter",
+            xlsx_template: "statement_{customer}",
+        },
+    )
+    filler.output_name = "ada"
+    os.mkdir(os.path.join(output_dir, "ada"))
+
+    assert filler.output_files() == ["ada/letter.docx", "statement_c42.xlsx"]
+    assert [os.path.isfile(path) for path in filler.fill()] == [True, True]
+
+
+def test_fill_to_bytes(xlsx_template, docx_template):
+    from openpyxl import load_workbook
+
+    cache = TemplateCache()
+    filler = RowTemplatesFiller(
+        ROW, [docx_template, xlsx_template], template_cache=cache
+    )
+
+    blobs = filler.fill_to_bytes()
+
+    assert [blob[:2] for blob in blobs] == [b"PK", b"PK"]
+    assert load_workbook(BytesIO(blobs[1])).active["A1"].value == "Ada"
+    assert cache.stats()["misses"] == 2
+
+
+def test_output_names_should_be_distinct(xlsx_template, output_dir):
+    filler = RowTemplatesFiller(
+        ROW,
+        [xlsx_template, xlsx_template],
+        output_dir,
+    )
+
+    with pytest.raises(FillOutputNameError, match="distinct"):
+        filler.fill()
+    assert os.listdir(output_dir) == []
+
+
+def test_incorrect_output_names(xlsx_template, output_dir):
+    filler = RowTemplatesFiller(
+        ROW, [xlsx_template], output_dir, output_names={xlsx_template: "{unknown}"}
+    )
+
+    with pytest.raises(FillOutputNameError):
+        filler.output_files()
+
+    with pytest.raises(FillTemplateTypeError):
+        RowTemplatesFiller(ROW, xlsx_template)
@@ -0,0 +1,102 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+from filler import DirectorySink, RowsTemplateFiller, ZipSink
+from filler._utils._parallel import fill_parallel
+
+# Row 5 divides by zero when it is rendered
+DATA = pd.DataFrame({"name": [f"n{i:02}" for i in range(12)], "amount": range(-5, 7)})
+
+
+@pytest.fixture
+def ratio_template(tmp_path):
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("{{ name }} {{ 60 // amount }}")
+    path = tmp_path / "ratio.docx"
+    document.save(path)
+    return str(path)
+
+
+def jobs():
+    return [(key, row.to_dict(), f"{row['name']}.docx") for key, row in DATA.iterrows()]
+
+
+def text(docx):
+    from docx import Document
+
+    return Document(docx).paragraphs[0].text
+
+
+def expected_text(key):
+    row = DATA.loc[key]
+    return f"{row['name']} {60 // row['amount']}"
+
+
+@pytest.mark.parametrize("chunksize", [1, 5])
+def test_results_are_in_job_order(ratio_template, output_dir, chunksize):
+    results = list(
+        fill_parallel(
+            jobs(), ratio_template, DirectorySink(output_dir), 3, chunksize=chunksize
+        )
+    )
+
+    assert [result.key for result in results] == list(range(12))
+    for result in results:
+        if result.key == 5:
+            continue
+        assert result.error is None
+        assert result.path.endswith(f"{DATA.loc[result.key, 'name']}.docx")
+        assert text(result.path) == expected_text(result.key)
+
+
+def test_a_worker_error_is_held_by_the_result_of_its_row(ratio_template, output_dir):
+    results = list(
+        fill_parallel(jobs(), ratio_template, DirectorySink(output_dir), 3, chunksize=2)
+    )
+
+    failed = [result for result in results if result.error is not None]
+    assert [(result.key, result.path) for result in failed] == [(5, None)]
+    assert isinstance(failed[0].error, ZeroDivisionError)
+    # The other rows of its chunk, and the rows after it, are filled
+    assert results[4].error is None and results[6].error is None
+
+
+def test_workers_send_the_filled_files_to_other_sinks(ratio_template, tmp_path):
+    archive = str(tmp_path / "filled.zip")
+
+    with ZipSink(archive) as sink:
+        results = list(fill_parallel(jobs(), ratio_template, sink, 2, chunksize=3))
+
+    assert [result.key for result in results] == list(range(12))
+    assert isinstance(results[5].error, ZeroDivisionError)
+    with zipfile.ZipFile(archive) as package:
+        names = package.namelist()
+        assert names == [f"{name}.docx" for name in DATA["name"] if name != "n05"]
+        for result in results:
+            if result.error is None:
+                with package.open(result.path) as docx:
+                    assert text(docx) == expected_text(result.key)
+
+
+def test_fill_with_workers_matches_a_fill_without(ratio_template, tmp_path):
+    filled = {}
+    for workers in (1, 3):
+        output_dir = tmp_path / f"workers{workers}"
+        output_dir.mkdir()
+        filler = RowsTemplateFiller(
+            DATA, ratio_template, str(output_dir), workers=workers
+        )
+        filler.output_name = "name"
+        results = filler.fill()
+        filled[workers] = [
+            (result.key, type(result.error), result.path and text(result.path))
+            for result in results
+        ]
+
+    assert filled[3] == filled[1]
+    assert [key for key, _, _ in filled[3]] == list(range(12))
+    assert filled[3][5][1] is ZeroDivisionError
@@ -0,0 +1,66 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from filler import Pipeline, RowsTemplateFiller
+from filler._types import FillOutputNameError
+
+
+class Unprintable:
+    def __str__(self):
+        raise ValueError("can not be printed")
+
+
+def test_results_keep_the_row_order(xlsx_template, output_dir):
+    data = pd.DataFrame({"name": [f"n{i}" for i in range(50)], "amount": range(50)})
+    pipeline = Pipeline(render=3, write=2, depth=4, batch=7)
+
+    results = RowsTemplateFiller(
+        data, xlsx_template, output_dir, engine="zip", pipeline=pipeline
+    ).fill()
+
+    assert [result.key for result in results] == list(range(50))
+    assert all(result.error is None for result in results)
+    assert len(os.listdir(output_dir)) == 50
+
+
+def test_reading_waits_for_the_slow_stages(xlsx_template, output_dir):
+    pulled = [0]
+
+    def rows():
+        for i in range(1000):
+            pulled[0] += 1
+            yield {"name": f"n{i}", "amount": i}
+
+    filler = RowsTemplateFiller(
+        rows(), xlsx_template, output_dir, pipeline=Pipeline(depth=4, batch=10)
+    )
+    results = filler.ifill()
+    next(results)
+    time.sleep(0.3)
+
+    # At most normalize + 2 batches in flight, and one more waiting for them
+    assert pulled[0] <= 40
+    assert len(list(results)) == 999
+
+
+def test_a_failed_row_does_not_stop_the_fill(xlsx_template, output_dir):
+    rows = {"a": {"name": "a", "amount": 1}, "b": {"name": Unprintable(), "amount": 2}}
+
+    results = RowsTemplateFiller(
+        rows, xlsx_template, output_dir, engine="zip", pipeline=Pipeline()
+    ).fill()
+
+    assert results[0].error is None
+    assert isinstance(results[1].error, ValueError)
+
+
+def test_a_failed_stage_stops_the_fill(xlsx_template, output_dir):
+    data = pd.DataFrame({"name": ["a", "/absolute"], "amount": [1, 2]})
+    filler = RowsTemplateFiller(data, xlsx_template, output_dir, pipeline=Pipeline())
+    filler.output_name = "name"
+
+    with pytest.raises(FillOutputNameError):
+        filler.fill()
@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from filler._utils import prepare_frame, prepare_row, prepare_rows
+
+ROWS = [
+    {"text": "  ", "other": "x", "number": 1.5, "items": [{"qty": 1}]},
+    {"text": "\t\n", "other": None, "number": math.nan, "items": []},
+    {"text": "", "other": pd.NA, "number": np.float64("nan"), "items": [{"qty": 2}]},
+    {"text": " y ", "other": pd.NaT, "number": 0.0, "items": []},
+]
+
+EXPECTED = [
+    {"text": "", "other": "x", "number": 1.5, "items": [{"qty": 1}]},
+    {"text": "", "other": "", "number": "", "items": []},
+    {"text": "", "other": "", "number": "", "items": [{"qty": 2}]},
+    {"text": " y ", "other": "", "number": 0.0, "items": []},
+]
+
+
+def test_blank_strings_are_empty_in_both_paths():
+    frame = pd.DataFrame(ROWS)
+
+    assert prepare_frame(frame) == list(enumerate(EXPECTED))
+    assert [prepare_row(row) for row in ROWS] == EXPECTED
+    assert [prepare_row(row) for _, row in frame.iterrows()] == EXPECTED
+
+
+@pytest.mark.parametrize("dtype", [object, "string", "str"])
+def test_blank_strings_are_empty_whatever_the_string_dtype(dtype):
+    frame = pd.DataFrame({"text": ["  ", "a", None]}, dtype=dtype)
+
+    assert [row for _, row in prepare_frame(frame)] == [
+        {"text": ""},
+        {"text": "a"},
+        {"text": ""},
+    ]
+
+
+def test_data_of_any_kind_is_prepared_alike():
+    frame = pd.DataFrame(ROWS)
+    data = [frame, dict(enumerate(ROWS)), [frame.iloc[:2], frame.iloc[2:]], ROWS]
+
+    for rows in data:
+        assert list(prepare_rows(rows, chunksize=3)) == list(enumerate(EXPECTED))
+
+
+def test_blank_strings_are_not_formatted():
+    formats = {"text": lambda value: f"<{value}>"}
+
+    assert prepare_row({"text": "  "}, formats) == {"text": ""}
+    assert prepare_frame(pd.DataFrame({"text": ["  ", "a"]}), formats) == [
+        (0, {"text": ""}),
+        (1, {"text": "<a>"}),
+    ]
@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+
+from filler import RenderCache, RowsTemplateFiller
+
+
+def fill(data, template, output_dir, cache):
+    return RowsTemplateFiller(data, template, output_dir, cache=cache).fill()
+
+
+def test_identical_rows_are_rendered_once(xlsx_template, output_dir):
+    cache = RenderCache()
+    data = pd.DataFrame(
+        {"name": ["a", "a", "b", "a"], "amount": [1, 1, 1, 1], "unused": [1, 2, 3, 4]}
+    )
+
+    results = fill(data, xlsx_template, output_dir, cache)
+
+    assert all(result.error is None for result in results)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+    with open(results[0].path, "rb") as first, open(results[3].path, "rb") as last:
+        assert first.read() == last.read()
+
+
+def test_linked_files_share_their_storage(xlsx_template, output_dir):
+    cache = RenderCache(link=True)
+    data = pd.DataFrame({"name": ["a", "a", "a"], "amount": [1, 1, 1]})
+
+    results = fill(data, xlsx_template, output_dir, cache)
+
+    assert [os.stat(result.path).st_nlink for result in results] == [3, 3, 3]
+
+
+def test_changed_template_misses(xlsx_template, output_dir):
+    from openpyxl import load_workbook
+
+    cache = RenderCache()
+    data = pd.DataFrame({"name": ["a"], "amount": [1]})
+    fill(data, xlsx_template, output_dir, cache)
+
+    workbook = load_workbook(xlsx_template)
+    workbook.active["D1"] = "changed"
+    workbook.save(xlsx_template)
+    results = fill(data, xlsx_template, output_dir, cache)
+
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["hits"] == 0
+    assert load_workbook(results[0].path).active["D1"].value == "changed"
+
+
+def test_eviction_bounds_the_cache(xlsx_template, output_dir):
+    cache = RenderCache(max_bytes=12000)
+    data = pd.DataFrame({"name": ["a", "b", "c", "d"], "amount": [1, 2, 3, 4]})
+
+    fill(data, xlsx_template, output_dir, cache)
+
+    assert cache.stats()["bytes"] <= 12000
+    assert cache.stats()["evictions"] > 0
+
+
+def test_rewritten_files_are_not_linked(xlsx_template, output_dir):
+    from openpyxl import load_workbook
+
+    cache = RenderCache(link=True)
+    first = pd.DataFrame({"name": ["old"], "amount": [1], "file": ["a"]})
+    second = pd.DataFrame(
+        {"name": ["new", "old"], "amount": [1, 1], "file": ["a", "b"]}
+    )
+
+    for data in (first, second):
+        filler = RowsTemplateFiller(data, xlsx_template, output_dir, cache=cache)
+        filler.output_name = "file"
+        results = filler.fill()
+
+    assert cache.stats()["hits"] == 1
+    assert load_workbook(results[0].path).active["A1"].value == "new"
+    assert load_workbook(results[1].path).active["A1"].value == "old"
+
+    third = pd.DataFrame({"name": ["old"], "amount": [1], "file": ["c"]})
+    filler = RowsTemplateFiller(third, xlsx_template, output_dir, cache=cache)
+    filler.output_name = "file"
+    (result,) = filler.fill()
+    assert os.path.samefile(result.path, results[1].path)
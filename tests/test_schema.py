@@ -0,0 +1,135 @@
+import os
+
+import pandas as pd
+import pytest
+
+from filler import RowsTemplateFiller, Schema
+from filler._types import FillSchemaError
+
+ROWS = {
+    "r1": {"name": "a", "amount": 1},
+    "r2": {"name": "b", "amount": 2},
+}
+
+
+def as_frame(rows):
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+@pytest.fixture(params=["dataframe", "dicts"])
+def data(request):
+    """
+    Turn rows into the data of a filler, a DataFrame or a dictionary of rows.
+    """
+    if request.param == "dataframe":
+        return as_frame
+    return lambda rows: rows
+
+
+def test_matching_data_has_no_issues(xlsx_template, output_dir, data):
+    filler = RowsTemplateFiller(
+        data(ROWS),
+        xlsx_template,
+        output_dir,
+        schema=Schema(dtypes={"amount": "integer"}, max_null_ratio=0),
+    )
+
+    assert filler.validate() == []
+    assert [result.error for result in filler.fill()] == [None, None]
+
+
+def test_missing_column(xlsx_template, output_dir, data):
+    rows = {key: {"name": row["name"]} for key, row in ROWS.items()}
+    filler = RowsTemplateFiller(data(rows), xlsx_template, output_dir, schema=Schema())
+
+    assert [(issue.column, issue.problem) for issue in filler.validate()] == [
+        ("amount", "missing")
+    ]
+    with pytest.raises(FillSchemaError) as info:
+        filler.fill()
+
+    assert str(info.value) == (
+        "The data does not match the template!\n"
+        "'amount' is referenced by the template but not a column"
+    )
+    assert info.value.issues == filler.validate()
+    # Nothing is rendered once the data does not match
+    assert os.listdir(output_dir) == []
+
+
+def test_wrong_type(xlsx_template, output_dir, data):
+    rows = {key: {**row, "amount": str(row["amount"])} for key, row in ROWS.items()}
+    filler = RowsTemplateFiller(
+        data(rows),
+        xlsx_template,
+        output_dir,
+        schema=Schema(dtypes={"amount": "number", "name": "string"}),
+    )
+
+    with pytest.raises(FillSchemaError) as info:
+        filler.fill()
+
+    (issue,) = info.value.issues
+    assert (issue.column, issue.problem) == ("amount", "dtype")
+    dtype = as_frame(rows)["amount"].dtype
+    assert f"'amount' is {dtype}, expected number" in str(info.value)
+
+
+def test_every_issue_is_listed(xlsx_template, output_dir, data):
+    rows = {
+        "r1": {"name": "a", "amount": "1"},
+        "r2": {"name": None, "amount": "2"},
+    }
+    schema = Schema(
+        required=["name", "amount", "city"],
+        dtypes={"amount": "iu", "zip": "string"},
+        max_null_ratio={"name": 0.25},
+    )
+    filler = RowsTemplateFiller(data(rows), xlsx_template, output_dir, schema=schema)
+
+    with pytest.raises(FillSchemaError) as info:
+        filler.fill()
+
+    assert str(info.value).splitlines() == [
+        "The data does not match the template!",
+        "'city' is referenced by the template but not a column",
+        f"'amount' is {as_frame(rows)['amount'].dtype}, expected iu",
+        "'zip' has a dtype but is not a column",
+        "'name' is 50.0% empty, at most 25.0% allowed",
+    ]
+
+
+def test_dicts_are_validated_like_the_dataframe_of_their_rows(
+    xlsx_template, output_dir
+):
+    rows = {
+        "r1": {"name": "a", "amount": 1, "when": pd.Timestamp("2024-01-02")},
+        "r2": {"name": None, "amount": None, "when": pd.Timestamp("2024-01-03")},
+        "r3": {"name": "c", "amount": 3.5},
+    }
+    schema = Schema(
+        dtypes={"amount": "integer", "when": "datetime", "name": "string"},
+        max_null_ratio=0.3,
+    )
+    fillers = [
+        RowsTemplateFiller(rows, xlsx_template, output_dir, schema=schema),
+        RowsTemplateFiller(as_frame(rows), xlsx_template, output_dir, schema=schema),
+    ]
+
+    issues = [filler.validate() for filler in fillers]
+
+    assert issues[0] == issues[1]
+    # Only the columns of the template are checked for empty values, not 'when'
+    assert [(issue.column, issue.problem) for issue in issues[0]] == [
+        ("amount", "dtype"),
+        ("amount", "nulls"),
+        ("name", "nulls"),
+    ]
+
+
+def test_lazy_data_is_not_validated(xlsx_template, output_dir):
+    rows = ((key, {"name": row["name"]}) for key, row in ROWS.items())
+    filler = RowsTemplateFiller(rows, xlsx_template, output_dir, schema=Schema())
+
+    assert filler.validate() == []
+    assert [result.error for result in filler.fill()] == [None, None]
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from filler import verify_shards
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+ROWS = 40
+
+# Fills one shard of the rows, as a separate process would on another machine
+FILL_SHARD = """
+import sys
+import pandas as pd
+from filler import RowsTemplateFiller, Shard
+
+template, output_dir, index, count, rows = sys.argv[1:]
+data = pd.DataFrame(
+    {"name": [f"row{i}" for i in range(int(rows))], "amount": range(int(rows))}
+)
+filler = RowsTemplateFiller(
+    data, template, output_dir, shard=Shard(int(index), int(count))
+)
+filler.output_name = "name"
+assert all(result.error is None for result in filler.fill())
+"""
+
+
+@pytest.fixture
+def sharded_dir(xlsx_template, output_dir):
+    """
+    An output directory filled by 3 concurrent shard processes.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    count = 3
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-c", FILL_SHARD]
+            + [xlsx_template, output_dir, str(index), str(count), str(ROWS)],
+            env=env,
+        )
+        for index in range(count)
+    ]
+    assert [process.wait() for process in processes] == [0] * count
+    return output_dir
+
+
+def test_shards_fill_every_row_once(sharded_dir):
+    assert verify_shards(sharded_dir) == []
+
+    files = {name for name in os.listdir(sharded_dir) if not name.startswith(".")}
+    assert files == {f"row{i}.xlsx" for i in range(ROWS)}
+
+
+def test_missing_file_is_reported(sharded_dir):
+    os.remove(os.path.join(sharded_dir, "row7.xlsx"))
+
+    problems = verify_shards(sharded_dir)
+
+    assert len(problems) == 1
+    assert "'row7.xlsx'" in problems[0] and "missing" in problems[0]
+
+
+def test_missing_shard_is_reported(sharded_dir):
+    os.remove(os.path.join(sharded_dir, ".filler-shard-1-of-3.json"))
+
+    assert verify_shards(sharded_dir) == ["Shard 1 of 3 is missing"]
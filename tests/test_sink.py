@@ -0,0 +1,81 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from filler import DirectorySink, Durability, RenderCache, RowsTemplateFiller
+from filler._utils import _sink
+from filler._utils._sink import STALE_SECONDS, final_path, temporary_path
+
+DATA = pd.DataFrame({"name": ["a", "b", "c"], "amount": [1, 2, 3]})
+
+
+def temporary_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_temporary_files_are_unique(output_dir):
+    full_path = os.path.join(output_dir, "a001.docx")
+
+    first, second = temporary_path(full_path), temporary_path(full_path)
+
+    assert first != second
+    assert final_path(first) == final_path(second) == full_path
+    plain = os.path.join(output_dir, "plain")
+    open(plain, "wb").close()
+    assert os.stat(first).st_mode == os.stat(plain).st_mode
+
+
+def test_stale_temporary_files_are_removed_on_open(output_dir):
+    stale = temporary_path(os.path.join(output_dir, "a001.docx"))
+    running = temporary_path(os.path.join(output_dir, "a002.docx"))
+    old = time.time() - STALE_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    DirectorySink(output_dir, remove_stale=False)
+    assert os.path.exists(stale)
+
+    DirectorySink(output_dir)
+    assert not os.path.exists(stale)
+    assert os.path.exists(running)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_fsyncs_files_before_renaming_them(
+    xlsx_template, output_dir, monkeypatch, workers
+):
+    calls = []
+    monkeypatch.setattr(_sink, "fsync_file", lambda path: calls.append(("file", path)))
+    monkeypatch.setattr(
+        _sink, "fsync_directory", lambda path: calls.append(("directory", path))
+    )
+    sink = DirectorySink(output_dir, Durability("batch", files=2, seconds=60))
+
+    with sink:
+        filler = RowsTemplateFiller(DATA, xlsx_template, sink, workers=workers)
+        results = filler.fill()
+
+    assert [result.error for result in results] == [None, None, None]
+    assert all(os.path.exists(result.path) for result in results)
+    assert temporary_files(output_dir) == []
+    if workers == 1:
+        files = [path for kind, path in calls if kind == "file"]
+        assert [final_path(path) for path in files] == [r.path for r in results]
+        assert all(path != final_path(path) for path in files)
+    # A batch of two files, and the last one when the sink is closed
+    assert calls[-1] == ("directory", output_dir)
+    assert [kind for kind, _ in calls].count("directory") == 2
+
+
+def test_cache_links_the_renamed_file(xlsx_template, output_dir):
+    data = pd.DataFrame({"name": ["a", "a"], "amount": [1, 1], "file": ["x", "y"]})
+    filler = RowsTemplateFiller(
+        data, xlsx_template, output_dir, cache=RenderCache(link=True)
+    )
+    filler.output_name = "file"
+
+    first, second = [result.path for result in filler.fill()]
+
+    assert os.path.samefile(first, second)
+    assert temporary_files(output_dir) == []
@@ -0,0 +1,124 @@
+import math
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from filler import RowsTemplateFiller, csv_rows, cursor_rows, parquet_rows
+from filler._utils import prepare_rows
+
+ROWS = [
+    {"name": "a", "amount": 1, "price": 1.5},
+    {"name": "b", "amount": None, "price": math.nan},
+    {"name": "c", "amount": 3, "price": 2.0},
+]
+
+EXPECTED = [
+    (0, {"name": "a", "amount": 1, "price": 1.5}),
+    (1, {"name": "b", "amount": "", "price": ""}),
+    (2, {"name": "c", "amount": 3, "price": 2.0}),
+]
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("name,amount,price\na,1,1.5\nb,,\nc,3,2.0\n")
+    return str(path)
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "rows.parquet"
+    frame = pd.DataFrame(ROWS).astype({"amount": "Int64"})
+    frame.to_parquet(path, row_group_size=2)
+    return str(path)
+
+
+@pytest.fixture
+def cursor():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE rows (name TEXT, amount INTEGER, price REAL)")
+    connection.executemany(
+        "INSERT INTO rows VALUES (?, ?, ?)",
+        [(row["name"], row["amount"], None) for row in ROWS],
+    )
+    connection.execute("UPDATE rows SET price = 1.5 WHERE name = 'a'")
+    connection.execute("UPDATE rows SET price = 2.0 WHERE name = 'c'")
+    yield connection.execute("SELECT * FROM rows ORDER BY name")
+    connection.close()
+
+
+def test_csv_keeps_integers_and_empties_missing_values(csv_file):
+    rows = list(prepare_rows(csv_rows(csv_file, chunksize=2)))
+
+    assert rows == EXPECTED
+    assert type(rows[0][1]["amount"]) is int
+
+
+def test_csv_chunks_are_labelled_by_position(csv_file):
+    chunks = list(csv_rows(csv_file, chunksize=2))
+
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2]]
+
+
+def test_csv_without_rows(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_text("name,amount\n")
+
+    assert list(prepare_rows(csv_rows(str(path)))) == []
+
+
+def test_parquet_reads_each_row_group(parquet_file):
+    import pyarrow.parquet as pq
+
+    assert pq.ParquetFile(parquet_file).num_row_groups == 2
+    rows = list(prepare_rows(parquet_rows(parquet_file)))
+
+    assert rows == EXPECTED
+    assert type(rows[0][1]["amount"]) is int
+
+
+def test_parquet_columns(parquet_file):
+    assert list(parquet_rows(parquet_file, columns=["name"]))[1] == (1, {"name": "b"})
+
+
+def test_parquet_without_rows(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "empty.parquet"
+    pd.DataFrame({"name": pd.Series([], dtype=str)}).to_parquet(path)
+
+    assert list(parquet_rows(str(path))) == []
+
+
+def test_cursor_fetches_its_rows(cursor):
+    assert list(prepare_rows(cursor_rows(cursor, size=2))) == EXPECTED
+
+
+def test_cursor_without_rows(cursor):
+    connection = cursor.connection
+
+    assert list(cursor_rows(connection.execute("SELECT * FROM rows WHERE 0"))) == []
+    assert list(cursor_rows(connection.execute("DELETE FROM rows"))) == []
+
+
+@pytest.mark.parametrize(
+    "source, read",
+    [("csv_file", csv_rows), ("parquet_file", parquet_rows), ("cursor", cursor_rows)],
+)
+def test_sources_fill_lazily(request, xlsx_template, output_dir, source, read):
+    from openpyxl import load_workbook
+
+    filler = RowsTemplateFiller(
+        read(request.getfixturevalue(source)), xlsx_template, output_dir
+    )
+    filler.output_name = "name"
+
+    results = filler.fill()
+
+    assert [result.error for result in results] == [None, None, None]
+    sheets = [load_workbook(result.path).active for result in results]
+    assert [sheet["B1"].value for sheet in sheets] == [1, None, 3]
+    # The rows are read as they are filled, only once
+    assert filler.fill() == []
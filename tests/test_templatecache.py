@@ -0,0 +1,87 @@
+import os
+import shutil
+import threading
+
+from filler import TemplateCache
+
+
+def test_hits_and_misses(xlsx_template):
+    cache = TemplateCache()
+
+    first = cache.get(xlsx_template, "zip")
+    second = cache.get(xlsx_template, "zip")
+    cache.get(xlsx_template, "openpyxl")
+
+    assert first.renderer is second.renderer
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_changed_mtime_loads_again(xlsx_template):
+    cache = TemplateCache()
+    first = cache.get(xlsx_template, "zip")
+
+    stat = os.stat(xlsx_template)
+    os.utime(xlsx_template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    second = cache.get(xlsx_template, "zip")
+
+    assert first.renderer is not second.renderer
+    assert cache.stats()["invalidations"] == 1
+    assert len(cache) == 1
+
+
+def test_least_recently_used_are_evicted(xlsx_template, tmp_path):
+    copies = []
+    for index in range(3):
+        copy = tmp_path / f"copy{index}.xlsx"
+        shutil.copy(xlsx_template, copy)
+        copies.append(str(copy))
+    cache = TemplateCache(max_entries=2)
+
+    cache.get(copies[0], "zip")
+    cache.get(copies[1], "zip")
+    cache.get(copies[0], "zip")
+    cache.get(copies[2], "zip")
+    cache.get(copies[0], "zip")
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["hits"] == 2
+    assert len(cache) == 2
+
+
+def test_concurrent_checkouts_get_their_own_renderer(xlsx_template):
+    cache = TemplateCache(renderers_per_template=2)
+    held = []
+    both_held = threading.Barrier(2, timeout=10)
+
+    def render():
+        with cache.checkout(xlsx_template, "zip") as renderer:
+            held.append(renderer)
+            both_held.wait()
+
+    threads = [threading.Thread(target=render) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(renderer) for renderer in held}) == 2
+    assert cache.stats()["bytes"] == 2 * cache.get(xlsx_template, "zip").memory
+
+
+def test_checkouts_wait_beyond_the_renderers_of_a_template(xlsx_template):
+    cache = TemplateCache(renderers_per_template=1)
+    held = []
+
+    def render():
+        with cache.checkout(xlsx_template, "zip") as renderer:
+            held.append(renderer)
+
+    with cache.checkout(xlsx_template, "zip") as renderer:
+        thread = threading.Thread(target=render)
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+    thread.join()
+
+    assert held == [renderer]
@@ -0,0 +1,94 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from filler import RowTemplateFiller
+
+ITEMS = [
+    {"name": "pen", "qty": 2, "price": 1.5},
+    {"name": "ink", "qty": 1, "price": 4},
+    {"name": "pad", "qty": 3, "price": 2},
+]
+
+
+@pytest.fixture
+def invoice_template(tmp_path):
+    """
+    A xlsx template with a repeating row of items, and a total and a merged cell below it.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Item", "Qty", "Price", "Total"])
+    sheet.append(["{{items.name}}", "{{items.qty}}", "{{items.price}}", "=B2*C2"])
+    sheet.append(["Sum", None, None, "=SUM(D2:D2)"])
+    sheet.append(["{{customer}}"])
+    sheet["A5"] = "Thanks"
+    sheet.merge_cells("A5:B5")
+    path = tmp_path / "invoice.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def fill(template, data, engine="zip"):
+    from openpyxl import load_workbook
+
+    blob = RowTemplateFiller(data, template, engine=engine).fill_to_bytes()
+    return load_workbook(BytesIO(blob)).active
+
+
+@pytest.mark.parametrize("items", [ITEMS, iter(ITEMS)], ids=["list", "iterator"])
+def test_rows_repeat_for_each_item(invoice_template, items):
+    sheet = fill(invoice_template, {"items": items, "customer": "Ada"})
+
+    assert [
+        [cell.value for cell in row] for row in sheet.iter_rows(min_row=2, max_row=4)
+    ] == [
+        ["pen", 2, 1.5, "=B2*C2"],
+        ["ink", 1, 4, "=B3*C3"],
+        ["pad", 3, 2, "=B4*C4"],
+    ]
+    assert sheet["A5"].value == "Sum"
+    assert sheet["D5"].value == "=SUM(D2:D4)"
+    assert sheet["A6"].value == "Ada"
+    assert sheet["A7"].value == "Thanks"
+    assert [str(merged) for merged in sheet.merged_cells.ranges] == ["A7:B7"]
+
+
+def test_dimension_covers_the_repeated_rows(invoice_template):
+    blob = RowTemplateFiller(
+        {"items": ITEMS, "customer": "Ada"}, invoice_template, engine="zip"
+    ).fill_to_bytes()
+
+    with zipfile.ZipFile(BytesIO(blob)) as package:
+        xml = package.read("xl/worksheets/sheet1.xml")
+    assert b'<dimension ref="A1:D7"/>' in xml
+
+
+def test_missing_list_keeps_the_template_rows(invoice_template):
+    sheet = fill(invoice_template, {"customer": "Ada"})
+
+    assert sheet["A2"].value == "{{items.name}}"
+    assert sheet["D3"].value == "=SUM(D2:D2)"
+    assert sheet["A4"].value == "Ada"
+
+
+def test_openpyxl_engine_treats_items_as_plain_keys(invoice_template):
+    sheet = fill(invoice_template, {"items.name": "pen", "customer": "Ada"}, "openpyxl")
+
+    assert sheet["A2"].value == "pen"
+    assert sheet["B2"].value == "{{items.qty}}"
+    assert sheet["D3"].value == "=SUM(D2:D2)"
+
+
+@pytest.mark.parametrize("items", [[], iter([])], ids=["list", "iterator"])
+def test_empty_list_keeps_a_blank_row(invoice_template, items):
+    sheet = fill(invoice_template, {"items": items, "customer": "Ada"})
+
+    assert [cell.value for cell in sheet[2]] == [None, None, None, "=B2*C2"]
+    assert sheet["A3"].value == "Sum"
+    assert sheet["D3"].value == "=SUM(D2:D2)"
+    assert sheet["A4"].value == "Ada"
+    assert [str(merged) for merged in sheet.merged_cells.ranges] == ["A5:B5"]
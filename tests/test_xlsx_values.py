@@ -0,0 +1,100 @@
+import datetime
+import math
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from filler import RowsTemplateFiller, RowTemplateFiller
+
+VALUES = {
+    "date": datetime.date(2024, 1, 2),
+    "datetime": datetime.datetime(2024, 1, 2, 13, 30),
+    "time": datetime.time(6, 15),
+    "duration": datetime.timedelta(hours=30),
+    "early": datetime.date(1900, 1, 1),
+    "flag": True,
+    "none": None,
+    "nan": math.nan,
+    "text": "x",
+}
+
+
+@pytest.fixture
+def values_template(tmp_path):
+    """
+    A xlsx template with a whole-cell placeholder of each key of VALUES in column A,
+    a bold copy of the date, a date with its own number format, and a date inside text.
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    workbook = Workbook()
+    sheet = workbook.active
+    for key in VALUES:
+        sheet.append([f"{{{{{key}}}}}"])
+    sheet["B1"] = "{{date}}"
+    sheet["B1"].font = Font(bold=True)
+    sheet["C1"] = "{{date}}"
+    sheet["C1"].number_format = "dd/mm/yyyy"
+    sheet["D1"] = "Due {{date}}"
+    path = tmp_path / "values.xlsx"
+    workbook.save(path)
+    return str(path)
+
+
+def cells(blob):
+    from openpyxl import load_workbook
+
+    sheet = load_workbook(BytesIO(blob)).active
+    return [
+        (cell.coordinate, cell.value, cell.number_format, cell.font.b)
+        for row in sheet.iter_rows()
+        for cell in row
+    ]
+
+
+def test_engines_fill_the_same_cells(values_template):
+    filled = {
+        engine: cells(
+            RowTemplateFiller(VALUES, values_template, engine=engine).fill_to_bytes()
+        )
+        for engine in ("openpyxl", "zip")
+    }
+
+    assert filled["zip"] == filled["openpyxl"]
+    by_cell = {coordinate: tuple(value) for coordinate, *value in filled["zip"]}
+    assert by_cell["A1"] == (datetime.datetime(2024, 1, 2), "yyyy-mm-dd", False)
+    assert by_cell["B1"] == (datetime.datetime(2024, 1, 2), "yyyy-mm-dd", True)
+    assert by_cell["C1"][1] == "dd/mm/yyyy"
+    assert by_cell["A4"][:2] == (datetime.timedelta(hours=30), "[hh]:mm:ss")
+    assert by_cell["A5"][0] == datetime.datetime(1900, 1, 1)
+    assert by_cell["A6"][0] is True
+    assert by_cell["A7"][0] is None and by_cell["A8"][0] is None
+
+
+@pytest.mark.parametrize("frame", [True, False], ids=["dataframe", "dicts"])
+def test_engines_fill_the_same_rows(values_template, tmp_path, frame):
+    data = [VALUES, {**VALUES, "date": None, "flag": False}]
+    data = pd.DataFrame(data) if frame else dict(enumerate(data))
+
+    filled = {}
+    for engine in ("openpyxl", "zip"):
+        output_dir = tmp_path / engine
+        output_dir.mkdir()
+        results = RowsTemplateFiller(
+            data, values_template, str(output_dir), engine=engine
+        ).fill()
+        assert [result.error for result in results] == [None, None]
+        filled[engine] = [cells(open(result.path, "rb").read()) for result in results]
+
+    assert filled["zip"] == filled["openpyxl"]
+
+
+def test_timezones_are_rejected_like_openpyxl(values_template):
+    aware = datetime.datetime(2024, 1, 2, tzinfo=datetime.timezone.utc)
+
+    for engine in ("openpyxl", "zip"):
+        filler = RowTemplateFiller({"date": aware}, values_template, engine=engine)
+        with pytest.raises(TypeError, match="timezones"):
+            filler.fill_to_bytes()
@@ -0,0 +1,62 @@
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from filler._utils._fill import load_template
+from filler._utils._zip import read_members
+
+DATA = {"name": "Ada", "amount": 3}
+
+
+def repack(template, compresslevel):
+    """
+    Compress every member of a template again at 'compresslevel', so that the members a
+    render recompressed at another level would not have the same bytes.
+    """
+    with zipfile.ZipFile(template) as zin:
+        members = [(info, zin.read(info)) for info in zin.infolist()]
+    with zipfile.ZipFile(template, "w") as zout:
+        for info, blob in members:
+            zout.writestr(
+                info,
+                blob,
+                compress_type=zipfile.ZIP_DEFLATED,
+                compresslevel=compresslevel,
+            )
+
+
+@pytest.mark.parametrize("fixture", ["xlsx_template", "docx_template"])
+def test_untouched_members_are_copied_raw(request, fixture):
+    template = request.getfixturevalue(fixture)
+    repack(template, 1)
+    renderer = load_template(template, "zip", compresslevel=9)
+    rendered = set(renderer.render_parts(DATA))
+
+    buffer = BytesIO()
+    renderer.render(DATA, buffer)
+    filled = {member.info.filename: member for member in read_members(buffer)}
+
+    untouched = [m for m in renderer.members if m.info.filename not in rendered]
+    assert len(untouched) >= 5
+    for member in untouched:
+        copy = filled[member.info.filename]
+        assert copy.raw == member.raw, member.info.filename
+        assert (copy.info.CRC, copy.info.compress_size, copy.info.compress_type) == (
+            member.info.CRC,
+            member.info.compress_size,
+            member.info.compress_type,
+        )
+
+
+def test_xlsx_members_are_those_of_the_template(xlsx_template):
+    repack(xlsx_template, 1)
+    renderer = load_template(xlsx_template, "zip", compresslevel=9)
+
+    template = {member.info.filename: member for member in read_members(xlsx_template)}
+    for member in renderer.members:
+        if member.info.filename == "xl/styles.xml":
+            # Holds the styles of the dates filled into the placeholder cells
+            continue
+        assert member.raw == template[member.info.filename].raw
+        assert member.info.CRC == template[member.info.filename].info.CRC